@@ -0,0 +1,50 @@
+#
+# BPMN_Cleanup.py
+#
+# Description:
+#   Delete the stale processes left by repeated runs of a macro. Each run
+#   creates <name>_<executionId>; runs are grouped by name and all but the
+#   newest CLEANUP_OPTIONS["KEEP"] are deleted with their diagrams.
+#   Older runs still referenced by other model elements are kept. Only
+#   runs carrying a config stamp count; hand-named processes are left alone.
+#
+# Applicable on: Package
+#
+# Usage:
+#   1. Select the Package holding the generated processes in Modelio
+#   2. Run this macro: it lists what would be deleted (dry run)
+#   3. Set CLEANUP_OPTIONS["DRY_RUN"] to False and run it again to delete
+#
+#   Requires BPMN_Helpers.py in the same macros folder.
+#
+# Author: Generated for Modelio BPMN workflows
+# Version: 1.0 - December 2025
+#
+
+from org.modelio.metamodel.uml.statik import Package
+
+# Load helper library (process index and cleanup)
+execfile(".modelio/5.4/macros/BPMN_Helpers.py")
+
+# Cleanup options
+CLEANUP_OPTIONS = {
+    "KEEP": 1,                  # Newest runs kept per process name (0: only referenced ones)
+    "KEEP_REFERENCED": True,    # Also keep older runs that other model elements refer to
+    "DRY_RUN": True,            # List only; set to False to delete
+    "LOG_LEVEL": LOG_SUMMARY,   # LOG_VERBOSE also lists the runs kept
+}
+
+if (selectedElements.size > 0):
+    element = selectedElements.get(0)
+    if (isinstance(element, Package)):
+        _log.setLevel(CLEANUP_OPTIONS.get("LOG_LEVEL", LOG_SUMMARY))
+        _log.summary("==================================================================")
+        _log.summary("BPMN CLEANUP" + (" (dry run)" if CLEANUP_OPTIONS.get("DRY_RUN", True) else ""))
+        _log.summary("==================================================================")
+        _log.summary("Package: " + element.getName())
+        _log.summary("==================================================================")
+        cleanupProcesses(element, CLEANUP_OPTIONS)
+    else:
+        print "ERROR: Select a Package."
+else:
+    print "ERROR: Select a Package first."
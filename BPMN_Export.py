@@ -3,7 +3,8 @@
 #
 # Description:
 #   Export a BPMN Process Diagram to a Python configuration file.
-#   Captures all elements with their exact positions and sizes.
+#   Captures all elements with their exact positions and sizes, or with
+#   EXPORT_OPTIONS["COMPACT_LAYOUT"] as columns and stacking order.
 #   The exported file can be used with BPMN_Import.py to recreate the diagram.
 #
 # Applicable on: BpmnProcessDesignDiagram, BpmnProcess
@@ -13,6 +14,8 @@
 #   2. Run this macro
 #   3. A Python file will be printed to the console (copy/paste to save)
 #
+#   Requires BPMN_Helpers.py in the same macros folder (shared logging).
+#
 # Author: Generated for Modelio BPMN workflows
 # Version: 1.0 - December 2025
 #
@@ -31,6 +34,17 @@ from org.modelio.metamodel.bpmn.gateways import BpmnParallelGateway
 from org.modelio.metamodel.bpmn.flows import BpmnSequenceFlow
 import re
 
+# Load helper library (shared logging and utilities)
+execfile(".modelio/5.4/macros/BPMN_Helpers.py")
+
+# Export options
+EXPORT_OPTIONS = {
+    "LOG_LEVEL": LOG_SUMMARY,   # LOG_VERBOSE also lists every lane
+    "PROFILE": False,           # True (or a path prefix) writes call statistics
+    "COMPACT_LAYOUT": False,    # True: columns + stacking order instead of absolute positions
+    "COLUMN_TOLERANCE": 40,     # Compact layout: max X distance (px) within one column
+}
+
 # Try optional imports
 try:
     from org.modelio.metamodel.bpmn.activities import BpmnScriptTask
@@ -49,6 +63,11 @@ except ImportError:
     BpmnSendTask = None
     BpmnReceiveTask = None
 
+try:
+    from org.modelio.metamodel.bpmn.activities import BpmnSubProcess
+except ImportError:
+    BpmnSubProcess = None
+
 try:
     from org.modelio.metamodel.bpmn.events import BpmnIntermediateCatchEvent
     from org.modelio.metamodel.bpmn.events import BpmnIntermediateThrowEvent
@@ -81,9 +100,10 @@ except ImportError:
 def getElementType(element):
     """Determine the element type constant string."""
     className = element.getMClass().getName()
+    javaElement = _unwrap(element)  # isinstance() needs the Java object when profiling
     
     # Start Events
-    if isinstance(element, BpmnStartEvent):
+    if isinstance(javaElement, BpmnStartEvent):
         # Check for event definitions
         try:
             eventDefs = element.getEventDefinitions()
@@ -102,7 +122,7 @@ def getElementType(element):
         return "START"
     
     # End Events
-    if isinstance(element, BpmnEndEvent):
+    if isinstance(javaElement, BpmnEndEvent):
         try:
             eventDefs = element.getEventDefinitions()
             if eventDefs and eventDefs.size() > 0:
@@ -120,7 +140,7 @@ def getElementType(element):
         return "END"
     
     # Intermediate Events (if available)
-    if BpmnIntermediateCatchEvent and isinstance(element, BpmnIntermediateCatchEvent):
+    if BpmnIntermediateCatchEvent and isinstance(javaElement, BpmnIntermediateCatchEvent):
         try:
             eventDefs = element.getEventDefinitions()
             if eventDefs and eventDefs.size() > 0:
@@ -131,11 +151,13 @@ def getElementType(element):
                     return "TIMER_CATCH"
                 elif "Signal" in defClass:
                     return "SIGNAL_CATCH"
+                elif "Link" in defClass:
+                    return "LINK_CATCH"
         except:
             pass
         return "INTERMEDIATE_CATCH"
     
-    if BpmnIntermediateThrowEvent and isinstance(element, BpmnIntermediateThrowEvent):
+    if BpmnIntermediateThrowEvent and isinstance(javaElement, BpmnIntermediateThrowEvent):
         try:
             eventDefs = element.getEventDefinitions()
             if eventDefs and eventDefs.size() > 0:
@@ -144,42 +166,48 @@ def getElementType(element):
                     return "MESSAGE_THROW"
                 elif "Signal" in defClass:
                     return "SIGNAL_THROW"
+                elif "Link" in defClass:
+                    return "LINK_THROW"
         except:
             pass
         return "INTERMEDIATE_THROW"
     
     # Tasks - check specific types first
-    if isinstance(element, BpmnUserTask):
+    if isinstance(javaElement, BpmnUserTask):
         return "USER_TASK"
-    if isinstance(element, BpmnServiceTask):
+    if isinstance(javaElement, BpmnServiceTask):
         return "SERVICE_TASK"
-    if isinstance(element, BpmnManualTask):
+    if isinstance(javaElement, BpmnManualTask):
         return "MANUAL_TASK"
-    if BpmnScriptTask and isinstance(element, BpmnScriptTask):
+    if BpmnScriptTask and isinstance(javaElement, BpmnScriptTask):
         return "SCRIPT_TASK"
-    if BpmnBusinessRuleTask and isinstance(element, BpmnBusinessRuleTask):
+    if BpmnBusinessRuleTask and isinstance(javaElement, BpmnBusinessRuleTask):
         return "BUSINESS_RULE_TASK"
-    if BpmnSendTask and isinstance(element, BpmnSendTask):
+    if BpmnSendTask and isinstance(javaElement, BpmnSendTask):
         return "SEND_TASK"
-    if BpmnReceiveTask and isinstance(element, BpmnReceiveTask):
+    if BpmnReceiveTask and isinstance(javaElement, BpmnReceiveTask):
         return "RECEIVE_TASK"
-    if isinstance(element, BpmnTask):
+    if isinstance(javaElement, BpmnTask):
         return "TASK"  # Generic task
     
+    # Sub-processes (exported collapsed, without their content)
+    if BpmnSubProcess and isinstance(javaElement, BpmnSubProcess):
+        return "SUB_PROCESS"
+    
     # Gateways
-    if isinstance(element, BpmnExclusiveGateway):
+    if isinstance(javaElement, BpmnExclusiveGateway):
         return "EXCLUSIVE_GW"
-    if isinstance(element, BpmnParallelGateway):
+    if isinstance(javaElement, BpmnParallelGateway):
         return "PARALLEL_GW"
-    if BpmnInclusiveGateway and isinstance(element, BpmnInclusiveGateway):
+    if BpmnInclusiveGateway and isinstance(javaElement, BpmnInclusiveGateway):
         return "INCLUSIVE_GW"
-    if BpmnComplexGateway and isinstance(element, BpmnComplexGateway):
+    if BpmnComplexGateway and isinstance(javaElement, BpmnComplexGateway):
         return "COMPLEX_GW"
-    if BpmnEventBasedGateway and isinstance(element, BpmnEventBasedGateway):
+    if BpmnEventBasedGateway and isinstance(javaElement, BpmnEventBasedGateway):
         return "EVENT_BASED_GW"
     
     # Data Objects
-    if _DATA_OBJECTS_AVAILABLE and isinstance(element, BpmnDataObject):
+    if _DATA_OBJECTS_AVAILABLE and isinstance(javaElement, BpmnDataObject):
         return "DATA_OBJECT"
     
     return "UNKNOWN"
@@ -229,14 +257,150 @@ def getGraphicBounds(diagramHandle, element):
     return None
 
 
+# ============================================================================
+# COMPACT LAYOUT INFERENCE
+# ============================================================================
+
+def _clusterColumns(xs, tolerance):
+    """
+    Group X positions into columns, left to right. A new column starts when
+    an X is more than `tolerance` px right of the first X of the current
+    column (anchoring on the first X keeps long chains of small steps from
+    merging into one column). Returns ({x: column}, [column left X, ...]).
+    """
+    columnOf = {}
+    columnXs = []
+    for x in sorted(set(xs)):
+        if not columnXs or x - columnXs[-1] > tolerance:
+            columnXs.append(x)
+        columnOf[x] = len(columnXs) - 1
+    return columnOf, columnXs
+
+
+def _mostCommon(values):
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return max(sorted(counts), key=lambda v: counts[v])
+
+
+def _inferLayoutSettings(flowElems, columnOf, columnXs):
+    """
+    Layout settings that reproduce the diagram's proportions: START_X from the
+    first column, TASK_WIDTH/TASK_HEIGHT from the most common task size and
+    SPACING from the median distance between a task column and the next one.
+    Only values that differ from BPMN_DEFAULT_CONFIG are returned.
+    """
+    settings = {}
+    if columnXs:
+        settings["START_X"] = columnXs[0]
+    tasks = [e for e in flowElems if e["type"] in _TASK_TYPES]
+    if tasks:
+        settings["TASK_WIDTH"] = _mostCommon([e["w"] for e in tasks])
+        settings["TASK_HEIGHT"] = _mostCommon([e["h"] for e in tasks])
+        taskColumns = set(columnOf[e["x"]] for e in tasks)
+        steps = sorted(columnXs[c + 1] - columnXs[c] for c in taskColumns if c + 1 < len(columnXs))
+        if steps:
+            settings["SPACING"] = steps[len(steps) // 2]
+    return dict((key, value) for key, value in settings.items() if value != BPMN_DEFAULT_CONFIG[key])
+
+
+def inferColumnLayout(config, tolerance=40):
+    """
+    Turn an exported config (absolute x, lane-relative y_offset) into a
+    column-based config: 3-tuple "elements", (name, lane, column)
+    "data_objects" and a "layout" dict, so the clone goes through
+    auto-stacking and the layout planner again.
+
+    - X positions of flow elements are clustered into columns (tolerance px)
+    - Elements sharing a lane and column are listed top to bottom, so
+      auto-stacking gives them the same order; Y offsets are turned into
+      stack rows of 90px from the topmost element of the lane, and only rows
+      that auto-stacking would not produce are written as (column, y_offset)
+    - Data objects get the column whose X is nearest to their X minus
+      DATA_OFFSET_X (where the planner would put them)
+    - START_X, SPACING and the task size are inferred from the diagram and
+      returned in "settings" when they differ from the defaults
+
+    The input config is not modified.
+    """
+    flowElems = [e for e in config["elements"] if not e.get("is_data", False)]
+    dataElems = [e for e in config["elements"] if e.get("is_data", False)]
+
+    columnOf, columnXs = _clusterColumns([e["x"] for e in flowElems], tolerance)
+
+    laneTops = {}
+    for e in flowElems:
+        laneTops[e["lane"]] = min(laneTops.get(e["lane"], e["y_offset"]), e["y_offset"])
+
+    # Config order = column, then top to bottom: this is the stacking order
+    ordered = sorted(flowElems, key=lambda e: (columnOf[e["x"]], e["y_offset"], e["x"]))
+    layout = {}
+    groupRows = {}  # (lane, column) -> rows used so far
+    for e in ordered:
+        col = columnOf[e["x"]]
+        rows = groupRows.setdefault((e["lane"], col), [])
+        row = int(round(float(e["y_offset"] - laneTops[e["lane"]]) / _STACKING_OFFSET))
+        if rows:
+            row = max(row, rows[-1] + 1)
+        if row == len(rows):
+            layout[e["name"]] = col
+        else:
+            layout[e["name"]] = (col, row * _STACKING_OFFSET)
+        rows.append(row)
+
+    dataObjects = []
+    dataOffsetX = BPMN_DEFAULT_CONFIG["DATA_OFFSET_X"]
+    for e in sorted(dataElems, key=lambda e: (e["x"], e["y_offset"])):
+        if columnXs:
+            target = e["x"] - dataOffsetX
+            col = min(range(len(columnXs)), key=lambda c: abs(columnXs[c] - target))
+        else:
+            col = 0
+        dataObjects.append((e["name"], e["lane"], col))
+
+    return {
+        "name": config["name"],
+        "lanes": list(config["lanes"]),
+        "elements": [(e["name"], e["type"], e["lane"]) for e in ordered],
+        "data_objects": dataObjects,
+        "flows": list(config["flows"]),
+        "data_associations": list(config["data_associations"]),
+        "layout": layout,
+        "settings": _inferLayoutSettings(flowElems, columnOf, columnXs),
+    }
+
+
 # ============================================================================
 # EXPORT FUNCTION
 # ============================================================================
 
-def exportBPMNProcess(process, diagram):
+def exportBPMNProcess(process, diagram, options=None):
     """
     Export a BPMN process to a configuration dictionary format.
+
+    options: optional dict, see EXPORT_OPTIONS. With "COMPACT_LAYOUT" the
+    result is column-based (see inferColumnLayout).
     """
+    options = options or {}
+    _log.setLevel(options.get("LOG_LEVEL", LOG_SUMMARY))
+    try:
+        if options.get("PROFILE"):
+            baseName = process.getName() + "_export"
+            config = _runProfiled(_profilePrefix(options["PROFILE"], baseName), "exportBPMNProcess " + process.getName(),
+                                  _exportBPMNProcess, process, diagram)
+        else:
+            config = _exportBPMNProcess(process, diagram)
+        if options.get("COMPACT_LAYOUT"):
+            config = inferColumnLayout(config, options.get("COLUMN_TOLERANCE", 40))
+            columns = set(_parseLayoutEntry(entry)[0] for entry in config["layout"].values())
+            _log.summary("Compact layout: " + str(len(columns)) + " columns")
+        return config
+    finally:
+        _log.flush()
+
+
+def _exportBPMNProcess(process, diagram):
     diagramService = Modelio.getInstance().getDiagramService()
     diagramHandle = diagramService.getDiagramHandle(diagram)
     
@@ -263,7 +427,7 @@ def exportBPMNProcess(process, diagram):
                     lanes[laneName] = lane
                     laneOrder.append(laneName)
     except Exception as e:
-        print "Warning: Could not get lanes: " + str(e)
+        _log.error("Warning: Could not get lanes: " + str(e))
     
     # Get lane bounds and sort by Y position
     laneBounds = {}
@@ -275,10 +439,11 @@ def exportBPMNProcess(process, diagram):
     # Sort by Y coordinate
     laneOrder = sorted(laneOrder, key=lambda ln: laneBounds.get(ln, {}).get("y", 9999))
     
-    print "Lanes found: " + str(len(laneOrder))
-    for laneName in laneOrder:
-        lb = laneBounds.get(laneName, {})
-        print "  " + laneName + ": y=" + str(lb.get("y", "?")) + ", h=" + str(lb.get("h", "?"))
+    _log.summary("Lanes found: " + str(len(laneOrder)))
+    if _log.enabled(LOG_VERBOSE):
+        for laneName in laneOrder:
+            lb = laneBounds.get(laneName, {})
+            _log.verbose("  " + laneName + ": y=" + str(lb.get("y", "?")) + ", h=" + str(lb.get("h", "?")))
     
     # Collect elements
     elements = []
@@ -292,13 +457,13 @@ def exportBPMNProcess(process, diagram):
             continue
         
         # Skip sequence flows (handled separately)
-        if isinstance(elem, BpmnSequenceFlow):
+        if isinstance(_unwrap(elem), BpmnSequenceFlow):
             continue
         
         # Skip data associations
         if _DATA_OBJECTS_AVAILABLE:
             try:
-                if isinstance(elem, BpmnDataAssociation):
+                if isinstance(_unwrap(elem), BpmnDataAssociation):
                     continue
             except:
                 pass
@@ -307,11 +472,11 @@ def exportBPMNProcess(process, diagram):
         laneName = findLaneForElement(elem, lanes)
         bounds = getGraphicBounds(diagramHandle, elem)
         
-        # Handle duplicate names by adding suffix
+        # Duplicate names get a "##2" key suffix; the clone still shows the original name
         originalName = name
         counter = 2
         while name in elementBounds:
-            name = originalName + "_" + str(counter)
+            name = originalName + _DUPLICATE_MARK + str(counter)
             counter += 1
         
         # Track the mapping from element UUID to final name
@@ -355,26 +520,23 @@ def exportBPMNProcess(process, diagram):
     # Sort elements by X then Y_offset for consistent ordering
     elements.sort(key=lambda e: (e["x"], e["y_offset"]))
     
+    # Config key of an element (duplicates were renamed above)
+    def exportedName(elem):
+        try:
+            return elementNameMap.get(elem.getUuid(), elem.getName())
+        except:
+            return elementNameMap.get(id(elem), elem.getName())
+    
     # Collect sequence flows
     flows = []
     for elem in flowElements:
-        if isinstance(elem, BpmnSequenceFlow):
+        if isinstance(_unwrap(elem), BpmnSequenceFlow):
             srcElem = elem.getSourceRef()
             tgtElem = elem.getTargetRef()
             
             # Get the (possibly renamed) element names
-            srcName = ""
-            tgtName = ""
-            if srcElem:
-                try:
-                    srcName = elementNameMap.get(srcElem.getUuid(), srcElem.getName())
-                except:
-                    srcName = elementNameMap.get(id(srcElem), srcElem.getName())
-            if tgtElem:
-                try:
-                    tgtName = elementNameMap.get(tgtElem.getUuid(), tgtElem.getName())
-                except:
-                    tgtName = elementNameMap.get(id(tgtElem), tgtElem.getName())
+            srcName = exportedName(srcElem) if srcElem else ""
+            tgtName = exportedName(tgtElem) if tgtElem else ""
             
             guard = elem.getName() if elem.getName() else ""
             if not guard:
@@ -390,8 +552,8 @@ def exportBPMNProcess(process, diagram):
 
     if _DATA_OBJECTS_AVAILABLE:
         for elem in flowElements:
-            if isinstance(elem, BpmnDataObject):
-                dataName = elem.getName()
+            if isinstance(_unwrap(elem), BpmnDataObject):
+                dataName = exportedName(elem)
 
                 # TargetOfDataAssociation: associations where data object is TARGET (Task -> Data)
                 # These have StartingActivity = the task that produces this data
@@ -401,7 +563,7 @@ def exportBPMNProcess(process, diagram):
                         for assoc in targetAssocs:
                             startAct = assoc.getStartingActivity()
                             if startAct:
-                                taskName = startAct.getName()
+                                taskName = exportedName(startAct)
                                 dataAssociations.append((taskName, dataName))
                 except:
                     pass
@@ -414,12 +576,12 @@ def exportBPMNProcess(process, diagram):
                         for assoc in sourceAssocs:
                             endAct = assoc.getEndingActivity()
                             if endAct:
-                                taskName = endAct.getName()
+                                taskName = exportedName(endAct)
                                 dataAssociations.append((dataName, taskName))
                 except:
                     pass
 
-    print "Data associations found: " + str(len(dataAssociations))
+    _log.summary("Data associations found: " + str(len(dataAssociations)))
     
     # Collect lane bounds
     laneBoundsList = []
@@ -444,47 +606,8 @@ def exportBPMNProcess(process, diagram):
     }
 
 
-def formatPythonOutput(config):
-    """Format the configuration as a Python file."""
-    
-    elements = config["elements"]
-    lane_bounds = config["lane_bounds"]
-    
-    # Normalize X coordinates only (Y is now relative to lane)
-    if elements:
-        minX = min(e["x"] for e in elements)
-        offsetX = 50 - minX
-        
-        for e in elements:
-            e["x"] = e["x"] + offsetX
-    
-    output = []
-    output.append("#")
-    output.append("# " + config["name"] + "_Exported.py")
-    output.append("#")
-    output.append("# Description: Exported BPMN process configuration")
-    output.append("#              Generated by BPMN_Export.py")
-    output.append("#")
-    output.append("# Applicable on: Package")
-    output.append("#")
-    output.append("")
-    output.append("from org.modelio.metamodel.uml.statik import Package")
-    output.append("")
-    output.append("# Load helper library")
-    output.append('execfile(".modelio/5.4/macros/BPMN_Helpers.py")')
-    output.append("")
-    output.append("CONFIG = {")
-    output.append('    "name": "' + config["name"] + '",')
-    output.append("")
-    
-    # Lanes
-    output.append("    # Lanes (top to bottom)")
-    output.append("    \"lanes\": [")
-    for laneName in config["lanes"]:
-        output.append('        "' + laneName + '",')
-    output.append("    ],")
-    output.append("")
-    
+def _formatPositionedSections(config, output):
+    """Lane bounds, elements and data objects with exact positions."""
     # Lane bounds (for reference only)
     output.append("    # Lane bounds - reference only (y, height from original)")
     output.append("    \"lane_bounds\": [")
@@ -521,6 +644,84 @@ def formatPythonOutput(config):
             output.append(line)
         output.append("    ],")
         output.append("")
+
+
+def _formatCompactSections(config, output):
+    """Elements, data objects and layout of a column-based config."""
+    output.append("    # Elements: (name, type, lane)")
+    output.append("    \"elements\": [")
+    for name, elemType, lane in config["elements"]:
+        lanePart = '"' + lane + '"' if lane else "None"
+        output.append('        ("' + name + '", ' + elemType + ', ' + lanePart + '),')
+    output.append("    ],")
+    output.append("")
+    
+    if config["data_objects"]:
+        output.append("    # Data Objects: (name, lane, column)")
+        output.append("    \"data_objects\": [")
+        for name, lane, col in config["data_objects"]:
+            lanePart = '"' + lane + '"' if lane else "None"
+            output.append('        ("' + name + '", ' + lanePart + ', ' + str(col) + '),')
+        output.append("    ],")
+        output.append("")
+    
+    # Layout in element order: column, or (column, y_offset) off the stacking rows
+    output.append("    # Layout: column, or (column, y_offset) where auto-stacking differs")
+    output.append("    \"layout\": {")
+    for name, _, _ in config["elements"]:
+        output.append('        "' + name + '": ' + str(config["layout"][name]) + ',')
+    output.append("    },")
+    output.append("")
+    
+    if config["settings"]:
+        output.append("    # Layout settings (inferred from the diagram)")
+        for key in sorted(config["settings"]):
+            output.append('    "' + key + '": ' + str(config["settings"][key]) + ',')
+        output.append("")
+
+
+def formatPythonOutput(config):
+    """Format the configuration as a Python file."""
+    
+    elements = config["elements"]
+    compact = "layout" in config
+    
+    # Normalize X coordinates only (Y is now relative to lane), on a copy
+    if elements and not compact:
+        minX = min(e["x"] for e in elements)
+        config = transformGeometry(config, [("translate", 50 - minX, 0)])
+    
+    output = []
+    output.append("#")
+    output.append("# " + config["name"] + "_Exported.py")
+    output.append("#")
+    output.append("# Description: Exported BPMN process configuration")
+    output.append("#              Generated by BPMN_Export.py")
+    output.append("#")
+    output.append("# Applicable on: Package")
+    output.append("#")
+    output.append("")
+    output.append("from org.modelio.metamodel.uml.statik import Package")
+    output.append("")
+    output.append("# Load helper library")
+    output.append('execfile(".modelio/5.4/macros/BPMN_Helpers.py")')
+    output.append("")
+    output.append("CONFIG = {")
+    output.append('    "name": "' + config["name"] + '",')
+    output.append("")
+    
+    # Lanes
+    output.append("    # Lanes (top to bottom)")
+    output.append("    \"lanes\": [")
+    for laneName in config["lanes"]:
+        output.append('        "' + laneName + '",')
+    output.append("    ],")
+    output.append("")
+    
+    if compact:
+        _formatCompactSections(config, output)
+    else:
+        _formatPositionedSections(config, output)
     
     # Flows
     output.append("    # Sequence Flows: (source, target, guard)")
@@ -595,31 +796,36 @@ if (selectedElements.size > 0):
             pass
     
     if process and diagram:
-        print "=================================================================="
-        print "BPMN EXPORT"
-        print "=================================================================="
-        print "Process: " + process.getName()
-        print "Diagram: " + diagram.getName()
-        print "=================================================================="
-        print ""
+        _log.setLevel(EXPORT_OPTIONS.get("LOG_LEVEL", LOG_SUMMARY))
+        _log.summary("==================================================================")
+        _log.summary("BPMN EXPORT")
+        _log.summary("==================================================================")
+        _log.summary("Process: " + process.getName())
+        _log.summary("Diagram: " + diagram.getName())
+        _log.summary("==================================================================")
+        _log.summary("")
         
-        config = exportBPMNProcess(process, diagram)
+        config = exportBPMNProcess(process, diagram, EXPORT_OPTIONS)
         pythonCode = formatPythonOutput(config)
         
-        print "=== EXPORTED CONFIGURATION (copy below) ==="
-        print ""
-        print pythonCode
-        print ""
-        print "=== END OF EXPORT ==="
+        # The exported code is printed at every log level, in a single block
+        print "\n".join([
+            "=== EXPORTED CONFIGURATION (copy below) ===",
+            "",
+            pythonCode,
+            "",
+            "=== END OF EXPORT ===",
+        ])
         
         # Summary
-        print ""
-        print "Summary:"
-        print "  Lanes: " + str(len(config["lanes"]))
-        print "  Elements: " + str(len(config["elements"]))
-        print "  Flows: " + str(len(config["flows"]))
+        _log.summary("")
+        _log.summary("Summary:")
+        _log.summary("  Lanes: " + str(len(config["lanes"])))
+        _log.summary("  Elements: " + str(len(config["elements"])))
+        _log.summary("  Flows: " + str(len(config["flows"])))
         if config["data_associations"]:
-            print "  Data Associations: " + str(len(config["data_associations"]))
+            _log.summary("  Data Associations: " + str(len(config["data_associations"])))
+        _log.flush()
     elif process and not diagram:
         print "ERROR: Found process but no diagram."
         print "Please select a BPMN diagram directly."
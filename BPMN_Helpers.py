@@ -26,9 +26,30 @@ from org.modelio.metamodel.bpmn.gateways import BpmnParallelGateway
 from org.modelio.metamodel.bpmn.flows import BpmnSequenceFlow
 from org.modelio.metamodel.uml.statik import Package
 from org.eclipse.draw2d.geometry import Rectangle as Draw2DRectangle
+from array import array
+import bisect
+import hashlib
+import json
+import os
+import pstats
 import re
+import threading
 import time
 
+# Profiler for the PROFILE option: Jython ships only the pure-Python one
+try:
+    import cProfile as _profiler
+except ImportError:
+    import profile as _profiler
+
+# Cores for batch planning threads (Jython threads run in parallel, no GIL)
+try:
+    from java.lang import Runtime as _JavaRuntime
+    _CPU_COUNT = _JavaRuntime.getRuntime().availableProcessors()
+except ImportError:
+    import multiprocessing
+    _CPU_COUNT = multiprocessing.cpu_count()
+
 # Try imports for extended types
 try:
     from org.modelio.metamodel.bpmn.activities import BpmnScriptTask
@@ -64,6 +85,12 @@ try:
 except ImportError:
     _INTERMEDIATE_EVENTS_AVAILABLE = False
 
+try:
+    from org.modelio.metamodel.bpmn.activities import BpmnSubProcess
+    _SUB_PROCESS_AVAILABLE = True
+except ImportError:
+    _SUB_PROCESS_AVAILABLE = False
+
 try:
     from org.modelio.metamodel.bpmn.objects import BpmnDataObject
     from org.modelio.metamodel.bpmn.objects import BpmnDataAssociation
@@ -71,14 +98,45 @@ try:
 except ImportError:
     _DATA_OBJECTS_AVAILABLE = False
 
-print "BPMN_Helpers.py v3.2 loaded (Data Objects: " + str(_DATA_OBJECTS_AVAILABLE) + ")"
+try:
+    from org.modelio.api.modelio.diagram import IDiagramLink
+    from org.eclipse.draw2d.geometry import Point as Draw2DPoint
+    _LINK_ROUTING_AVAILABLE = True
+except ImportError:
+    _LINK_ROUTING_AVAILABLE = False
+
+BPMN_HELPERS_VERSION = "3.2"
+
+print "BPMN_Helpers.py v" + BPMN_HELPERS_VERSION + " loaded (Data Objects: " + str(_DATA_OBJECTS_AVAILABLE) + ")"
 
 
 # ============================================================================
 # DEFAULT CONFIGURATION
 # ============================================================================
 
+# Log levels (LOG_LEVEL config key)
+LOG_QUIET = 0       # Errors and warnings only
+LOG_SUMMARY = 1     # Phase headers, step counters and final summary
+LOG_VERBOSE = 2     # Plus one line per lane, element, unmask and auto-stack column
+LOG_DEBUG = 3       # Plus intermediate layout values
+
 BPMN_DEFAULT_CONFIG = {
+    "LOG_LEVEL": LOG_SUMMARY,
+    "PROFILE": False,
+    "TRACE": False,
+    "DRY_RUN": False,
+    "VALIDATE": True,
+    "ROUTE_FLOWS": True,
+    "RESOLVE_OVERLAPS": True,
+    "ADAPTIVE_COLUMNS": True,
+    "JOURNAL": False,
+    "RESUME": False,
+    "STAMP": True,
+    "SKIP_UNCHANGED": False,
+    "NAMING": "timestamp",
+    "DEFER_SUB_PROCESSES": False,
+    "SHARD_SIZE": None,
+    "SHARD_COLUMNS": None,
     "WAIT_TIME_MS": 50,
     "MAX_ATTEMPTS": 3,
     "SPACING": 150,
@@ -91,6 +149,21 @@ BPMN_DEFAULT_CONFIG = {
     "DATA_OFFSET_Y": 10,
 }
 
+# Options of createBPMNFromConfigs that apply to the batch, not to each config
+BPMN_BATCH_OPTIONS = {
+    "TRANSACTION": None,        # "batch": one transaction, "process": one per process
+    "STOP_ON_ERROR": False,     # Stop at the first process that fails
+    "THREADS": None,            # Planning threads (None: one per core, 1: no threads)
+}
+
+# Options of cleanupProcesses (BPMN_Cleanup.py)
+BPMN_CLEANUP_OPTIONS = {
+    "KEEP": 1,                  # Newest runs kept per process name (0: only referenced ones)
+    "KEEP_REFERENCED": True,    # Also keep older runs that other model elements refer to
+    "DRY_RUN": True,            # Only list what would be deleted
+    "LOG_LEVEL": LOG_SUMMARY,
+}
+
 
 # ============================================================================
 # ELEMENT TYPE CONSTANTS
@@ -118,6 +191,8 @@ MESSAGE_THROW = "MESSAGE_THROW"
 TIMER_CATCH = "TIMER_CATCH"
 SIGNAL_CATCH = "SIGNAL_CATCH"
 SIGNAL_THROW = "SIGNAL_THROW"
+LINK_CATCH = "LINK_CATCH"       # Off-page connector: continues from the LINK_THROW of the same name
+LINK_THROW = "LINK_THROW"
 
 # Tasks
 TASK = "TASK"
@@ -129,6 +204,9 @@ BUSINESS_RULE_TASK = "BUSINESS_RULE_TASK"
 SEND_TASK = "SEND_TASK"
 RECEIVE_TASK = "RECEIVE_TASK"
 
+# Sub-processes (nested config in the "sub_processes" section)
+SUB_PROCESS = "SUB_PROCESS"
+
 # Gateways
 EXCLUSIVE_GW = "EXCLUSIVE_GW"
 PARALLEL_GW = "PARALLEL_GW"
@@ -140,6 +218,319 @@ EVENT_BASED_GW = "EVENT_BASED_GW"
 DATA_OBJECT = "DATA_OBJECT"
 
 
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+_LOG_LEVEL_NAMES = {
+    "QUIET": LOG_QUIET,
+    "SUMMARY": LOG_SUMMARY,
+    "VERBOSE": LOG_VERBOSE,
+    "DEBUG": LOG_DEBUG,
+}
+
+def _parseLogLevel(level):
+    if isinstance(level, basestring):
+        return _LOG_LEVEL_NAMES.get(level.strip().upper(), LOG_SUMMARY)
+    try:
+        return int(level)
+    except (TypeError, ValueError):
+        return LOG_SUMMARY
+
+class _BpmnLog(object):
+    """
+    Leveled console log. Lines are buffered and printed in one block per
+    phase, because each print on the Modelio script console is slow.
+    """
+
+    def __init__(self, level=LOG_SUMMARY):
+        self.level = _parseLogLevel(level)
+        self.lines = []
+
+    def setLevel(self, level):
+        self.level = _parseLogLevel(level)
+
+    def enabled(self, level):
+        return self.level >= level
+
+    def error(self, msg):
+        self.lines.append(msg)
+
+    def summary(self, msg):
+        if self.level >= LOG_SUMMARY:
+            self.lines.append(msg)
+
+    def verbose(self, msg):
+        if self.level >= LOG_VERBOSE:
+            self.lines.append(msg)
+
+    def debug(self, msg):
+        if self.level >= LOG_DEBUG:
+            self.lines.append(msg)
+
+    def phase(self, title):
+        """Flush the previous phase and start a new one with a header line."""
+        self.flush()
+        if self.level >= LOG_SUMMARY:
+            self.lines.append("")
+            self.lines.append(("== " + title + " ").ljust(65, "="))
+            self.lines.append("")
+
+    def flush(self):
+        if self.lines:
+            print "\n".join(self.lines)
+            self.lines = []
+
+_log = _BpmnLog()
+
+
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+# Values returned by Modelio calls that are not wrapped by _JavaCallProxy
+_PLAIN_TYPES = (basestring, int, long, float, bool, type(None), list, tuple, dict, set)
+
+class _JavaCallStats(object):
+    """Call count and total seconds per Modelio (Java) method name."""
+
+    def __init__(self):
+        self.calls = {}
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, target, method, args, seconds, result):
+        entry = self.calls.get(method)
+        if entry is None:
+            entry = self.calls[method] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        self.count += 1
+        self.seconds += seconds
+
+class _JavaCallProxy(object):
+    """
+    Wraps a Modelio object so that each method call is timed and reported to
+    a sink. Returned objects are wrapped too, arguments are unwrapped before
+    they reach Java. Use _unwrap() before isinstance() checks.
+    """
+
+    __slots__ = ("_target", "_sink")
+
+    def __init__(self, target, sink):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_sink", sink)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        target = self._target
+        sink = self._sink
+
+        def call(*args):
+            args = [_unwrap(a) for a in args]
+            start = time.time()
+            result = attr(*args)
+            sink.record(target, name, args, time.time() - start, result)
+            return _wrapJava(result, sink)
+        return call
+
+    def __iter__(self):
+        for item in self._target:
+            yield _wrapJava(item, self._sink)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __getitem__(self, index):
+        return _wrapJava(self._target[index], self._sink)
+
+    def __nonzero__(self):
+        return bool(self._target)
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __str__(self):
+        return str(self._target)
+
+    def __repr__(self):
+        return repr(self._target)
+
+class _JavaCallSinks(object):
+    """Several sinks fed by one proxy, e.g. PROFILE and TRACE in the same run."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def __contains__(self, sink):
+        return any(s is sink or (isinstance(s, _JavaCallSinks) and sink in s) for s in self.sinks)
+
+    def record(self, target, method, args, seconds, result):
+        for sink in self.sinks:
+            sink.record(target, method, args, seconds, result)
+
+def _wrapJava(value, sink):
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if isinstance(value, _JavaCallProxy):
+        # Already wrapped by an outer run: report to both sinks
+        current = object.__getattribute__(value, "_sink")
+        if current is sink or (isinstance(current, _JavaCallSinks) and sink in current):
+            return value
+        return _JavaCallProxy(object.__getattribute__(value, "_target"), _JavaCallSinks(current, sink))
+    return _JavaCallProxy(value, sink)
+
+def _unwrap(value):
+    if isinstance(value, _JavaCallProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, list):
+        return [_unwrap(item) for item in value]    # Processes of a sharded run
+    return value
+
+def _runWithJavaProxies(sink, func, *args):
+    """Run func with modelingSession, Modelio and the arguments wrapped."""
+    namespace = globals()
+    saved = (namespace.get("modelingSession"), namespace.get("Modelio"))
+    namespace["modelingSession"] = _wrapJava(saved[0], sink)
+    namespace["Modelio"] = _wrapJava(saved[1], sink)
+    try:
+        return _unwrap(func(*[_wrapJava(a, sink) for a in args]))
+    finally:
+        namespace["modelingSession"], namespace["Modelio"] = saved
+
+def _profilePrefix(option, defaultName, kind="profile"):
+    if isinstance(option, basestring):
+        return option
+    return "bpmn_" + kind + "_" + re.sub(r'[^A-Za-z0-9_.-]', "_", defaultName)
+
+def _runProfiled(outputPrefix, label, func, *args):
+    """
+    Run func under the Python profiler with Modelio calls timed separately.
+    Writes <outputPrefix>.prof (pstats data) and <outputPrefix>.txt (report).
+    """
+    javaStats = _JavaCallStats()
+    profiler = _profiler.Profile()
+    start = time.time()
+    try:
+        return profiler.runcall(_runWithJavaProxies, javaStats, func, *args)
+    finally:
+        elapsed = time.time() - start
+        _writeProfileReport(profiler, javaStats, elapsed, outputPrefix, label)
+
+class _JavaCallTrace(_JavaCallStats):
+    """
+    Writes every Modelio call to a JSON-lines trace file: target object,
+    method, arguments, result and measured latency. Objects are recorded as
+    references ("o12"); the entry objects get the names given in roots.
+    """
+
+    def __init__(self, path, roots):
+        _JavaCallStats.__init__(self)
+        self.path = path
+        self.out = open(path, "w")
+        self.refs = {}
+        self.keep = []  # Keeps traced objects alive so that id() values stay unique
+        self.start = time.time()
+        for name, obj in roots:
+            self._ref(obj, name)
+        header = {"trace": 1, "roots": [name for name, _ in roots], "created": self.start}
+        self.out.write(json.dumps(header) + "\n")
+
+    def _ref(self, obj, name=None):
+        key = id(obj)
+        ref = self.refs.get(key)
+        if ref is None:
+            ref = name or ("o" + str(len(self.keep) + 1))
+            self.refs[key] = ref
+            self.keep.append(obj)
+        return ref
+
+    def _encode(self, value):
+        if value is None or isinstance(value, (basestring, int, long, float, bool)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        if isinstance(value, Draw2DRectangle):
+            return {"rect": [value.x, value.y, value.width, value.height]}
+        return {"ref": self._ref(value)}
+
+    def record(self, target, method, args, seconds, result):
+        _JavaCallStats.record(self, target, method, args, seconds, result)
+        entry = {
+            "t": round(time.time() - self.start - seconds, 6),
+            "obj": self._ref(target),
+            "m": method,
+            "args": [self._encode(a) for a in args],
+            "ms": round(seconds * 1000.0, 4),
+        }
+        if result is not None:
+            entry["ret"] = self._encode(result)
+        self.out.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        self.out.close()
+
+def _runTraced(tracePath, func, *args):
+    """Run func with every Modelio call recorded to tracePath."""
+    namespace = globals()
+    roots = [("session", namespace.get("modelingSession")), ("modelio", namespace.get("Modelio"))]
+    for index, arg in enumerate(args):
+        if not isinstance(arg, _PLAIN_TYPES):
+            roots.append(("arg" + str(index), _unwrap(arg)))
+    trace = _JavaCallTrace(tracePath, roots)
+    try:
+        return _runWithJavaProxies(trace, func, *args)
+    finally:
+        trace.close()
+        _log.summary("[Trace] " + str(trace.count) + " Modelio calls, %.3f s -> %s" % (trace.seconds, tracePath))
+
+def _writeProfileReport(profiler, javaStats, elapsed, outputPrefix, label):
+    pythonSeconds = max(elapsed - javaStats.seconds, 0.0)
+
+    def share(seconds):
+        if elapsed <= 0:
+            return "0.0%"
+        return "%.1f%%" % (100.0 * seconds / elapsed)
+
+    lines = [
+        "BPMN profile: " + label,
+        "Total:           %8.3f s" % elapsed,
+        "  Modelio calls: %8.3f s  %6s  (%d calls)" % (javaStats.seconds, share(javaStats.seconds), javaStats.count),
+        "  Python code:   %8.3f s  %6s" % (pythonSeconds, share(pythonSeconds)),
+        "",
+        "Modelio calls by total time:",
+        "  %8s %10s %9s  %s" % ("calls", "total(s)", "avg(ms)", "method"),
+    ]
+    ranked = sorted(javaStats.calls.items(), key=lambda item: -item[1][1])
+    for method, (count, seconds) in ranked:
+        lines.append("  %8d %10.3f %9.3f  %s" % (count, seconds, 1000.0 * seconds / count, method))
+    lines.append("")
+    lines.append("Python functions (profiler; Modelio call time is included in the callers):")
+
+    try:
+        profiler.dump_stats(outputPrefix + ".prof")
+        report = open(outputPrefix + ".txt", "w")
+        try:
+            report.write("\n".join(lines) + "\n")
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(40)
+        finally:
+            report.close()
+    except Exception as e:
+        _log.error("[Profile] ERROR writing " + outputPrefix + ": " + str(e))
+        return
+
+    _log.summary("[Profile] Total %.3f s | Modelio %.3f s (%s) | Python %.3f s -> %s.txt" % (
+        elapsed, javaStats.seconds, share(javaStats.seconds), pythonSeconds, outputPrefix))
+
+
 # ============================================================================
 # ELEMENT CREATION HELPERS
 # ============================================================================
@@ -150,6 +541,13 @@ def _createLane(laneSet, name):
     lane.setLaneSet(laneSet)
     return lane
 
+def _setContainer(element, container):
+    """Flow elements of a sub-process belong to it through SubProcess, not Container."""
+    if _SUB_PROCESS_AVAILABLE and isinstance(_unwrap(container), BpmnSubProcess):
+        element.setSubProcess(container)
+    else:
+        element.setContainer(container)
+
 def _addToLane(element, lane):
     try:
         lane.getFlowElementRef().add(element)
@@ -160,13 +558,13 @@ def _addToLane(element, lane):
 def _createStartEvent(process, name):
     event = modelingSession.getModel().createBpmnStartEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     return event
 
 def _createMessageStartEvent(process, name):
     event = modelingSession.getModel().createBpmnStartEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         msgDef = modelingSession.getModel().createBpmnMessageEventDefinition()
         msgDef.setDefined(event)
@@ -177,7 +575,7 @@ def _createMessageStartEvent(process, name):
 def _createTimerStartEvent(process, name):
     event = modelingSession.getModel().createBpmnStartEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         timerDef = modelingSession.getModel().createBpmnTimerEventDefinition()
         timerDef.setDefined(event)
@@ -188,7 +586,7 @@ def _createTimerStartEvent(process, name):
 def _createSignalStartEvent(process, name):
     event = modelingSession.getModel().createBpmnStartEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         signalDef = modelingSession.getModel().createBpmnSignalEventDefinition()
         signalDef.setDefined(event)
@@ -199,7 +597,7 @@ def _createSignalStartEvent(process, name):
 def _createConditionalStartEvent(process, name):
     event = modelingSession.getModel().createBpmnStartEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         condDef = modelingSession.getModel().createBpmnConditionalEventDefinition()
         condDef.setDefined(event)
@@ -210,13 +608,13 @@ def _createConditionalStartEvent(process, name):
 def _createEndEvent(process, name):
     event = modelingSession.getModel().createBpmnEndEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     return event
 
 def _createMessageEndEvent(process, name):
     event = modelingSession.getModel().createBpmnEndEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         msgDef = modelingSession.getModel().createBpmnMessageEventDefinition()
         msgDef.setDefined(event)
@@ -227,7 +625,7 @@ def _createMessageEndEvent(process, name):
 def _createSignalEndEvent(process, name):
     event = modelingSession.getModel().createBpmnEndEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         signalDef = modelingSession.getModel().createBpmnSignalEventDefinition()
         signalDef.setDefined(event)
@@ -238,7 +636,7 @@ def _createSignalEndEvent(process, name):
 def _createTerminateEndEvent(process, name):
     event = modelingSession.getModel().createBpmnEndEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         termDef = modelingSession.getModel().createBpmnTerminateEventDefinition()
         termDef.setDefined(event)
@@ -249,7 +647,7 @@ def _createTerminateEndEvent(process, name):
 def _createErrorEndEvent(process, name):
     event = modelingSession.getModel().createBpmnEndEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         errDef = modelingSession.getModel().createBpmnErrorEventDefinition()
         errDef.setDefined(event)
@@ -262,7 +660,7 @@ def _createIntermediateCatchEvent(process, name):
         return _createStartEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateCatchEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     return event
 
 def _createIntermediateThrowEvent(process, name):
@@ -270,7 +668,7 @@ def _createIntermediateThrowEvent(process, name):
         return _createEndEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateThrowEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     return event
 
 def _createMessageCatchEvent(process, name):
@@ -278,7 +676,7 @@ def _createMessageCatchEvent(process, name):
         return _createIntermediateCatchEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateCatchEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         msgDef = modelingSession.getModel().createBpmnMessageEventDefinition()
         msgDef.setDefined(event)
@@ -291,7 +689,7 @@ def _createMessageThrowEvent(process, name):
         return _createIntermediateThrowEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateThrowEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         msgDef = modelingSession.getModel().createBpmnMessageEventDefinition()
         msgDef.setDefined(event)
@@ -304,7 +702,7 @@ def _createTimerCatchEvent(process, name):
         return _createIntermediateCatchEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateCatchEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         timerDef = modelingSession.getModel().createBpmnTimerEventDefinition()
         timerDef.setDefined(event)
@@ -317,7 +715,7 @@ def _createSignalCatchEvent(process, name):
         return _createIntermediateCatchEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateCatchEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         signalDef = modelingSession.getModel().createBpmnSignalEventDefinition()
         signalDef.setDefined(event)
@@ -330,7 +728,7 @@ def _createSignalThrowEvent(process, name):
         return _createIntermediateThrowEvent(process, name)
     event = modelingSession.getModel().createBpmnIntermediateThrowEvent()
     event.setName(name)
-    event.setContainer(process)
+    _setContainer(event, process)
     try:
         signalDef = modelingSession.getModel().createBpmnSignalEventDefinition()
         signalDef.setDefined(event)
@@ -338,28 +736,56 @@ def _createSignalThrowEvent(process, name):
         pass
     return event
 
+def _createLinkCatchEvent(process, name):
+    if not _INTERMEDIATE_EVENTS_AVAILABLE:
+        return _createStartEvent(process, name)
+    event = modelingSession.getModel().createBpmnIntermediateCatchEvent()
+    event.setName(name)
+    _setContainer(event, process)
+    try:
+        linkDef = modelingSession.getModel().createBpmnLinkEventDefinition()
+        linkDef.setName(name)
+        linkDef.setDefined(event)
+    except:
+        pass
+    return event
+
+def _createLinkThrowEvent(process, name):
+    if not _INTERMEDIATE_EVENTS_AVAILABLE:
+        return _createEndEvent(process, name)
+    event = modelingSession.getModel().createBpmnIntermediateThrowEvent()
+    event.setName(name)
+    _setContainer(event, process)
+    try:
+        linkDef = modelingSession.getModel().createBpmnLinkEventDefinition()
+        linkDef.setName(name)
+        linkDef.setDefined(event)
+    except:
+        pass
+    return event
+
 def _createTask(process, name):
     task = modelingSession.getModel().createBpmnTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createUserTask(process, name):
     task = modelingSession.getModel().createBpmnUserTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createServiceTask(process, name):
     task = modelingSession.getModel().createBpmnServiceTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createManualTask(process, name):
     task = modelingSession.getModel().createBpmnManualTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createScriptTask(process, name):
@@ -367,7 +793,7 @@ def _createScriptTask(process, name):
         return _createServiceTask(process, name)
     task = modelingSession.getModel().createBpmnScriptTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createBusinessRuleTask(process, name):
@@ -375,7 +801,7 @@ def _createBusinessRuleTask(process, name):
         return _createServiceTask(process, name)
     task = modelingSession.getModel().createBpmnBusinessRuleTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createSendTask(process, name):
@@ -383,7 +809,7 @@ def _createSendTask(process, name):
         return _createServiceTask(process, name)
     task = modelingSession.getModel().createBpmnSendTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
 def _createReceiveTask(process, name):
@@ -391,19 +817,27 @@ def _createReceiveTask(process, name):
         return _createServiceTask(process, name)
     task = modelingSession.getModel().createBpmnReceiveTask()
     task.setName(name)
-    task.setContainer(process)
+    _setContainer(task, process)
     return task
 
+def _createSubProcess(process, name):
+    if not _SUB_PROCESS_AVAILABLE:
+        return _createTask(process, name)
+    subProcess = modelingSession.getModel().createBpmnSubProcess()
+    subProcess.setName(name)
+    _setContainer(subProcess, process)
+    return subProcess
+
 def _createExclusiveGateway(process, name):
     gateway = modelingSession.getModel().createBpmnExclusiveGateway()
     gateway.setName(name)
-    gateway.setContainer(process)
+    _setContainer(gateway, process)
     return gateway
 
 def _createParallelGateway(process, name):
     gateway = modelingSession.getModel().createBpmnParallelGateway()
     gateway.setName(name)
-    gateway.setContainer(process)
+    _setContainer(gateway, process)
     return gateway
 
 def _createInclusiveGateway(process, name):
@@ -411,7 +845,7 @@ def _createInclusiveGateway(process, name):
         return _createExclusiveGateway(process, name)
     gateway = modelingSession.getModel().createBpmnInclusiveGateway()
     gateway.setName(name)
-    gateway.setContainer(process)
+    _setContainer(gateway, process)
     return gateway
 
 def _createComplexGateway(process, name):
@@ -419,7 +853,7 @@ def _createComplexGateway(process, name):
         return _createExclusiveGateway(process, name)
     gateway = modelingSession.getModel().createBpmnComplexGateway()
     gateway.setName(name)
-    gateway.setContainer(process)
+    _setContainer(gateway, process)
     return gateway
 
 def _createEventBasedGateway(process, name):
@@ -427,27 +861,27 @@ def _createEventBasedGateway(process, name):
         return _createExclusiveGateway(process, name)
     gateway = modelingSession.getModel().createBpmnEventBasedGateway()
     gateway.setName(name)
-    gateway.setContainer(process)
+    _setContainer(gateway, process)
     return gateway
 
 def _createDataObject(process, name):
     if not _DATA_OBJECTS_AVAILABLE:
-        print "ERROR: BpmnDataObject not available"
+        _log.error("ERROR: BpmnDataObject not available")
         return None
     try:
         dataObj = modelingSession.getModel().createBpmnDataObject()
         dataObj.setName(name)
-        dataObj.setContainer(process)
+        _setContainer(dataObj, process)
         return dataObj
     except Exception as e:
-        print "ERROR creating data object: " + str(e)
+        _log.error("ERROR creating data object: " + str(e))
         return None
 
 def _createSequenceFlow(process, source, target, guard=""):
     flow = modelingSession.getModel().createBpmnSequenceFlow()
     flow.setSourceRef(source)
     flow.setTargetRef(target)
-    flow.setContainer(process)
+    _setContainer(flow, process)
     if guard:
         flow.setName(guard)
         try:
@@ -458,15 +892,15 @@ def _createSequenceFlow(process, source, target, guard=""):
 
 def _createDataAssociation(process, source, target):
     if not _DATA_OBJECTS_AVAILABLE:
-        print "ERROR: BpmnDataAssociation not available"
+        _log.error("ERROR: BpmnDataAssociation not available")
         return None
-    sourceIsData = isinstance(source, BpmnDataObject)
-    targetIsData = isinstance(target, BpmnDataObject)
+    sourceIsData = isinstance(_unwrap(source), BpmnDataObject)
+    targetIsData = isinstance(_unwrap(target), BpmnDataObject)
     if sourceIsData and targetIsData:
-        print "ERROR: Both source and target are DataObjects"
+        _log.error("ERROR: Both source and target are DataObjects")
         return None
     if not sourceIsData and not targetIsData:
-        print "ERROR: Neither source nor target is a DataObject"
+        _log.error("ERROR: Neither source nor target is a DataObject")
         return None
     try:
         assoc = modelingSession.getModel().createBpmnDataAssociation()
@@ -478,7 +912,7 @@ def _createDataAssociation(process, source, target):
             assoc.setStartingActivity(source)
         return assoc
     except Exception as e:
-        print "ERROR creating data association: " + str(e)
+        _log.error("ERROR creating data association: " + str(e))
         return None
 
 _ELEMENT_CREATORS = {
@@ -499,6 +933,8 @@ _ELEMENT_CREATORS = {
     TIMER_CATCH: _createTimerCatchEvent,
     SIGNAL_CATCH: _createSignalCatchEvent,
     SIGNAL_THROW: _createSignalThrowEvent,
+    LINK_CATCH: _createLinkCatchEvent,
+    LINK_THROW: _createLinkThrowEvent,
     TASK: _createTask,
     USER_TASK: _createUserTask,
     SERVICE_TASK: _createServiceTask,
@@ -507,6 +943,7 @@ _ELEMENT_CREATORS = {
     BUSINESS_RULE_TASK: _createBusinessRuleTask,
     SEND_TASK: _createSendTask,
     RECEIVE_TASK: _createReceiveTask,
+    SUB_PROCESS: _createSubProcess,
     EXCLUSIVE_GW: _createExclusiveGateway,
     PARALLEL_GW: _createParallelGateway,
     INCLUSIVE_GW: _createInclusiveGateway,
@@ -520,9 +957,35 @@ def _createElement(process, name, elementType):
     if creator:
         return creator(process, name)
     else:
-        print "ERROR: Unknown element type: " + str(elementType)
+        _log.error("ERROR: Unknown element type: " + str(elementType))
         return None
 
+# Config keys "Name##2", "Name##3", ... create more elements displayed as "Name"
+_DUPLICATE_MARK = "##"
+
+def _displayName(key):
+    """Name shown in the diagram for a config key ("Review##2" -> "Review")."""
+    return key.split(_DUPLICATE_MARK, 1)[0]
+
+class _ElementRecord(object):
+    """
+    One created element: config key, type, lane index (into the lanes
+    list, -1 for none), isData (a data object: positioned as one, and one
+    end of every data association), model reference, planned (x, relY, w, h),
+    graphic and the (x, y, w, h) it was placed at.
+    """
+    __slots__ = ("key", "type", "lane", "isData", "ref", "planned", "graphic", "box")
+
+    def __init__(self, key, elemType, lane, ref, isData):
+        self.key = key
+        self.type = elemType
+        self.lane = lane
+        self.isData = isData
+        self.ref = ref
+        self.planned = None
+        self.graphic = None
+        self.box = None
+
 
 # ============================================================================
 # DIAGRAM UTILITIES
@@ -598,15 +1061,15 @@ def _waitForElements(diagramHandle, elements, config):
         
         foundCount = len(elementGraphics)
         if foundCount == totalElements:
-            print "  [Attempt " + str(attempt) + "] All " + str(foundCount) + " elements ready"
+            _log.verbose("  [Attempt " + str(attempt) + "] All " + str(foundCount) + " elements ready")
             return elementGraphics, attempt
-        else:
+        elif _log.enabled(LOG_VERBOSE):
             missing = [e.getName()[:12] for e in elements if e.getName() not in elementGraphics]
-            print "  [Attempt " + str(attempt) + "] Found: " + str(foundCount) + "/" + str(totalElements) + " | Missing: " + ", ".join(missing[:5]) + "..."
+            _log.verbose("  [Attempt " + str(attempt) + "] Found: " + str(foundCount) + "/" + str(totalElements) + " | Missing: " + ", ".join(missing[:5]) + "...")
         
         time.sleep(waitTimeMs / 1000.0)
     
-    print "  [Attempt " + str(attempt) + "] TIMEOUT - " + str(len(elementGraphics)) + "/" + str(totalElements) + " elements"
+    _log.error("  [Attempt " + str(attempt) + "] TIMEOUT - " + str(len(elementGraphics)) + "/" + str(totalElements) + " elements")
     return elementGraphics, attempt
 
 def _unmaskMissingElements(diagramHandle, elements, elementGraphics, lanes, elementLanes):
@@ -628,15 +1091,1392 @@ def _unmaskMissingElements(diagramHandle, elements, elementGraphics, lanes, elem
                 if result and result.size() > 0:
                     elementGraphics[name] = result.get(0)
                     unmaskedCount += 1
-                    print "  [Unmask] " + name + " -> Y=" + str(targetY) + " (" + laneName + "): OK"
+                    _log.verbose("  [Unmask] " + name + " -> Y=" + str(targetY) + " (" + laneName + "): OK")
                 else:
-                    print "  [Unmask] " + name + " -> Y=" + str(targetY) + " (" + laneName + "): FAILED"
+                    _log.error("  [Unmask] " + name + " -> Y=" + str(targetY) + " (" + laneName + "): FAILED")
             except Exception as e:
-                print "  [Unmask] " + name + ": ERROR - " + str(e)
+                _log.error("  [Unmask] " + name + ": ERROR - " + str(e))
     
     return unmaskedCount
 
 
+# ============================================================================
+# CONFIG VALIDATION
+# ============================================================================
+
+_START_TYPES = set([START, MESSAGE_START, TIMER_START, SIGNAL_START, CONDITIONAL_START])
+_END_TYPES = set([END, MESSAGE_END, SIGNAL_END, TERMINATE_END, ERROR_END])
+
+# A piece of a sharded process starts at its link catch events and ends at its link throws
+_ENTRY_TYPES = _START_TYPES | set([LINK_CATCH])
+_EXIT_TYPES = _END_TYPES | set([LINK_THROW])
+
+def _validateConfig(config):
+    """
+    Check a config before anything is created. Returns a list of problems
+    (empty list: config is fine):
+    - unknown element types, duplicate names, unknown or duplicate lanes
+    - flows and data associations with unknown endpoints
+    - flow elements not reachable from a start event or not reaching an end event
+    - the same, prefixed with the element name, in sub-process configs
+    Runs in O(V+E).
+    """
+    problems = []
+    laneOrder = config.get("lanes", [])
+    laneNames = set(laneOrder)
+    elementDefs = config.get("elements", [])
+    laneRelative = bool(elementDefs) and len(elementDefs[0]) >= 7
+    types = {}
+    dataNames = set()
+
+    if (config.get("SHARD_SIZE") or config.get("SHARD_COLUMNS")) and laneRelative:
+        problems.append("SHARD_SIZE and SHARD_COLUMNS need a column-based config (layout columns)")
+
+    if config.get("NAMING", BPMN_DEFAULT_CONFIG["NAMING"]) not in _NAMING_MODES:
+        problems.append("Unknown NAMING " + repr(config["NAMING"]) + " (use " + " or ".join(_NAMING_MODES) + ")")
+
+    if len(laneNames) != len(laneOrder):
+        seen = set()
+        for laneName in laneOrder:
+            if laneName in seen:
+                problems.append("Duplicate lane: " + str(laneName))
+            seen.add(laneName)
+
+    for elemDef in elementDefs:
+        name, elemType, laneName = elemDef[0], elemDef[1], elemDef[2]
+        if name in types:
+            problems.append("Duplicate name: " + name + " (use \"" + name + _DUPLICATE_MARK + "2\" for a second element shown as " + name + ")")
+        if elemType not in _ELEMENT_CREATORS:
+            problems.append("Unknown element type " + str(elemType) + ": " + name)
+        if laneName not in laneNames:
+            problems.append("Unknown lane '" + str(laneName) + "': " + name)
+        types[name] = elemType
+
+    subProcesses = config.get("sub_processes", {})
+    for name in sorted(subProcesses):
+        if types.get(name) != SUB_PROCESS:
+            problems.append("sub_processes entry " + name + ": not a SUB_PROCESS element")
+            continue
+        for problem in _validateConfig(subProcesses[name]):
+            problems.append(name + ": " + problem)
+
+    for dataDef in config.get("data_objects", []):
+        name, laneName = dataDef[0], dataDef[1]
+        if name in types:
+            problems.append("Duplicate name: " + name + " (use \"" + name + _DUPLICATE_MARK + "2\" for a second element shown as " + name + ")")
+        if laneName not in laneNames:
+            problems.append("Unknown lane '" + str(laneName) + "': " + name)
+        types[name] = DATA_OBJECT
+        dataNames.add(name)
+
+    outgoing = {}
+    incoming = {}
+    for flowDef in config.get("flows", []):
+        srcName, tgtName = flowDef[0], flowDef[1]
+        missing = [n for n in (srcName, tgtName) if n not in types]
+        if missing:
+            problems.append("Flow " + srcName + " -> " + tgtName + ": unknown element " + missing[0])
+            continue
+        outgoing.setdefault(srcName, []).append(tgtName)
+        incoming.setdefault(tgtName, []).append(srcName)
+
+    for assocDef in config.get("data_associations", []):
+        srcName, tgtName = assocDef[0], assocDef[1]
+        missing = [n for n in (srcName, tgtName) if n not in types]
+        if missing:
+            problems.append("Data association " + srcName + " -> " + tgtName + ": unknown element " + missing[0])
+        elif (srcName in dataNames) == (tgtName in dataNames):
+            problems.append("Data association " + srcName + " -> " + tgtName + ": needs exactly one data object")
+
+    # Reachability: forward from start events, backward from end events
+    flowNodes = [e[0] for e in elementDefs]
+    starts = [n for n in flowNodes if types[n] in _ENTRY_TYPES]
+    ends = [n for n in flowNodes if types[n] in _EXIT_TYPES]
+    if flowNodes and not starts:
+        problems.append("No start event")
+    if flowNodes and not ends:
+        problems.append("No end event")
+    if starts and ends:
+        fromStart = _reachable(starts, outgoing)
+        toEnd = _reachable(ends, incoming)
+        for name in flowNodes:
+            if name not in fromStart:
+                problems.append("Not reachable from a start event: " + name)
+            elif name not in toEnd:
+                problems.append("Cannot reach an end event: " + name)
+
+    return problems
+
+def _reachable(roots, edges):
+    seen = set(roots)
+    pending = list(roots)
+    while pending:
+        for nextName in edges.get(pending.pop(), ()):
+            if nextName not in seen:
+                seen.add(nextName)
+                pending.append(nextName)
+    return seen
+
+
+# ============================================================================
+# LAYOUT PLANNING
+# ============================================================================
+
+# Task-sized elements (sub-processes are shown collapsed, as a task)
+_TASK_TYPES = set([TASK, USER_TASK, SERVICE_TASK, MANUAL_TASK, SCRIPT_TASK,
+                   BUSINESS_RULE_TASK, SEND_TASK, RECEIVE_TASK, SUB_PROCESS])
+
+# Column-based layout constants
+_TASK_TOP_OFFSET = 20       # Gap between lane top and the first row
+_STACKING_OFFSET = 90       # Vertical offset between auto-stacked elements
+_NODE_HEIGHT_ESTIMATE = 40  # Events/gateways (real size known only after unmask)
+_LANE_BOTTOM_PADDING = 20   # Gap between the lowest element and the lane bottom
+_OVERLAP_GAP = 10           # Gap below a box when an overlapping one is moved down
+_DATA_ROW_GAP = 20          # Vertical gap between data object rows (room for labels)
+_MIN_COLUMN_GAP = 30        # Adaptive columns: gap when TASK_WIDTH exceeds SPACING
+_MIN_COLUMN_WIDTH = 90      # Adaptive columns: room for a gateway and its branch labels
+
+# Event types created together with an event definition
+_EVENT_DEFINITION_TYPES = set([MESSAGE_START, TIMER_START, SIGNAL_START, CONDITIONAL_START,
+                               MESSAGE_END, SIGNAL_END, TERMINATE_END, ERROR_END,
+                               MESSAGE_CATCH, MESSAGE_THROW, TIMER_CATCH, SIGNAL_CATCH, SIGNAL_THROW,
+                               LINK_CATCH, LINK_THROW])
+
+_LAYOUT_KEYS = ["SPACING", "START_X", "TASK_WIDTH", "TASK_HEIGHT", "WAIT_TIME_MS", "MAX_ATTEMPTS",
+                "DATA_WIDTH", "DATA_HEIGHT", "DATA_OFFSET_X", "DATA_OFFSET_Y"]
+
+def _layoutSettings(config):
+    cfg = dict(BPMN_DEFAULT_CONFIG)
+    for key in _LAYOUT_KEYS:
+        if key in config:
+            cfg[key] = config[key]
+    return cfg
+
+def _parseLayoutEntry(entry):
+    if isinstance(entry, tuple):
+        return entry[0], entry[1]
+    else:
+        return entry, 0
+
+def _planLayout(config, cfg):
+    """
+    Compute element positions from a config without touching the model.
+
+    Returns a plan dict:
+      "laneRelative": True for configs with exact positions (from export)
+      "lanes":        lane names in order
+      "laneMembers":  {lane: [name, ...]} flow elements, then data objects
+      "types":        {name: element type} of every element that will be created
+      "columns":      {name: column} (column-based configs)
+      "positions":    {name: (x, relY, w, h)} with relY from the lane top;
+                      w/h None keeps the size Modelio gives the element
+      "laneBottoms":  {lane: bottom relY of the flow elements} (column-based)
+      "laneHeights":  {lane: height that fits the lane content} from the
+                      positions, or the "lane_bounds" heights of exported configs
+      "stacks":       [(lane, column, [(name, yOffset), ...])] auto-stacked columns
+      "nudged":       [(lane, name, dy)] elements moved down to resolve overlaps
+      "skipped":      {name: reason} lane members that will not be positioned
+    """
+    laneOrder = list(config.get("lanes", []))
+    elementDefs = config.get("elements", [])
+    laneRelative = bool(elementDefs) and len(elementDefs[0]) >= 7
+
+    flowMembers = dict((laneName, []) for laneName in laneOrder)
+    dataMembers = dict((laneName, []) for laneName in laneOrder)
+    types = {}
+    exactPositions = {}  # name -> (x, y_offset, w, h) from exported configs
+    dataColumns = {}
+
+    for elemDef in elementDefs:
+        name, elemType, laneName = elemDef[0], elemDef[1], elemDef[2]
+        if len(elemDef) >= 7:
+            exactPositions[name] = tuple(elemDef[3:7])
+        if elemType not in _ELEMENT_CREATORS:
+            continue
+        types[name] = elemType
+        if laneName in flowMembers:
+            flowMembers[laneName].append(name)
+
+    if _DATA_OBJECTS_AVAILABLE:
+        for dataDef in config.get("data_objects", []):
+            name, laneName = dataDef[0], dataDef[1]
+            if len(dataDef) >= 6:
+                exactPositions[name] = tuple(dataDef[2:6])
+                dataColumns[name] = 0  # Placeholder, not used with extended positioning
+            else:
+                dataColumns[name] = dataDef[2]
+            types[name] = DATA_OBJECT
+            if laneName in dataMembers:
+                dataMembers[laneName].append(name)
+
+    laneMembers = dict((laneName, flowMembers[laneName] + dataMembers[laneName]) for laneName in laneOrder)
+    columns = {}
+    positions = {}
+    laneBottoms = {}
+    stacks = []
+    skipped = {}
+
+    taskWidth = cfg["TASK_WIDTH"]
+    taskHeight = cfg["TASK_HEIGHT"]
+
+    if laneRelative:
+        for laneName in laneOrder:
+            for name in laneMembers[laneName]:
+                if name not in exactPositions:
+                    skipped[name] = "no position data"
+                    continue
+                x, yOffset, w, h = exactPositions[name]
+                # Apply minimum task size from config (for tasks only)
+                if types[name] in _TASK_TYPES:
+                    w = max(w, taskWidth)
+                    h = max(h, taskHeight)
+                positions[name] = (x, yOffset, w, h)
+        exportedHeights = dict((b["name"], b["h"]) for b in config.get("lane_bounds", []))
+        laneHeights = _planLaneHeights(laneOrder, laneMembers, positions, exportedHeights)
+        return {"laneRelative": True, "lanes": laneOrder, "laneMembers": laneMembers, "types": types,
+                "columns": columns, "positions": positions, "laneBottoms": laneBottoms,
+                "laneHeights": laneHeights, "stacks": stacks, "nudged": [], "skipped": skipped}
+
+    layoutConfig = config.get("layout", {})
+    spacing = cfg["SPACING"]
+    startX = cfg["START_X"]
+    resolveOverlaps = config.get("RESOLVE_OVERLAPS", BPMN_DEFAULT_CONFIG["RESOLVE_OVERLAPS"])
+    nudged = []
+    if config.get("ADAPTIVE_COLUMNS", BPMN_DEFAULT_CONFIG["ADAPTIVE_COLUMNS"]):
+        columnX = _planColumnXs(layoutConfig, types, config.get("data_objects", []), cfg)
+    else:
+        columnX = {}
+
+    def colX(col):
+        if col in columnX:
+            return columnX[col]
+        return startX + spacing * col
+
+    for laneName in laneOrder:
+        # Auto-stacking: elements sharing a lane and column get 0, 90, 180, ...
+        # unless every one of them has an explicit y_offset
+        columnElements = {}
+        for name in flowMembers[laneName]:
+            if name in layoutConfig:
+                col, explicitYOffset = _parseLayoutEntry(layoutConfig[name])
+                columns[name] = col
+                columnElements.setdefault(col, []).append((name, explicitYOffset))
+
+        yOffsets = {}
+        for col in sorted(columnElements.keys()):
+            elemList = columnElements[col]
+            if len(elemList) == 1 or all(offset != 0 for _, offset in elemList):
+                for name, offset in elemList:
+                    yOffsets[name] = offset
+                continue
+            for idx, (name, explicitOffset) in enumerate(elemList):
+                yOffsets[name] = explicitOffset if explicitOffset != 0 else idx * _STACKING_OFFSET
+            stacks.append((laneName, col, [(n, yOffsets[n]) for n, _ in elemList]))
+
+        # Flow elements; data objects go below the lowest of them
+        for name in flowMembers[laneName]:
+            if name not in yOffsets:
+                skipped[name] = "no layout entry"
+                continue
+            relY = _TASK_TOP_OFFSET + yOffsets[name]
+            if types[name] in _TASK_TYPES:
+                positions[name] = (colX(columns[name]), relY, taskWidth, taskHeight)
+            else:
+                positions[name] = (colX(columns[name]), relY, None, None)
+        placed = [n for n in flowMembers[laneName] if n in positions]
+        if resolveOverlaps:
+            nudged.extend((laneName, n, dy) for n, dy in _resolveOverlaps(placed, positions, spacing))
+
+        laneBottom = _TASK_TOP_OFFSET + taskHeight  # Default: one task height
+        for name in placed:
+            _, relY, _, h = positions[name]
+            laneBottom = max(laneBottom, relY + (h if h is not None else _NODE_HEIGHT_ESTIMATE))
+        laneBottoms[laneName] = laneBottom
+
+        # Data objects: rows below the flow elements, as few rows as possible
+        for name in dataMembers[laneName]:
+            columns[name] = dataColumns[name]
+        rows = _packDataRows(dataMembers[laneName], dict(
+            (n, colX(dataColumns[n]) + cfg["DATA_OFFSET_X"]) for n in dataMembers[laneName]), cfg["DATA_WIDTH"])
+        for name in dataMembers[laneName]:
+            x, row = rows[name]
+            positions[name] = (x, laneBottom + cfg["DATA_OFFSET_Y"] + row * (cfg["DATA_HEIGHT"] + _DATA_ROW_GAP),
+                               cfg["DATA_WIDTH"], cfg["DATA_HEIGHT"])
+        if resolveOverlaps:
+            nudged.extend((laneName, n, dy) for n, dy in _resolveOverlaps(dataMembers[laneName], positions, spacing))
+
+    laneHeights = _planLaneHeights(laneOrder, laneMembers, positions, {})
+    return {"laneRelative": False, "lanes": laneOrder, "laneMembers": laneMembers, "types": types,
+            "columns": columns, "positions": positions, "laneBottoms": laneBottoms,
+            "laneHeights": laneHeights, "stacks": stacks, "nudged": nudged, "skipped": skipped}
+
+def _planColumnXs(layoutConfig, types, dataObjectDefs, cfg):
+    """
+    X of every integer column from 0 to the highest one used: each column is
+    as wide as its widest element plus the gap between columns (SPACING minus
+    TASK_WIDTH, or _MIN_COLUMN_GAP when tasks are wider than SPACING), and
+    never narrower than _MIN_COLUMN_WIDTH (or SPACING if smaller). Columns
+    without elements take the minimum width, so skipped column indices still
+    add some space. With default sizes, task columns keep their SPACING width.
+    """
+    taskWidth = cfg["TASK_WIDTH"]
+    gap = cfg["SPACING"] - taskWidth
+    if gap <= 0:
+        gap = _MIN_COLUMN_GAP
+    minWidth = min(_MIN_COLUMN_WIDTH, cfg["SPACING"])
+    widest = {}
+    for name, entry in layoutConfig.items():
+        if name not in types:
+            continue
+        col = _parseLayoutEntry(entry)[0]
+        width = taskWidth if types[name] in _TASK_TYPES else _NODE_HEIGHT_ESTIMATE
+        widest[col] = max(widest.get(col, 0), width)
+    for dataDef in dataObjectDefs:
+        if len(dataDef) < 6:
+            widest.setdefault(dataDef[2], 0)
+    lastCol = max([c for c in widest if isinstance(c, (int, long))] or [-1])
+
+    columnX = {}
+    x = cfg["START_X"]
+    for col in range(0, lastCol + 1):
+        columnX[col] = x
+        x += max(widest.get(col, 0) + gap, minWidth)
+    return columnX
+
+def _packDataRows(names, xs, width):
+    """
+    Assign data objects to rows so that none overlap, using the fewest rows.
+
+    Interval partitioning: objects are taken by X (config order on ties) and
+    put in the first row whose last object ends at least _OVERLAP_GAP before
+    them. Greedy first-fit in start order is optimal for intervals.
+    Returns {name: (x, row)}.
+    """
+    rowEnds = []
+    rows = {}
+    for name in sorted(names, key=lambda n: xs[n]):
+        x = xs[name]
+        for row, end in enumerate(rowEnds):
+            if end + _OVERLAP_GAP <= x:
+                break
+        else:
+            row = len(rowEnds)
+            rowEnds.append(None)
+        rowEnds[row] = x + width
+        rows[name] = (x, row)
+    return rows
+
+def _resolveOverlaps(names, positions, cellSize):
+    """
+    Move overlapping boxes of one lane apart, in O(n) expected time.
+
+    Boxes are taken in the given order and checked against the ones already
+    placed through a grid index; a box that overlaps is moved down below the
+    boxes it hits (plus _OVERLAP_GAP) until it is free. Columns are kept.
+    Updates positions and returns [(name, dy)] for the moved boxes.
+    """
+    index = _GridIndex(cellSize)
+    moved = []
+    for name in names:
+        x, relY, w, h = positions[name]
+        box = (x, relY, w if w is not None else _NODE_HEIGHT_ESTIMATE, h if h is not None else _NODE_HEIGHT_ESTIMATE)
+        hits = index.query(box)
+        while hits:
+            box = (box[0], max(index.rects[k][1] + index.rects[k][3] for k in hits) + _OVERLAP_GAP, box[2], box[3])
+            hits = index.query(box)
+        index.insert(name, box)
+        if box[1] != relY:
+            positions[name] = (x, box[1], w, h)
+            moved.append((name, box[1] - relY))
+    return moved
+
+def _planLaneHeights(laneOrder, laneMembers, positions, exportedHeights):
+    laneHeights = {}
+    for laneName in laneOrder:
+        if laneName in exportedHeights:
+            laneHeights[laneName] = exportedHeights[laneName]
+            continue
+        bottom = 0
+        for name in laneMembers[laneName]:
+            if name in positions:
+                _, relY, _, h = positions[name]
+                bottom = max(bottom, relY + (h if h is not None else _NODE_HEIGHT_ESTIMATE))
+        if bottom:
+            laneHeights[laneName] = bottom + _LANE_BOTTOM_PADDING
+    return laneHeights
+
+
+# ============================================================================
+# SPATIAL INDEX
+# ============================================================================
+
+def _rectsIntersect(a, b):
+    """True if rectangles (x, y, w, h) overlap; touching edges do not count."""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+class _GridIndex(object):
+    """
+    Uniform-grid spatial index of rectangles (x, y, w, h) by key. A rectangle
+    is filed under every cell it touches, so with cells about the size of a
+    column, inserts and queries are O(1) expected.
+    """
+
+    def __init__(self, cellSize):
+        self.cellSize = float(max(cellSize, 1))
+        self.cells = {}
+        self.rects = {}
+
+    def _cells(self, rect):
+        size = self.cellSize
+        x0, x1 = int(rect[0] // size), int((rect[0] + rect[2]) // size)
+        y0, y1 = int(rect[1] // size), int((rect[1] + rect[3]) // size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield (cx, cy)
+
+    def insert(self, key, rect):
+        self.rects[key] = rect
+        for cell in self._cells(rect):
+            self.cells.setdefault(cell, []).append(key)
+
+    def remove(self, key):
+        rect = self.rects.pop(key, None)
+        if rect is not None:
+            for cell in self._cells(rect):
+                self.cells[cell].remove(key)
+
+    def query(self, rect, ignore=()):
+        """Keys of the stored rectangles overlapping rect."""
+        found = set()
+        for cell in self._cells(rect):
+            for key in self.cells.get(cell, ()):
+                if key not in found and key not in ignore and _rectsIntersect(rect, self.rects[key]):
+                    found.add(key)
+        return found
+
+
+# ============================================================================
+# FLOW ROUTING
+# ============================================================================
+
+_GATEWAY_TYPES = set([EXCLUSIVE_GW, PARALLEL_GW, INCLUSIVE_GW, COMPLEX_GW, EVENT_BASED_GW])
+
+_ROUTE_MARGIN = 15   # Distance kept between a route and the elements it passes
+_CHANNEL_STEP = 8    # Offset between vertical segments sharing a channel
+_CHANNEL_TRIES = 4
+
+def _segmentRect(p, q):
+    return (min(p[0], q[0]), min(p[1], q[1]), abs(p[0] - q[0]), abs(p[1] - q[1]))
+
+def _routeHits(points, index, ends):
+    hits = set()
+    for k in range(len(points) - 1):
+        hits |= index.query(_segmentRect(points[k], points[k + 1]), ends)
+    return len(hits)
+
+def _simplifyRoute(points):
+    """Drop repeated points and middle points of straight runs."""
+    result = []
+    for point in points:
+        point = (int(point[0]), int(point[1]))
+        if result and point == result[-1]:
+            continue
+        if len(result) >= 2:
+            a, b = result[-2], result[-1]
+            if (a[0] == b[0] == point[0]) or (a[1] == b[1] == point[1]):
+                result[-1] = point
+                continue
+        result.append(point)
+    return result
+
+def _routeCandidates(source, target, sourceIsGateway, targetIsGateway, index, ends):
+    """Orthogonal routes from source to target box, preferred first."""
+    sx, sy, sw, sh = source
+    tx, ty, tw, th = target
+    scx, scy = sx + sw / 2.0, sy + sh / 2.0
+    tcx, tcy = tx + tw / 2.0, ty + th / 2.0
+    sRight, sBottom = sx + sw, sy + sh
+    tRight, tBottom = tx + tw, ty + th
+    m = _ROUTE_MARGIN
+    candidates = []
+
+    if tx >= sRight:
+        # Forward: leave right, enter left
+        if abs(scy - tcy) < 1:
+            candidates.append([(sRight, scy), (tx, scy)])
+        if sourceIsGateway and abs(scy - tcy) >= sh / 2.0:
+            exitY = sBottom if tcy > scy else sy
+            candidates.append([(scx, exitY), (scx, tcy), (tx, tcy)])
+        if targetIsGateway and abs(scy - tcy) >= th / 2.0:
+            entryY = ty if scy < tcy else tBottom
+            candidates.append([(sRight, scy), (tcx, scy), (tcx, entryY)])
+        for midX in (sRight + (tx - sRight) / 2.0, sRight + m, tx - m):
+            candidates.append([(sRight, scy), (midX, scy), (midX, tcy), (tx, tcy)])
+        if abs(scy - tcy) >= 1:
+            # Leave or enter vertically when a neighbor sits beside the target/source
+            entryY = ty if scy < tcy else tBottom
+            exitY = sBottom if tcy > scy else sy
+            candidates.append([(sRight, scy), (tcx, scy), (tcx, entryY)])
+            candidates.append([(scx, exitY), (scx, tcy), (tx, tcy)])
+        # Detours above or below whatever lies between the two elements
+        corridor = (sRight, min(scy, tcy), tx - sRight, abs(tcy - scy))
+        blockers = [index.rects[k] for k in index.query(corridor, ends)]
+        if blockers:
+            below = max(b[1] + b[3] for b in blockers) + m
+            above = min(b[1] for b in blockers) - m
+            for trackY in (below, above):
+                candidates.append([(sRight, scy), (sRight + m, scy), (sRight + m, trackY),
+                                   (tx - m, trackY), (tx - m, tcy), (tx, tcy)])
+        return candidates
+
+    if tx < sRight and tRight > sx:
+        # Same column: straight down or up, else along the right side
+        if ty >= sBottom:
+            midY = sBottom + (ty - sBottom) / 2.0
+            candidates.append([(scx, sBottom), (scx, midY), (tcx, midY), (tcx, ty)])
+        elif tBottom <= sy:
+            midY = tBottom + (sy - tBottom) / 2.0
+            candidates.append([(scx, sy), (scx, midY), (tcx, midY), (tcx, tBottom)])
+        sideX = max(sRight, tRight) + m
+        candidates.append([(sRight, scy), (sideX, scy), (sideX, tcy), (tRight, tcy)])
+
+    # Backward (loops): around the elements on a track below or above them,
+    # entering the target from above/below or from its left side
+    below = max(sBottom, tBottom) + m
+    above = min(sy, ty) - m
+    corridor = (min(tx, sx), min(sy, ty), max(sRight, tRight) - min(tx, sx), max(sBottom, tBottom) - min(sy, ty))
+    blockers = [index.rects[k] for k in index.query(corridor, ends)]
+    tracks = [(below, sBottom, tBottom), (above, sy, ty)]
+    if blockers:
+        tracks.append((max([below] + [b[1] + b[3] + m for b in blockers]), sBottom, tBottom))
+        tracks.append((min([above] + [b[1] - m for b in blockers]), sy, ty))
+    for trackY, exitY, entryY in tracks:
+        candidates.append([(scx, exitY), (scx, trackY), (tcx, trackY), (tcx, entryY)])
+        candidates.append([(scx, exitY), (scx, trackY), (tx - m, trackY), (tx - m, tcy), (tx, tcy)])
+    return candidates
+
+def _spreadChannels(points, channels, key):
+    """Move inner vertical segments off channels already used by other flows."""
+    points = list(points)
+    for k in range(1, len(points) - 2):
+        p, q = points[k], points[k + 1]
+        if p[0] != q[0]:
+            continue
+        for _ in range(_CHANNEL_TRIES):
+            probe = (p[0] - _CHANNEL_STEP / 2.0, min(p[1], q[1]), _CHANNEL_STEP, abs(q[1] - p[1]))
+            if not channels.query(probe):
+                break
+            p, q = (p[0] + _CHANNEL_STEP, p[1]), (q[0] + _CHANNEL_STEP, q[1])
+        points[k], points[k + 1] = p, q
+        channels.insert((key, k), _segmentRect(p, q))
+    return points
+
+def _planFlowRoutes(flowDefs, boxes, types, cellSize):
+    """
+    Plan orthogonal waypoints for sequence flows.
+
+    boxes maps element names to absolute (x, y, w, h). Returns
+    {flow index: [(x, y), ...]} from the source border to the target border
+    for flows whose ends are both placed. Candidate routes are checked against
+    a grid index of the boxes and the first one crossing no other element is
+    kept (else the one crossing fewest). Near-linear in the number of flows.
+    """
+    index = _GridIndex(cellSize)
+    for name, box in boxes.items():
+        index.insert(name, box)
+    channels = _GridIndex(cellSize)
+    routes = {}
+    for i, flowDef in enumerate(flowDefs):
+        srcName, tgtName = flowDef[0], flowDef[1]
+        if srcName == tgtName or srcName not in boxes or tgtName not in boxes:
+            continue
+        ends = (srcName, tgtName)
+        best, bestHits = None, None
+        for points in _routeCandidates(boxes[srcName], boxes[tgtName], types.get(srcName) in _GATEWAY_TYPES,
+                                       types.get(tgtName) in _GATEWAY_TYPES, index, ends):
+            points = _simplifyRoute(points)
+            hits = _routeHits(points, index, ends)
+            if bestHits is None or hits < bestHits:
+                best, bestHits = points, hits
+                if hits == 0:
+                    break
+        routes[i] = _simplifyRoute(_spreadChannels(best, channels, i))
+    return routes
+
+def _applyFlowRoutes(diagramHandle, createdFlows, routes):
+    """Set orthogonal routing and planned waypoints on the flow graphics."""
+    routed = 0
+    for index, flow in createdFlows:
+        points = routes.get(index)
+        dg = _getGraphics(diagramHandle, flow) if points else None
+        if dg is None:
+            continue
+        try:
+            dg.setRouterKind(IDiagramLink.LinkRouterKind.ORTHOGONAL)
+            path = dg.getPath()
+            path.setPoints([Draw2DPoint(x, y) for x, y in points])
+            dg.setPath(path)
+            routed += 1
+        except Exception as e:
+            _log.error("  [Route] flow " + str(index) + ": ERROR - " + str(e))
+    return routed
+
+
+# ============================================================================
+# GEOMETRY TRANSFORMS
+# ============================================================================
+
+class _Geometry(object):
+    """
+    Coordinates of a config with exact positions, as parallel arrays:
+    x, y_offset, width, height of the elements then the data objects, in
+    config order, and the lane heights in "lane_bounds" order.
+
+    Handles exported configs, both the CONFIG form (7-tuple elements,
+    6-tuple data objects) and the dict form returned by exportBPMNProcess
+    (element dicts with "x", "y_offset", "w", "h").
+    """
+
+    def __init__(self, config):
+        self.config = config
+        elements = config.get("elements", [])
+        self.exportForm = bool(elements) and isinstance(elements[0], dict)
+        if self.exportForm:
+            boxes = [(e["x"], e["y_offset"], e["w"], e["h"]) for e in elements]
+        else:
+            boxes = [tuple(e[3:7]) for e in elements] + [tuple(d[2:6]) for d in config.get("data_objects", [])]
+        self.xs = array("d", [b[0] for b in boxes])
+        self.ys = array("d", [b[1] for b in boxes])
+        self.ws = array("d", [b[2] for b in boxes])
+        self.hs = array("d", [b[3] for b in boxes])
+        self.laneHs = array("d", [b["h"] for b in config.get("lane_bounds", [])])
+        self.laneOrder = list(config.get("lanes", []))
+
+    def affine(self, sx, dx, sy, dy):
+        """x -> sx*x + dx, y -> sy*y + dy; sizes and lane heights scale."""
+        if (sx, dx, sy, dy) == (1, 0, 1, 0):
+            return
+        self.xs = array("d", [sx * v + dx for v in self.xs])
+        self.ys = array("d", [sy * v + dy for v in self.ys])
+        if sx != 1:
+            self.ws = array("d", [sx * v for v in self.ws])
+        if sy != 1:
+            self.hs = array("d", [sy * v for v in self.hs])
+            self.laneHs = array("d", [sy * v for v in self.laneHs])
+
+    def snap(self, grid):
+        """Round positions to the nearest multiple of grid."""
+        grid = float(grid)
+        self.xs = array("d", [round(v / grid) * grid for v in self.xs])
+        self.ys = array("d", [round(v / grid) * grid for v in self.ys])
+
+    def toConfig(self):
+        """New config with the transformed coordinates; the source is untouched."""
+        config = dict(self.config)
+        xs = [int(round(v)) for v in self.xs]
+        ys = [int(round(v)) for v in self.ys]
+        ws = [int(round(v)) for v in self.ws]
+        hs = [int(round(v)) for v in self.hs]
+        elements = self.config.get("elements", [])
+        if self.exportForm:
+            config["elements"] = [dict(e, x=xs[i], y_offset=ys[i], w=ws[i], h=hs[i]) for i, e in enumerate(elements)]
+        else:
+            config["elements"] = [tuple(e[:3]) + (xs[i], ys[i], ws[i], hs[i]) + tuple(e[7:])
+                                  for i, e in enumerate(elements)]
+            first = len(elements)
+            config["data_objects"] = [tuple(d[:2]) + (xs[first + i], ys[first + i], ws[first + i], hs[first + i])
+                                      + tuple(d[6:]) for i, d in enumerate(self.config.get("data_objects", []))]
+        if "lane_bounds" in self.config:
+            heights = dict((b["name"], int(round(h))) for b, h in zip(self.config["lane_bounds"], self.laneHs))
+            bounds = dict((b["name"], b) for b in self.config["lane_bounds"])
+            ordered = [n for n in self.laneOrder if n in bounds]
+            config["lane_bounds"] = [dict(bounds[n], h=heights[n]) for n in ordered]
+            if self.exportForm and ordered:
+                # Absolute lane tops: restack from the topmost lane
+                laneY = min(b["y"] for b in self.config["lane_bounds"])
+                for b in config["lane_bounds"]:
+                    b["y"] = laneY
+                    laneY += b["h"]
+        config["lanes"] = list(self.laneOrder)
+        return config
+
+def transformGeometry(config, operations):
+    """
+    Apply geometry operations to a config with exact positions (exported
+    configs) and return a new config; `config` is not modified.
+
+    operations: list of tuples, applied in order
+      ("translate", dx, dy)   move every element (y is relative to its lane)
+      ("scale", sx, sy)       scale positions and sizes; lane heights follow sy
+      ("snap", grid)          round positions to multiples of grid
+      ("lanes", [name, ...])  new lane order (same names); elements keep
+                              their lane-relative positions
+
+    Consecutive translate/scale operations are folded into one affine map,
+    so each array is rewritten once per snap at most. Returns None (with an
+    error logged) for column-based configs or unknown operations.
+    """
+    try:
+        return _transformGeometry(config, operations)
+    finally:
+        _log.flush()
+
+def _transformGeometry(config, operations):
+    elements = config.get("elements", [])
+    if elements and not isinstance(elements[0], dict) and len(elements[0]) < 7:
+        _log.error("transformGeometry: column-based config has no coordinates, nothing transformed")
+        return None
+
+    geometry = _Geometry(config)
+    sx, dx, sy, dy = 1, 0, 1, 0
+    for op in operations:
+        kind = op[0]
+        if kind == "translate":
+            dx, dy = dx + op[1], dy + op[2]
+        elif kind == "scale":
+            sx, dx, sy, dy = sx * op[1], dx * op[1], sy * op[2], dy * op[2]
+        elif kind == "snap":
+            geometry.affine(sx, dx, sy, dy)
+            sx, dx, sy, dy = 1, 0, 1, 0
+            geometry.snap(op[1])
+        elif kind == "lanes":
+            if sorted(op[1]) != sorted(geometry.laneOrder):
+                _log.error("transformGeometry: lane order must list the same lanes: " + str(op[1]))
+                return None
+            geometry.laneOrder = list(op[1])
+        else:
+            _log.error("transformGeometry: unknown operation " + str(kind))
+            return None
+    geometry.affine(sx, dx, sy, dy)
+    return geometry.toConfig()
+
+
+# ============================================================================
+# CHECKPOINT JOURNAL
+# ============================================================================
+
+def _journalPath(config):
+    """Journal file of a run: the RESUME or JOURNAL path, else bpmn_journal_<name>.jsonl."""
+    for key in ("RESUME", "JOURNAL"):
+        if isinstance(config.get(key), basestring):
+            return config[key]
+    return _profilePrefix(True, config.get("name", "Process"), "journal") + ".jsonl"
+
+class _Journal(object):
+    """
+    JSON-lines record of a run, one line per created model object and per
+    finished phase, flushed as it goes so it survives a failed run. A new
+    run starts the file afresh; a resumed run appends to it:
+      {"journal": 1, "config": ..., "process": ..., "id": ...}   header
+      {"lane": name, "id": uuid}     {"element": key, "id": uuid}
+      {"diagram": uuid}              {"flow": index, "id": uuid}
+      {"assoc": index}               {"done": phase[, "boxes": {...}]}
+      {"subdiagram": path}           {"subprocess": path}
+    A sub-process path is its name below the process ("Assess/Inspect");
+    subdiagram marks its diagram closed, subprocess its whole tree finished.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.out = open(path, "a" if append else "w")
+
+    def write(self, **entry):
+        self.out.write(json.dumps(entry, sort_keys=True) + "\n")
+        self.out.flush()
+
+    def created(self, kind, key, ref):
+        self.write(**{kind: key, "id": ref.getUuid()})
+
+    def done(self, phase, **extra):
+        extra["done"] = phase
+        self.write(**extra)
+
+class _NoJournal(object):
+    """Stand-in when JOURNAL is off: records nothing."""
+    path = None
+
+    def write(self, **entry):
+        pass
+
+    def created(self, kind, key, ref):
+        pass
+
+    def done(self, phase, **extra):
+        pass
+
+def _readJournal(path):
+    """
+    State of a journaled run: {"header", "lanes", "elements", "diagram",
+    "flows", "assocs", "done", "boxes", "subDiagrams", "subProcesses"}, or
+    None if there is no journal.
+    Only the last run in the file counts: a header line starts over. A
+    truncated last line (run killed while writing) is ignored.
+    """
+    try:
+        source = open(path)
+    except IOError:
+        return None
+    state = None
+    for line in source:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if "journal" in entry:
+            state = {"header": entry, "lanes": {}, "elements": {}, "diagram": None,
+                     "flows": {}, "assocs": set(), "done": set(), "boxes": {},
+                     "subDiagrams": set(), "subProcesses": set()}
+        elif state is None:
+            continue
+        elif "lane" in entry:
+            state["lanes"][entry["lane"]] = entry["id"]
+        elif "element" in entry:
+            state["elements"][entry["element"]] = entry["id"]
+        elif "diagram" in entry:
+            state["diagram"] = entry["diagram"]
+        elif "flow" in entry:
+            state["flows"][entry["flow"]] = entry["id"]
+        elif "assoc" in entry:
+            state["assocs"].add(entry["assoc"])
+        elif "subdiagram" in entry:
+            state["subDiagrams"].add(entry["subdiagram"])
+        elif "subprocess" in entry:
+            state["subProcesses"].add(entry["subprocess"])
+        elif "done" in entry:
+            state["done"].add(entry["done"])
+            state["boxes"].update(entry.get("boxes", {}))
+    source.close()
+    return state
+
+def _existingObjects(process):
+    """{uuid: object} of the lanes, flow elements and diagrams of a process."""
+    existing = {}
+    laneSets = process.getLaneSet()
+    try:
+        laneSets = list(laneSets)
+    except TypeError:
+        laneSets = [laneSets] if laneSets else []
+    for laneSet in laneSets:
+        existing[laneSet.getUuid()] = laneSet
+        for lane in laneSet.getLane():
+            existing[lane.getUuid()] = lane
+    for elem in process.getFlowElement():
+        existing[elem.getUuid()] = elem
+    for diagram in process.getProduct():
+        existing[diagram.getUuid()] = diagram
+    return existing
+
+
+# ============================================================================
+# CONFIG STAMPS
+# ============================================================================
+
+# Processes are stamped in their description note with the hash of the config
+# that built them; runs are named <name>_<executionId>
+_STAMP_NOTE = ("ModelerModule", "description")
+_STAMP_LINE = re.compile(r'^bpmn-config: ([0-9a-f]+) (\d+)$', re.M)
+_RUN_SUFFIX = re.compile(r'^(.*)_(\d+)$')
+
+# Keys that change how a run behaves but not the diagram it builds
+_UNSTAMPED_KEYS = set(["LOG_LEVEL", "PROFILE", "TRACE", "DRY_RUN", "VALIDATE", "JOURNAL", "RESUME",
+                       "STAMP", "SKIP_UNCHANGED", "NAMING", "DEFER_SUB_PROCESSES",
+                       "SHARD_SIZE", "SHARD_COLUMNS", "WAIT_TIME_MS", "MAX_ATTEMPTS"])
+
+def configHash(config):
+    """
+    SHA-1 of a normalized config: defaults filled in, run-only keys dropped,
+    tuples and lists alike, keys sorted. Includes the helper version, since
+    a new version may lay out the same config differently.
+    """
+    normalized = dict(BPMN_DEFAULT_CONFIG)
+    normalized.update(config)
+    for key in _UNSTAMPED_KEYS:
+        normalized.pop(key, None)
+    text = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(("BPMN_Helpers " + BPMN_HELPERS_VERSION + "\n" + text).encode("utf-8")).hexdigest()
+
+def _readStamp(process):
+    """(hash, created epoch seconds) from a process description, or None."""
+    try:
+        note = process.getNoteContent(*_STAMP_NOTE)
+    except Exception:
+        return None
+    match = _STAMP_LINE.search(note or "")
+    return (match.group(1), int(match.group(2))) if match else None
+
+def _writeNoteLine(element, pattern, line):
+    """Put a line in the description note, replacing the one matching pattern and keeping any other text."""
+    try:
+        note = pattern.sub("", element.getNoteContent(*_STAMP_NOTE) or "").strip()
+        element.putNoteContent(_STAMP_NOTE[0], _STAMP_NOTE[1], (note + "\n" + line).strip())
+    except Exception as e:
+        _log.error("Could not write the description of " + element.getName() + ": " + str(e))
+
+def _writeStamp(process, digest):
+    """Put the stamp line in the description note, keeping any other text."""
+    _writeNoteLine(process, _STAMP_LINE, "bpmn-config: " + digest + " " + str(int(time.time())))
+
+def _indexProcesses(package):
+    """
+    {base name: [(process, stamp), ...]} for the processes directly in a
+    package, in one scan; base name strips the _<executionId> run suffix and
+    each list is in package order.
+    """
+    index = {}
+    for elem in package.getOwnedElement():
+        if not isinstance(elem, BpmnProcess):
+            continue
+        name = elem.getName()
+        match = _RUN_SUFFIX.match(name)
+        base = match.group(1) if match else name
+        index.setdefault(base, []).append((elem, _readStamp(elem)))
+    return index
+
+def _findUnchanged(config, digest, index):
+    """Newest process in the index built from a config with this hash, or None."""
+    matches = [(stamp[1], n, proc) for n, (proc, stamp) in enumerate(index.get(config.get("name", "Process"), []))
+               if stamp and stamp[0] == digest and proc.isValid()]
+    return max(matches)[2] if matches else None
+
+
+# ============================================================================
+# PROCESS NAMES
+# ============================================================================
+
+_NAMING_MODES = ("timestamp", "sequence")
+
+class _NameIndex(object):
+    """
+    Names of the elements in a package, scanned once. allocate() returns a
+    free <name>_<suffix> and reserves it in O(1), under a lock so one index
+    can be shared by a whole batch and its threads.
+
+    "timestamp" suffixes start from the millisecond clock (mod 100000) and
+    step past taken ones; "sequence" suffixes continue after the highest
+    suffix of that name in the package, so reruns get predictable names.
+    """
+
+    def __init__(self, package):
+        self.used = set()
+        self.highest = {}
+        self.lock = threading.Lock()
+        if package is None:
+            return
+        for elem in package.getOwnedElement():
+            name = elem.getName()
+            self.used.add(name)
+            match = _RUN_SUFFIX.match(name)
+            if match:
+                base, suffix = match.group(1), int(match.group(2))
+                self.highest[base] = max(self.highest.get(base, 0), suffix)
+
+    def allocate(self, base, naming="timestamp"):
+        with self.lock:
+            if naming == "sequence":
+                suffix = self.highest.get(base, 0) + 1
+            else:
+                suffix = int(time.time() * 1000) % 100000
+            name = base + "_" + str(suffix)
+            while name in self.used:
+                suffix += 1
+                name = base + "_" + str(suffix)
+            self.used.add(name)
+            self.highest[base] = max(self.highest.get(base, 0), suffix)
+            return name
+
+
+# ============================================================================
+# PROCESS CLEANUP
+# ============================================================================
+
+def _processReferences(process):
+    """Participants, call activities and dependencies that point at a process."""
+    references = []
+    for getter in ("getParticipant", "getCaller", "getImpactedDependency"):
+        try:
+            references.extend(getattr(process, getter)())
+        except Exception:
+            pass    # Not in this metamodel version
+    return references
+
+def _staleProcesses(index, keep, keepReferenced):
+    """
+    [(base name, kept, stale)] from a process index, kept and stale being
+    [(process, stamp)] newest first. Only generated runs count, known by
+    their stamp: a hand-named "Order_1" is never a run. Newest is by stamp
+    time, then package order, since execution ids wrap around every 100 s.
+    """
+    groups = []
+    for base in sorted(index):
+        runs = [(stamp[1], n, proc, stamp) for n, (proc, stamp) in enumerate(index[base]) if stamp]
+        runs = [(proc, stamp) for created, n, proc, stamp in sorted(runs, reverse=True)]
+        kept, stale = runs[:keep], []
+        for run in runs[keep:]:
+            if keepReferenced and _processReferences(run[0]):
+                kept.append(run)
+            else:
+                stale.append(run)
+        if runs:
+            groups.append((base, kept, stale))
+    return groups
+
+def _runLabel(process, stamp):
+    """Process name with its stamp time, for cleanup listings."""
+    return process.getName() + " (" + time.strftime("%Y-%m-%d %H:%M", time.localtime(stamp[1])) + ")"
+
+def cleanupProcesses(package, options=None):
+    """
+    Delete stale runs of generated processes in a package, diagrams included.
+    Runs are grouped by base name (the name without _<executionId>); all but
+    the newest KEEP of each group go, except those still referenced with
+    KEEP_REFERENCED. With DRY_RUN (the default) nothing is deleted.
+
+    Returns {"deleted": [names], "kept": [names], "diagrams": count, "dryRun": bool}
+    """
+    options = dict(BPMN_CLEANUP_OPTIONS, **(options or {}))
+    _log.setLevel(options["LOG_LEVEL"])
+    dryRun = options["DRY_RUN"]
+    start = time.time()
+    groups = _staleProcesses(_indexProcesses(package), options["KEEP"], options["KEEP_REFERENCED"])
+
+    report = {"deleted": [], "kept": [], "diagrams": 0, "dryRun": dryRun}
+    transaction = None
+    if not dryRun and any(stale for base, kept, stale in groups):
+        transaction = modelingSession.createTransaction("Clean up BPMN processes in " + package.getName())
+    try:
+        for base, kept, stale in groups:
+            (_log.summary if stale else _log.verbose)(base + ": " + str(len(kept)) + " kept, " + str(len(stale)) +
+                                                      (" to delete" if dryRun else " deleted"))
+            for process, stamp in kept:
+                _log.verbose("  keep    " + _runLabel(process, stamp))
+                report["kept"].append(process.getName())
+            for process, stamp in stale:
+                diagrams = list(process.getProduct())
+                _log.summary("  delete  " + _runLabel(process, stamp) +
+                             (" + " + str(len(diagrams)) + " diagram(s)" if diagrams else ""))
+                report["deleted"].append(process.getName())
+                report["diagrams"] += len(diagrams)
+                if not dryRun:
+                    for diagram in diagrams:
+                        diagram.delete()
+                    process.delete()
+        if transaction:
+            transaction.commit()
+    finally:
+        if transaction:
+            transaction.close()
+
+    _log.summary(("Would delete " if dryRun else "Deleted ") + str(len(report["deleted"])) + " process(es) and " +
+                 str(report["diagrams"]) + " diagram(s), kept " + str(len(report["kept"])) +
+                 " (" + ("%.2f" % (time.time() - start)) + " s)")
+    if dryRun and report["deleted"]:
+        _log.summary("Dry run: set DRY_RUN to False to delete them")
+    _log.flush()
+    return report
+
+
+# ============================================================================
+# PROCESS DSL
+# ============================================================================
+#
+# A terse line format that parses into the same CONFIG dict:
+#
+#   process: Leave Request
+#   Employee: (Start) > Submit Request
+#   Manager: Submit Request > Review > Approved? yes:Approve | no:Reject
+#   Manager: Approve [service] > (Approved)
+#   Employee: Reject > (Rejected)
+#   data: Submit Request > Request Form > Review
+#
+# "Lane: a > b > c" chains elements with flows; "a | b" are parallel
+# alternatives, "guard:name" a labelled one. Elements take the lane of the
+# first line listing them unlabelled. Types: [tag] after the name, "Name?"
+# is an exclusive gateway, "(Name)" an event, anything else a user task.
+# "Quoted text" is taken literally: "Review: legal" is one name.
+# Columns follow the longest path from the start events.
+
+# [tag] -> element type; CONFIG constant names are accepted as tags too
+_DSL_TYPE_TAGS = {
+    "user": USER_TASK, "service": SERVICE_TASK, "manual": MANUAL_TASK, "script": SCRIPT_TASK,
+    "rule": BUSINESS_RULE_TASK, "send": SEND_TASK, "receive": RECEIVE_TASK, "task": TASK,
+    "sub": SUB_PROCESS,
+    "xor": EXCLUSIVE_GW, "and": PARALLEL_GW, "+": PARALLEL_GW, "or": INCLUSIVE_GW,
+    "complex": COMPLEX_GW, "event-based": EVENT_BASED_GW,
+    "start": START, "end": END, "terminate": TERMINATE_END, "error": ERROR_END,
+    "conditional": CONDITIONAL_START, "message-throw": MESSAGE_THROW, "signal-throw": SIGNAL_THROW,
+}
+
+# Tags resolved by position: (no incoming flow, no outgoing flow, in between)
+_DSL_POSITIONAL_TAGS = {
+    "event": (START, END, INTERMEDIATE_CATCH),
+    "message": (MESSAGE_START, MESSAGE_END, MESSAGE_CATCH),
+    "timer": (TIMER_START, None, TIMER_CATCH),
+    "signal": (SIGNAL_START, SIGNAL_END, SIGNAL_CATCH),
+}
+
+_DSL_GUARD = re.compile(r'(?:^|(?<=\s))([^\s:|>\[\]()]+):')
+_DSL_TAG = re.compile(r'\[([^\]]*)\]\s*$')
+_DSL_QUOTED = re.compile(r'"([^"]*)"')
+_DSL_LITERAL = re.compile('\x01(\\d+)\x02')
+
+def _dslMaskQuotes(line):
+    """
+    (line, literals): every "quoted text" replaced by a placeholder the
+    parser reads as a plain word, so quoted names and guards may contain
+    ':', '>', '|' and brackets. _dslRestore puts the texts back.
+    """
+    literals = []
+    def hide(match):
+        literals.append(match.group(1))
+        return "\x01" + str(len(literals) - 1) + "\x02"
+    return _DSL_QUOTED.sub(hide, line), literals
+
+def _dslRestore(text, literals):
+    return _DSL_LITERAL.sub(lambda match: literals[int(match.group(1))], text)
+
+def _dslGroups(segment):
+    """
+    Split one "> ... >" segment into groups of (guard, step text): "a | b"
+    is one group of two, "Gw? yes:a no:b" is the group [Gw?] followed by
+    the group [yes:a, no:b].
+    """
+    groups = []
+    current = []
+    for part in segment.split("|"):
+        labels = list(_DSL_GUARD.finditer(part))
+        lead = part[:labels[0].start()] if labels else part
+        if lead.strip():
+            if labels:
+                if current:
+                    groups.append(current)
+                groups.append([("", lead)])
+                current = []
+            else:
+                current.append(("", lead))
+        for i, label in enumerate(labels):
+            end = labels[i + 1].start() if i + 1 < len(labels) else len(part)
+            current.append((label.group(1), part[label.end():end]))
+    if current:
+        groups.append(current)
+    return groups
+
+def _dslColumns(order, flows):
+    """
+    Column of every element: longest path from the elements without
+    incoming flows, ignoring back edges (loops). Iterative DFS, O(V+E).
+    """
+    successors = dict((name, []) for name in order)
+    hasIncoming = set()
+    for src, tgt, _ in flows:
+        successors[src].append(tgt)
+        hasIncoming.add(tgt)
+
+    state = {}        # name -> 1 on the DFS stack, 2 finished
+    postorder = []
+    backEdges = set()
+    roots = [n for n in order if n not in hasIncoming] + order
+    for root in roots:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+                    break
+                if state[child] == 1:
+                    backEdges.add((node, child))
+            else:
+                state[node] = 2
+                postorder.append(node)
+                stack.pop()
+
+    columns = dict((name, 0) for name in order)
+    for node in reversed(postorder):
+        for child in successors[node]:
+            if (node, child) not in backEdges:
+                columns[child] = max(columns[child], columns[node] + 1)
+    return columns
+
+def _parseProcessDSL(text):
+    """
+    Parse process DSL text (see the format above) into a CONFIG dict.
+    Returns (config, problems); problems are "line N: ..." strings and the
+    config is None when there are any. One pass over the lines, then
+    O(V+E) for types and columns.
+    """
+    problems = []
+    name = "Process"
+    laneOrder = []
+    elementInfo = {}   # name -> {"lane", "fallback", "tag", "event", "line"}
+    order = []
+    flows = []
+    dataLines = []
+    lanesDeclared = False
+
+    def declareLane(laneName):
+        if laneName not in laneOrder:
+            laneOrder.append(laneName)
+
+    def step(stepText, lane, fallbackLane, lineNo, literals):
+        stepText = stepText.strip()
+        tag = None
+        match = _DSL_TAG.search(stepText)
+        if match:
+            tag = match.group(1).strip()
+            stepText = stepText[:match.start()].strip()
+        isEvent = stepText.startswith("(") and stepText.endswith(")")
+        if isEvent:
+            stepText = stepText[1:-1].strip()
+        stepText = _dslRestore(stepText, literals)
+        if not stepText:
+            problems.append("line " + str(lineNo) + ": empty step")
+            return None
+        info = elementInfo.get(stepText)
+        if info is None:
+            info = {"lane": None, "fallback": fallbackLane, "tag": None, "event": False, "line": lineNo}
+            elementInfo[stepText] = info
+            order.append(stepText)
+        if lane and not info["lane"]:
+            info["lane"] = lane
+        if tag:
+            if info["tag"] and info["tag"] != tag:
+                problems.append("line " + str(lineNo) + ": " + stepText + " tagged [" + tag + "], was [" + info["tag"] + "]")
+            info["tag"] = tag
+        info["event"] = info["event"] or isEvent
+        return stepText
+
+    for lineNo, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        masked, literals = _dslMaskQuotes(line)
+        if '"' in masked:
+            problems.append("line " + str(lineNo) + ": unclosed quote")
+            continue
+        head, sep, rest = masked.partition(":")
+        head = _dslRestore(head.strip(), literals)
+        if not sep or not head:
+            problems.append("line " + str(lineNo) + ": expected 'Lane: step > step', got: " + line)
+            continue
+        keyword = head.lower()
+        if keyword in ("process", "name"):
+            name = _dslRestore(rest.strip(), literals) or name
+        elif keyword == "lanes":
+            lanesDeclared = True
+            for laneName in rest.split(","):
+                if laneName.strip():
+                    declareLane(_dslRestore(laneName.strip(), literals))
+        elif keyword == "data":
+            dataLines.append((lineNo, rest, literals))
+        else:
+            if lanesDeclared and head not in laneOrder:
+                problems.append("line " + str(lineNo) + ": lane " + head + " is not declared in 'lanes:'")
+            declareLane(head)
+            previous = []
+            for segment in rest.split(">"):
+                for group in _dslGroups(segment):
+                    names = []
+                    for guard, stepText in group:
+                        # Labelled targets are jumps: their own line sets the lane
+                        elemName = step(stepText, None if guard else head, head, lineNo, literals)
+                        if elemName:
+                            names.append((_dslRestore(guard, literals), elemName))
+                    for src in previous:
+                        for guard, tgt in names:
+                            flows.append((src, tgt, guard))
+                    previous = [n for _, n in names]
+
+    # Types need the flow degrees, so they are resolved after all lines
+    incoming = set(t for _, t, _ in flows)
+    outgoing = set(s for s, _, _ in flows)
+    elements = []
+    for elemName in order:
+        info = elementInfo[elemName]
+        tag = info["tag"]
+        where = "line " + str(info["line"]) + ": " + elemName
+        if tag is None:
+            tag = "event" if info["event"] else ("xor" if elemName.endswith("?") else "user")
+        if tag in _ELEMENT_CREATORS and tag != DATA_OBJECT:
+            elemType = tag
+        elif tag.lower() in _DSL_TYPE_TAGS:
+            elemType = _DSL_TYPE_TAGS[tag.lower()]
+        elif tag.lower() in _DSL_POSITIONAL_TAGS:
+            first, last, middle = _DSL_POSITIONAL_TAGS[tag.lower()]
+            elemType = first if elemName not in incoming else (last if elemName not in outgoing else middle)
+            if elemType is None:
+                problems.append(where + ": [" + tag + "] cannot end a path")
+                continue
+        else:
+            problems.append(where + ": unknown type tag [" + tag + "]")
+            continue
+        elements.append((elemName, elemType, info["lane"] or info["fallback"]))
+
+    columns = _dslColumns(order, flows)
+    elementLanes = dict((e[0], e[2]) for e in elements)
+
+    # Data lines: "writer > data > reader"; names that are not elements are data objects
+    dataObjects = []
+    associations = []
+    dataLanes = {}
+    for lineNo, rest, literals in dataLines:
+        names = [_dslRestore(n.strip(), literals) for n in rest.split(">")]
+        if len(names) < 2 or not all(names):
+            problems.append("line " + str(lineNo) + ": expected 'data: task > data > task'")
+            continue
+        for i, dataName in enumerate(names):
+            if dataName in elementInfo or dataName in dataLanes:
+                continue
+            neighbours = [n for n in names[max(0, i - 1):i] + names[i + 1:i + 2] if n in elementLanes]
+            if not neighbours:
+                problems.append("line " + str(lineNo) + ": data object " + dataName + " is not next to an element")
+                continue
+            dataLanes[dataName] = elementLanes[neighbours[0]]
+            dataObjects.append((dataName, elementLanes[neighbours[0]], columns[neighbours[0]]))
+        for src, tgt in zip(names, names[1:]):
+            associations.append((src, tgt))
+
+    if problems:
+        return None, problems
+    config = {
+        "name": name,
+        "lanes": laneOrder,
+        "elements": elements,
+        "flows": flows,
+        "layout": dict((elemName, columns[elemName]) for elemName in order),
+    }
+    if dataObjects:
+        config["data_objects"] = dataObjects
+        config["data_associations"] = associations
+    return config, []
+
+def configFromDSL(text, options=None):
+    """
+    CONFIG dict for process DSL text, with the keys of `options` (layout
+    settings, LOG_LEVEL, ...) added. Logs the problems and returns None if
+    the text does not parse.
+    """
+    config, problems = _parseProcessDSL(text)
+    if problems:
+        _log.error("DSL PARSE FAILED: " + str(len(problems)) + " problem(s)")
+        for problem in problems:
+            _log.error("  " + problem)
+        _log.flush()
+        return None
+    config.update(options or {})
+    return config
+
+def createBPMNFromDSL(parentPackage, text, options=None):
+    """Parse process DSL text and run createBPMNFromConfig on the result."""
+    config = configFromDSL(text, options)
+    if config is None:
+        return None
+    return createBPMNFromConfig(parentPackage, config)
+
+
 # ============================================================================
 # MAIN ORCHESTRATION FUNCTION (from v2.7 - best results)
 # ============================================================================
@@ -654,531 +2494,1192 @@ def createBPMNFromConfig(parentPackage, config):
     2. COLUMN-BASED (standard):
        "elements": [("Name", TYPE, "Lane"), ...]
        "layout": {"Name": column_index, ...}
+
+    Console output is controlled by "LOG_LEVEL" (LOG_QUIET, LOG_SUMMARY,
+    LOG_VERBOSE, LOG_DEBUG); the default LOG_SUMMARY prints one line per step.
+
+    "PROFILE": True (or an output path prefix) runs under the profiler and
+    writes call statistics, with Modelio call time reported separately.
+
+    "TRACE": True (or a file path) records every Modelio call with its
+    arguments and latency to a JSON-lines file (see tools/BPMN_Replay.py).
+
+    "DRY_RUN": True validates and plans the layout without creating anything,
+    and returns a report dict instead of the process (see _dryRunBPMNFromConfig).
+
+    The config is validated before anything is created (see _validateConfig);
+    on problems nothing is created and None is returned. "VALIDATE": False
+    skips the check.
+
+    "JOURNAL": True (or a file path) records created objects and finished
+    phases. After a failed run, "RESUME": True (or the journal path) reopens
+    the recorded process and continues where the run stopped.
+
+    Complete runs are stamped with configHash(config) in the process
+    description ("STAMP": False turns this off). With "SKIP_UNCHANGED": True,
+    a process in parentPackage with the same name and stamp is returned
+    instead of creating a new one.
+    """
+
+    _log.setLevel(config.get("LOG_LEVEL", BPMN_DEFAULT_CONFIG["LOG_LEVEL"]))
+    try:
+        # Oversized configs run as a batch of linked pieces (see shardConfig)
+        create = _createBPMNFromConfig
+        if _shardColumns(config) and not _validateConfig(config):
+            create = _createShards
+        if config.get("DRY_RUN"):
+            return _createShards(None, config) if create is _createShards else _dryRunBPMNFromConfig(config)
+        baseName = config.get("name", "Process")
+        run = create
+        if config.get("TRACE"):
+            option = config["TRACE"]
+            tracePath = option if isinstance(option, basestring) else _profilePrefix(True, baseName, "trace") + ".jsonl"
+            run = lambda *args: _runTraced(tracePath, create, *args)
+        try:
+            if config.get("PROFILE"):
+                return _runProfiled(_profilePrefix(config["PROFILE"], baseName), "createBPMNFromConfig " + baseName,
+                                    run, parentPackage, config)
+            return run(parentPackage, config)
+        except:
+            if config.get("JOURNAL") or config.get("RESUME"):
+                _log.error("Run failed. Run again with \"RESUME\": True to continue from " + _journalPath(config))
+            raise
+    finally:
+        _log.flush()
+
+def _dryRunBPMNFromConfig(config):
     """
+    Validate and plan a config without touching the model.
 
-    executionId = str(int(time.time() * 1000) % 100000)
-    processName = config.get("name", "Process") + "_" + executionId
+    Returns a report dict: "problems" (from _validateConfig), "plan" (from
+    _planLayout) and "counts" of what a real run would do: elements, dataObjects,
+    flows, dataAssociations, positioned, modelObjects (created objects), saves,
+    maxUnmasks (manual unmask calls if Modelio auto-unmasks nothing) and
+    subProcesses (child diagrams built in the same run, all levels).
+    """
+    cfg = _layoutSettings(config)
+    plan = _planLayout(config, cfg)
+    problems = _validateConfig(config)
+    types = plan["types"]
+
+    dataCount = len([n for n in types if types[n] == DATA_OBJECT])
+    flowCount = len([f for f in config.get("flows", []) if f[0] in types and f[1] in types])
+    assocCount = 0
+    for assocDef in config.get("data_associations", []):
+        srcName, tgtName = assocDef[0], assocDef[1]
+        if srcName in types and tgtName in types and \
+                (types[srcName] == DATA_OBJECT) != (types[tgtName] == DATA_OBJECT):
+            assocCount += 1
+    members = sum(len(plan["laneMembers"][n]) for n in plan["lanes"])
+    laneCount = len(plan["lanes"])
+    definitionCount = len([n for n in types if types[n] in _EVENT_DEFINITION_TYPES])
+    routing = flowCount > 0 and _LINK_ROUTING_AVAILABLE and \
+        config.get("ROUTE_FLOWS", BPMN_DEFAULT_CONFIG["ROUTE_FLOWS"])
+
+    counts = {
+        "lanes": laneCount,
+        "elements": len(types) - dataCount,
+        "dataObjects": dataCount,
+        "flows": flowCount,
+        "dataAssociations": assocCount,
+        "positioned": len(plan["positions"]),
+        # Process, lane set, lanes, elements, event definitions, diagram, flows, associations
+        "modelObjects": 2 + laneCount + len(types) + definitionCount + 1 + flowCount + assocCount,
+        # First save (auto-unmask), after positioning, before routing, final save
+        "saves": 4 if routing else 3,
+        "maxUnmasks": members,
+        "subProcesses": 0,
+    }
+    # Sub-processes built in the same run add their own objects, saves and unmasks
+    if not problems and not config.get("DEFER_SUB_PROCESSES", BPMN_DEFAULT_CONFIG["DEFER_SUB_PROCESSES"]):
+        level = _log.level
+        _log.setLevel(LOG_QUIET)
+        try:
+            for name in sorted(config.get("sub_processes", {})):
+                nested = _dryRunBPMNFromConfig(_subProcessConfig(config, name))["counts"]
+                counts["modelObjects"] += nested["modelObjects"] - 1     # The sub-process is counted above
+                for key in ("saves", "maxUnmasks", "subProcesses"):
+                    counts[key] += nested[key]
+                counts["subProcesses"] += 1
+        finally:
+            _log.setLevel(level)
+
+    _log.summary("")
+    _log.summary("==================================================================")
+    _log.summary("BPMN DRY RUN (no model changes)")
+    _log.summary("==================================================================")
+    _log.summary("Process Name: " + config.get("name", "Process"))
+    _log.summary("Positioning: " + ("LANE-RELATIVE" if plan["laneRelative"] else "COLUMN-BASED"))
+    _log.summary("==================================================================")
+    if _log.enabled(LOG_VERBOSE):
+        for laneName in plan["lanes"]:
+            _log.verbose("[" + laneName + "]")
+            for name in plan["laneMembers"][laneName]:
+                if name in plan["positions"]:
+                    x, relY, w, h = plan["positions"][name]
+                    size = (" " + str(int(w)) + "x" + str(int(h))) if w is not None else ""
+                    _log.verbose("  " + name + " -> (" + str(int(x)) + ", relY=" + str(int(relY)) + ")" + size)
+                else:
+                    _log.verbose("  " + name + ": SKIP (" + plan["skipped"][name] + ")")
+        for laneName, col, stack in plan["stacks"]:
+            _log.verbose("  [Auto-stack] " + laneName + " col " + str(col) + ": " +
+                         ", ".join(n + "=" + str(offset) for n, offset in stack))
+        for laneName, name, dy in plan["nudged"]:
+            _log.verbose("  [Overlap] " + laneName + ": " + name + " moved down " + str(int(dy)))
+        _log.verbose("")
+    summary = "Lanes: " + str(counts["lanes"]) + " | Elements: " + str(counts["elements"])
+    if counts["dataObjects"]:
+        summary += " | Data: " + str(counts["dataObjects"])
+    summary += " | Flows: " + str(counts["flows"])
+    if counts["dataAssociations"]:
+        summary += " | DataAssoc: " + str(counts["dataAssociations"])
+    _log.summary(summary)
+    _log.summary("Positioned: " + str(counts["positioned"]) + "/" + str(members) +
+                 " | Auto-stacked columns: " + str(len(plan["stacks"])) +
+                 " | Overlaps resolved: " + str(len(plan["nudged"])))
+    _log.summary("Model objects: " + str(counts["modelObjects"]) + " | Saves: " + str(counts["saves"]) +
+                 " | Manual unmasks: 0-" + str(counts["maxUnmasks"]))
+    if counts["subProcesses"]:
+        _log.summary("Sub-process diagrams: " + str(counts["subProcesses"]) + " (counted above)")
+    if problems:
+        _log.summary("Problems: " + str(len(problems)))
+        for problem in problems:
+            _log.error("  " + problem)
+    else:
+        _log.summary("Problems: none")
+    _log.summary("==================================================================")
+
+    return {"problems": problems, "plan": plan, "counts": counts}
+
+def _createBPMNFromConfig(parentPackage, config, prepared=None, diagramService=None, names=None, container=None,
+                          run=None):
+    """
+    Build one process. prepared ({"cfg", "plan"} from _prepareConfig),
+    diagramService and names (the package _NameIndex) are passed by the batch
+    path, which has already validated and planned the config. With container
+    (a sub-process), the config fills it and gets a sub-process diagram; run
+    is then the {"journal", "resume", "path"} of the process it belongs to
+    (see _subProcessPhase).
+    """
+    processName = container.getName() if container else None
     stepCounter = [0]
 
+    # Checkpoint journal: RESUME continues the run recorded in it
+    resume = None
+    if config.get("RESUME"):
+        resume = _readJournal(_journalPath(config))
+        if resume:
+            processName = resume["header"]["process"]
+        else:
+            _log.summary("RESUME: no journal at " + _journalPath(config) + ", starting a new run")
+
+    # Unchanged configs return before they take a name or touch the journal
+    digest = None
+    if container:
+        pass    # Sub-processes are covered by the stamp of their process
+    elif config.get("STAMP", BPMN_DEFAULT_CONFIG["STAMP"]) or config.get("SKIP_UNCHANGED"):
+        digest = configHash(config)
+    if config.get("SKIP_UNCHANGED") and not resume and parentPackage is not None:
+        unchanged = _findUnchanged(config, digest, _indexProcesses(parentPackage))
+        if unchanged:
+            _log.summary("UNCHANGED: " + unchanged.getName() + " was built from the same config, nothing created")
+            return unchanged
+    if not processName:
+        processName = (names or _NameIndex(parentPackage)).allocate(
+            config.get("name", "Process"), config.get("NAMING", BPMN_DEFAULT_CONFIG["NAMING"]))
+    if config.get("JOURNAL") or config.get("RESUME"):
+        journal = _Journal(_journalPath(config), append=bool(resume))
+    else:
+        journal = _NoJournal()
+
     def step():
         stepCounter[0] += 1
         return stepCounter[0]
 
-    cfg = dict(BPMN_DEFAULT_CONFIG)
-    for key in ["SPACING", "START_X", "TASK_WIDTH", "TASK_HEIGHT", "WAIT_TIME_MS", "MAX_ATTEMPTS",
-                "DATA_WIDTH", "DATA_HEIGHT", "DATA_OFFSET_X", "DATA_OFFSET_Y"]:
-        if key in config:
-            cfg[key] = config[key]
-
-    # Detect format: lane-relative vs column-based
+    # Positions are planned up front; the phases below only create and apply
     elementDefs = config.get("elements", [])
-    useLaneRelativePositioning = False
-    if elementDefs and len(elementDefs) > 0:
-        firstElem = elementDefs[0]
-        if len(firstElem) >= 7:
-            useLaneRelativePositioning = True
-
-    print ""
-    print "=================================================================="
-    print "BPMN PROCESS CREATION"
-    print "=================================================================="
-    print "Process Name: " + processName
-    print "Positioning: " + ("LANE-RELATIVE" if useLaneRelativePositioning else "COLUMN-BASED")
-    print "=================================================================="
+    if prepared:
+        cfg, plan = prepared["cfg"], prepared["plan"]
+    else:
+        cfg = _layoutSettings(config)
+        plan = _planLayout(config, cfg)
+    useLaneRelativePositioning = plan["laneRelative"]
+
+    # Per-element and per-lane detail lines are only built when they will be shown
+    verbose = _log.enabled(LOG_VERBOSE)
+
+    _log.summary("")
+    _log.summary("==================================================================")
+    _log.summary("BPMN SUB-PROCESS CREATION" if container else "BPMN PROCESS CREATION")
+    _log.summary("==================================================================")
+    _log.summary("Process Name: " + processName)
+    _log.summary("Positioning: " + ("LANE-RELATIVE" if useLaneRelativePositioning else "COLUMN-BASED"))
+    _log.summary("==================================================================")
+
+    # Reject broken configs before the first model object is created
+    if not prepared and config.get("VALIDATE", BPMN_DEFAULT_CONFIG["VALIDATE"]):
+        problems = _validateConfig(config)
+        if problems:
+            _log.error("")
+            _log.error("VALIDATION FAILED: " + str(len(problems)) + " problem(s), nothing created")
+            for problem in problems:
+                _log.error("  " + problem)
+            _log.error("Fix the config, or set \"VALIDATE\": False to build it anyway.")
+            return None
+
+    objectCount = len(elementDefs) + len(config.get("data_objects", []))
+    flowCount = len(config.get("flows", []))
+    existing = {}
+    if resume:
+        header = resume["header"]
+        if (header.get("config"), header.get("objects"), header.get("flows")) != \
+                (config.get("name", "Process"), objectCount, flowCount):
+            _log.error("RESUME: journal " + journal.path + " was written for another config, nothing done")
+            return None
+        process = modelingSession.findElementById(BpmnProcess, header["id"])
+        if not process:
+            _log.error("RESUME: process " + processName + " no longer exists, nothing done")
+            return None
+        if "complete" in resume["done"]:
+            _log.summary("RESUME: " + processName + " is already complete")
+            return process
+        existing = _existingObjects(process)
+        _log.summary("RESUME: " + processName + " from " + journal.path + " (" +
+                     str(len(resume["elements"])) + " elements, " + str(len(resume["flows"])) +
+                     " flows; phases done: " + (", ".join(sorted(resume["done"])) or "none") + ")")
+
+    def reused(kind, key):
+        """Object recorded in the resumed journal, if it still exists."""
+        if resume and key in resume[kind]:
+            return existing.get(resume[kind][key])
+        return None
     
     # =========================================================================
     # PHASE 1: CREATE PROCESS & LANES
     # =========================================================================
-    print ""
-    print "== PHASE 1: CREATE PROCESS & LANES =============================="
-    print ""
-    
-    process = modelingSession.getModel().createBpmnProcess()
-    process.setName(processName)
-    process.setOwner(parentPackage)
-    print "[" + str(step()) + "] Process: " + processName
+    _log.phase("PHASE 1: CREATE PROCESS & LANES")
     
-    laneSet = modelingSession.getModel().createBpmnLaneSet()
-    laneSet.setProcess(process)
+    if resume:
+        laneSet = process.getLaneSet()
+        try:
+            laneSet = list(laneSet)[0]
+        except TypeError:
+            pass
+    elif container:
+        process = container
+        laneSet = modelingSession.getModel().createBpmnLaneSet()
+        laneSet.setSubProcess(process)
+    else:
+        process = modelingSession.getModel().createBpmnProcess()
+        process.setName(processName)
+        process.setOwner(parentPackage)
+        journal.write(journal=1, config=config.get("name", "Process"), process=processName,
+                      id=process.getUuid(), objects=objectCount, flows=flowCount)
+        laneSet = modelingSession.getModel().createBpmnLaneSet()
+        laneSet.setProcess(process)
+    _log.summary("[" + str(step()) + "] Process: " + processName)
     
     laneOrder = config.get("lanes", [])
     lanes = {}
     for laneName in laneOrder:
-        lanes[laneName] = _createLane(laneSet, laneName)
+        lanes[laneName] = reused("lanes", laneName)
+        if not lanes[laneName]:
+            lanes[laneName] = _createLane(laneSet, laneName)
+            journal.created("lane", laneName, lanes[laneName])
     
-    print "[" + str(step()) + "] Lanes: " + ", ".join(laneOrder)
+    _log.summary("[" + str(step()) + "] Lanes: " + ", ".join(laneOrder))
     
     # =========================================================================
     # PHASE 2: CREATE ELEMENTS
     # =========================================================================
-    print ""
-    print "== PHASE 2: CREATE ELEMENTS ====================================="
-    print ""
+    _log.phase("PHASE 2: CREATE ELEMENTS")
     
-    elements = []
-    elementRefs = {}
-    elementLanes = {}
-
-    # Group elements by lane for lane-by-lane processing
-    elementsByLane = {}
-    for laneName in laneOrder:
-        elementsByLane[laneName] = []
-
-    # Position data for lane-relative positioning
-    elementPositions = {}  # name -> (x, y_offset, w, h)
+    # One record per created element (then per data object), in config order;
+    # recordIndex maps config keys to records for flows and lane members
+    records = []
+    recordIndex = {}
+    laneIndex = dict((laneName, i) for i, laneName in enumerate(laneOrder))
+    laneCounts = [0] * len(laneOrder)
 
     for elemDef in elementDefs:
         # Support both formats:
         # 3-tuple: (name, type, lane) - column-based layout
         # 7-tuple: (name, type, lane, x, y_offset, w, h) - exact positioning (from export)
-        if len(elemDef) >= 7:
-            name, elemType, laneName = elemDef[0], elemDef[1], elemDef[2]
-            x, yOffset, w, h = elemDef[3], elemDef[4], elemDef[5], elemDef[6]
-            elementPositions[name] = (x, yOffset, w, h)
-        else:
-            name, elemType, laneName = elemDef[0], elemDef[1], elemDef[2]
+        name, elemType, laneName = elemDef[0], elemDef[1], elemDef[2]
 
-        elem = _createElement(process, name, elemType)
+        elem = reused("elements", name)
+        isNew = elem is None
+        if isNew:
+            elem = _createElement(process, _displayName(name), elemType)
         if elem:
-            if laneName in lanes:
-                _addToLane(elem, lanes[laneName])
-            elements.append(elem)
-            elementRefs[name] = elem
-            elementLanes[name] = laneName
-            if laneName in elementsByLane:
-                elementsByLane[laneName].append(name)
+            lane = laneIndex.get(laneName, -1)
+            if isNew:
+                if lane >= 0:
+                    _addToLane(elem, lanes[laneName])
+                journal.created("element", name, elem)
+            if lane >= 0:
+                laneCounts[lane] += 1
+            recordIndex[name] = len(records)
+            records.append(_ElementRecord(name, elemType, lane, elem, False))
+    elementCount = len(records)
     
-    for laneName in laneOrder:
-        count = len(elementsByLane[laneName])
-        print "[" + str(step()) + "] " + laneName + ": " + str(count) + " elements"
+    for lane, laneName in enumerate(laneOrder):
+        _log.summary("[" + str(step()) + "] " + laneName + ": " + str(laneCounts[lane]) + " elements")
     
-    print ""
-    print "  Total: " + str(len(elements)) + " elements"
+    _log.summary("")
+    _log.summary("  Total: " + str(elementCount) + " elements")
     
     # =========================================================================
     # PHASE 2B: CREATE DATA OBJECTS
     # =========================================================================
     dataObjectDefs = config.get("data_objects", [])
-    dataObjects = []
-    dataObjectRefs = {}
-    dataObjectLanes = {}
-    dataObjectLayout = {}
     
     if dataObjectDefs:
-        print ""
-        print "== PHASE 2B: CREATE DATA OBJECTS ================================"
-        print ""
+        _log.phase("PHASE 2B: CREATE DATA OBJECTS")
         
         for dataDef in dataObjectDefs:
             # Support both formats:
             # 3-tuple: (name, lane, column) - column-based layout
             # 6-tuple: (name, lane, x, y_offset, w, h) - exact positioning (from export)
-            if len(dataDef) >= 6:
-                name, laneName = dataDef[0], dataDef[1]
-                x, yOffset, w, h = dataDef[2], dataDef[3], dataDef[4], dataDef[5]
-                elementPositions[name] = (x, yOffset, w, h)
-                column = 0  # Placeholder, not used with extended positioning
-            else:
-                name, laneName, column = dataDef[0], dataDef[1], dataDef[2]
+            name, laneName = dataDef[0], dataDef[1]
 
             try:
-                dataObj = _createDataObject(process, name)
+                dataObj = reused("elements", name)
+                isNew = dataObj is None
+                if isNew:
+                    dataObj = _createDataObject(process, _displayName(name))
                 if dataObj:
-                    if laneName in lanes:
-                        _addToLane(dataObj, lanes[laneName])
-                    dataObjects.append(dataObj)
-                    dataObjectRefs[name] = dataObj
-                    dataObjectLanes[name] = laneName
-                    dataObjectLayout[name] = column
-                    elementRefs[name] = dataObj
-                    elementLanes[name] = laneName
-                    # Add to lane grouping for lane-by-lane processing
-                    if laneName in elementsByLane:
-                        elementsByLane[laneName].append(name)
+                    lane = laneIndex.get(laneName, -1)
+                    if isNew:
+                        if lane >= 0:
+                            _addToLane(dataObj, lanes[laneName])
+                        journal.created("element", name, dataObj)
+                    recordIndex[name] = len(records)
+                    records.append(_ElementRecord(name, DATA_OBJECT, lane, dataObj, True))
             except Exception as e:
-                print "[" + str(step()) + "] ERROR creating " + name + ": " + str(e)
+                _log.error("[" + str(step()) + "] ERROR creating " + name + ": " + str(e))
         
-        print "[" + str(step()) + "] Data Objects: " + str(len(dataObjects))
+        _log.summary("[" + str(step()) + "] Data Objects: " + str(len(records) - elementCount))
+    dataObjectCount = len(records) - elementCount
     
     # =========================================================================
     # PHASE 3: CREATE DIAGRAM
     # =========================================================================
-    print ""
-    print "== PHASE 3: CREATE DIAGRAM ======================================"
-    print ""
+    _log.phase("PHASE 3: CREATE DIAGRAM")
     
-    diagram = modelingSession.getModel().createBpmnProcessDesignDiagram()
-    diagram.setName(processName)
-    diagram.setOrigin(process)
-    print "[" + str(step()) + "] Diagram: " + processName
+    diagram = existing.get(resume["diagram"]) if resume and resume["diagram"] else None
+    if not diagram:
+        if container:
+            diagram = modelingSession.getModel().createBpmnSubProcessDiagram()
+        else:
+            diagram = modelingSession.getModel().createBpmnProcessDesignDiagram()
+        diagram.setName(processName)
+        diagram.setOrigin(process)
+        journal.write(diagram=diagram.getUuid())
+    _log.summary("[" + str(step()) + "] Diagram: " + processName)
     
-    diagramService = Modelio.getInstance().getDiagramService()
+    if diagramService is None:
+        diagramService = Modelio.getInstance().getDiagramService()
     diagramHandle = diagramService.getDiagramHandle(diagram)
     diagramHandle.save()
-    print "[" + str(step()) + "] Save (triggers auto-unmask)"
+    _log.summary("[" + str(step()) + "] Save (triggers auto-unmask)")
     
     # =========================================================================
     # PHASE 4 & 5: UNMASK AND POSITION ELEMENTS
     # =========================================================================
-    print ""
-    print "== PHASE 4 & 5: UNMASK AND POSITION ELEMENTS ====================="
-    print ""
+    _log.phase("PHASE 4 & 5: UNMASK AND POSITION ELEMENTS")
 
-    allElements = elements + dataObjects
-    elementGraphics = {}
     repositionedCount = 0
-    relativeOffsets = {}
+    unmaskedCount = 0
+    positions = plan["positions"]
+    types = plan["types"]
 
     if useLaneRelativePositioning:
-        # =====================================================================
         # LANE-BY-LANE POSITIONING (for export/import - exact recreation)
-        # =====================================================================
-        print "Mode: LANE-BY-LANE (exact positioning from export)"
-        print ""
-
-        for laneName in laneOrder:
-            # Get current lane bounds
-            laneBounds = _getBounds(diagramHandle, lanes[laneName])
-            if not laneBounds:
-                print "[" + laneName + "] WARNING: Could not get lane bounds"
-                continue
-
-            laneTop = laneBounds["y"]
-            print "[" + laneName + "] Lane top Y = " + str(int(laneTop))
-
-            # Get elements for this lane
-            laneElementNames = elementsByLane.get(laneName, [])
-            if not laneElementNames:
-                continue
-
-            # Get element objects for this lane
-            laneElements = [elementRefs[n] for n in laneElementNames if n in elementRefs]
-
-            # Wait for / unmask elements in this lane
-            for elem in laneElements:
-                name = elem.getName()
-                dg = _getGraphics(diagramHandle, elem)
-                if dg:
-                    elementGraphics[name] = dg
-                else:
-                    # Manual unmask into this lane
-                    try:
-                        targetY = int(laneTop + laneBounds["h"] / 2)
-                        result = diagramHandle.unmask(elem, 100, targetY)
-                        if result and result.size() > 0:
-                            elementGraphics[name] = result.get(0)
-                    except:
-                        pass
-
-            # Position elements in this lane
-            for name in laneElementNames:
-                if name not in elementGraphics:
-                    print "  " + name + ": SKIP (no graphics)"
-                    continue
-
-                dg = elementGraphics[name]
-
-                # Get position data
-                if name not in elementPositions:
-                    print "  " + name + ": SKIP (no position data)"
-                    continue
-
-                x, yOffset, w, h = elementPositions[name]
-
-                # Apply minimum task size from config (for tasks only)
-                elem = elementRefs.get(name)
-                if elem:
-                    elemClass = elem.getMClass().getName()
-                    if "Task" in elemClass:
-                        minW = cfg.get("TASK_WIDTH", 120)
-                        minH = cfg.get("TASK_HEIGHT", 60)
-                        w = max(w, minW)
-                        h = max(h, minH)
-
-                # Calculate actual Y: lane top + offset
-                actualY = laneTop + yOffset
-
-                newBounds = Draw2DRectangle(int(x), int(actualY), int(w), int(h))
-                dg.setBounds(newBounds)
-                repositionedCount += 1
-                relativeOffsets[name] = yOffset
-                print "  " + name + ": (" + str(int(x)) + ", " + str(int(actualY)) + ") " + str(int(w)) + "x" + str(int(h))
-
-            # Save after each lane to allow Modelio to adjust
-            diagramHandle.save()
-            print ""
-
+        _log.verbose("Mode: LANE-BY-LANE (exact positioning from export)")
     else:
-        # =====================================================================
         # COLUMN-BASED POSITIONING (lane-by-lane strategy - v3.2)
-        # =====================================================================
-        print "Mode: COLUMN-BASED (lane-by-lane)"
-        print ""
-
-        layoutConfig = config.get("layout", {})
-        dataAssocDefs = config.get("data_associations", [])
-
-        def _parseLayoutEntry(entry):
-            if isinstance(entry, tuple):
-                return entry[0], entry[1]
-            else:
-                return entry, 0
-
-        # Layout settings
-        spacing = cfg["SPACING"]
-        startX = cfg["START_X"]
-        taskWidth = cfg["TASK_WIDTH"]
-        taskHeight = cfg["TASK_HEIGHT"]
-        taskTopOffset = 20
-        stackingOffset = 90  # Vertical offset between stacked elements
-        dataWidth = cfg["DATA_WIDTH"]
-        dataHeight = cfg["DATA_HEIGHT"]
-        dataOffsetX = cfg["DATA_OFFSET_X"]
-        dataOffsetY = cfg["DATA_OFFSET_Y"]
-
-        # Build data object source task mapping (Task -> DataObject associations)
+        _log.verbose("Mode: COLUMN-BASED (lane-by-lane)")
+    _log.verbose("")
+
+    if verbose:
+        for laneName, col, stack in plan["stacks"]:
+            stackInfo = [n + "=" + str(offset) for n, offset in stack]
+            _log.verbose("  [Auto-stack] col " + str(col) + ": " + ", ".join(stackInfo))
+        for laneName, name, dy in plan["nudged"]:
+            _log.verbose("  [Overlap] " + name + " moved down " + str(int(dy)))
         dataObjectSourceTask = {}
-        dataObjectNames = set(dataObjectLayout.keys()) if dataObjects else set()
-        for assocDef in dataAssocDefs:
+        for assocDef in config.get("data_associations", []):
             srcName, tgtName = assocDef[0], assocDef[1]
-            if tgtName in dataObjectNames and srcName not in dataObjectNames:
+            if tgtName in recordIndex and srcName in recordIndex and \
+                    records[recordIndex[tgtName]].isData and not records[recordIndex[srcName]].isData:
                 dataObjectSourceTask[tgtName] = srcName
 
-        # Pre-compute auto-stacking: detect same-lane/same-column conflicts
-        # Build: {laneName: {column: [element_names_in_order]}}
-        laneColumnElements = {}
-        for laneName in laneOrder:
-            laneColumnElements[laneName] = {}
-            laneElems = [n for n in elementsByLane.get(laneName, []) if n not in dataObjectNames]
-            for name in laneElems:
-                if name in layoutConfig:
-                    col, explicitYOffset = _parseLayoutEntry(layoutConfig[name])
-                    if col not in laneColumnElements[laneName]:
-                        laneColumnElements[laneName][col] = []
-                    laneColumnElements[laneName][col].append((name, explicitYOffset))
-
-        # Compute effective y_offset for each element (auto-stack if no explicit offset)
-        effectiveYOffset = {}
+    positioned = resume and "positions" in resume["done"]
+    if positioned:
+        # Positioned before the failure: only the placed boxes are needed (routing)
+        for rec in records:
+            if rec.key in resume["boxes"]:
+                rec.box = tuple(resume["boxes"][rec.key])
+        repositionedCount = len([rec for rec in records if rec.box])
+        _log.summary("[" + str(step()) + "] Positions: done before, skipped")
+    else:
+        # Lane geometry is set once: lanes grow to their planned height and are
+        # stacked from the first lane's top, so no lane moves while elements land
+        laneTops = {}
+        laneHeights = {}
+        laneTop = None
         for laneName in laneOrder:
-            for col, elemList in laneColumnElements[laneName].items():
-                if len(elemList) == 1:
-                    # Single element in column - use explicit offset or 0
-                    name, explicitOffset = elemList[0]
-                    effectiveYOffset[name] = explicitOffset
-                else:
-                    # Multiple elements in same column - check if all have explicit offsets
-                    hasExplicitOffsets = all(offset != 0 for _, offset in elemList)
-                    if hasExplicitOffsets:
-                        # User specified offsets - use them
-                        for name, offset in elemList:
-                            effectiveYOffset[name] = offset
-                    else:
-                        # Auto-stack: assign 0, 90, 180, ... in order
-                        for idx, (name, explicitOffset) in enumerate(elemList):
-                            if explicitOffset != 0:
-                                # User specified this one - use it
-                                effectiveYOffset[name] = explicitOffset
-                            else:
-                                # Auto-assign based on position in list
-                                effectiveYOffset[name] = idx * stackingOffset
-                        stackInfo = []
-                        for n, _ in elemList:
-                            stackInfo.append(n + "=" + str(effectiveYOffset[n]))
-                        print "  [Auto-stack] col " + str(col) + ": " + ", ".join(stackInfo)
+            laneGraphic = _getGraphics(diagramHandle, lanes[laneName])
+            laneBounds = _parseBounds(str(laneGraphic.getBounds())) if laneGraphic else None
+            if not laneBounds:
+                _log.error("[" + laneName + "] WARNING: Could not get lane bounds")
+                continue
+            if laneTop is None:
+                laneTop = laneBounds["y"]
+            height = max(laneBounds["h"], plan["laneHeights"].get(laneName, 0))
+            if int(laneTop) != int(laneBounds["y"]) or int(height) != int(laneBounds["h"]):
+                laneGraphic.setBounds(Draw2DRectangle(int(laneBounds["x"]), int(laneTop), int(laneBounds["w"]), int(height)))
+            laneTops[laneName] = laneTop
+            laneHeights[laneName] = height
+            laneTop += height
 
         # Process lane by lane
         for laneName in laneOrder:
-            # Get current lane bounds (fresh read)
-            laneBounds = _getBounds(diagramHandle, lanes[laneName])
-            if not laneBounds:
-                print "[" + laneName + "] WARNING: Could not get lane bounds"
+            if laneName not in laneTops:
                 continue
 
-            laneTop = laneBounds["y"]
-            laneBottom = laneBounds["y"] + laneBounds["h"]
-            print "[" + laneName + "] Lane bounds: " + str(int(laneTop)) + "-" + str(int(laneBottom))
-
-            # Get elements for this lane (excluding data objects)
-            laneElementNames = [n for n in elementsByLane.get(laneName, []) if n not in dataObjectNames]
-            laneDataNames = [n for n in elementsByLane.get(laneName, []) if n in dataObjectNames]
+            laneTop = laneTops[laneName]
+            if verbose:
+                if useLaneRelativePositioning:
+                    _log.verbose("[" + laneName + "] Lane top Y = " + str(int(laneTop)))
+                else:
+                    _log.verbose("[" + laneName + "] Lane bounds: " + str(int(laneTop)) + "-" + str(int(laneTop + laneHeights[laneName])))
 
-            if not laneElementNames and not laneDataNames:
+            laneRecords = [records[recordIndex[n]] for n in plan["laneMembers"][laneName] if n in recordIndex]
+            if not laneRecords:
                 continue
 
-            # Get element objects for this lane
-            laneElements = [elementRefs[n] for n in laneElementNames if n in elementRefs]
-            laneDataObjects = [elementRefs[n] for n in laneDataNames if n in elementRefs]
-
             # Wait for / unmask elements in this lane
-            for elem in laneElements + laneDataObjects:
-                name = elem.getName()
-                dg = _getGraphics(diagramHandle, elem)
-                if dg:
-                    elementGraphics[name] = dg
-                else:
+            for rec in laneRecords:
+                rec.graphic = _getGraphics(diagramHandle, rec.ref)
+                if not rec.graphic:
                     # Manual unmask into this lane
                     try:
-                        targetY = int(laneTop + laneBounds["h"] / 2)
-                        result = diagramHandle.unmask(elem, 100, targetY)
+                        targetY = int(laneTop + laneHeights[laneName] / 2)
+                        result = diagramHandle.unmask(rec.ref, 100, targetY)
                         if result and result.size() > 0:
-                            elementGraphics[name] = result.get(0)
-                            print "  [Unmask] " + name + " -> Y=" + str(targetY) + ": OK"
+                            rec.graphic = result.get(0)
+                            unmaskedCount += 1
+                            if verbose:
+                                _log.verbose("  [Unmask] " + rec.key + " -> Y=" + str(targetY) + ": OK")
                     except Exception as e:
-                        print "  [Unmask] " + name + ": ERROR - " + str(e)
-
-            # Pre-calculate max element bottom for this lane (for data object placement)
-            maxElementBottomRelY = taskTopOffset + taskHeight  # Default: one task height
-            for name in laneElementNames:
-                if name in effectiveYOffset:
-                    yOffset = effectiveYOffset[name]
-                    elem = elementRefs.get(name)
-                    if elem:
-                        elemClass = elem.getMClass().getName()
-                        height = taskHeight if "Task" in elemClass else 40  # Approximate
-                        elementBottomRelY = taskTopOffset + yOffset + height
-                        if elementBottomRelY > maxElementBottomRelY:
-                            maxElementBottomRelY = elementBottomRelY
-
-            print "  [maxElementBottomRelY=" + str(int(maxElementBottomRelY)) + "]"
-
-            # Position elements in this lane
-            for name in laneElementNames:
-                if name not in elementGraphics:
-                    print "  " + name + ": SKIP (no graphics)"
+                        _log.error("  [Unmask] " + rec.key + ": ERROR - " + str(e))
+
+            if not useLaneRelativePositioning:
+                _log.debug("  [maxElementBottomRelY=" + str(int(plan["laneBottoms"][laneName])) + "]")
+
+            # Position elements in this lane (data objects last, below all tasks)
+            for rec in laneRecords:
+                name = rec.key
+                isData = rec.isData and not useLaneRelativePositioning
+                label = name + " (DO)" if isData else name
+                if not rec.graphic:
+                    _log.summary("  " + label + ": SKIP (no graphics)")
                     continue
-
-                if name not in layoutConfig:
-                    print "  " + name + ": SKIP (no layout entry)"
-                    continue
-
-                dg = elementGraphics[name]
-                elem = elementRefs[name]
-                bounds = _getBounds(diagramHandle, elem)
-                if not bounds:
+                rec.planned = positions.get(name)
+                if rec.planned is None:
+                    _log.summary("  " + label + ": SKIP (" + plan["skipped"].get(name, "no layout entry") + ")")
                     continue
 
-                col, _ = _parseLayoutEntry(layoutConfig[name])  # Get column only
-                yOffset = effectiveYOffset.get(name, 0)  # Use computed offset
-
-                targetX = startX + spacing * col
-                targetY = laneTop + taskTopOffset + yOffset
-
-                elemClass = elem.getMClass().getName()
-                if "Task" in elemClass:
-                    width = taskWidth
-                    height = taskHeight
-                else:
-                    width = bounds["w"]
-                    height = bounds["h"]
-
-                newBounds = Draw2DRectangle(
-                    int(targetX), int(targetY),
-                    int(width), int(height)
-                )
-                dg.setBounds(newBounds)
+                x, relY, width, height = rec.planned
+                if width is None:
+                    # Events and gateways keep the size Modelio gave them
+                    bounds = _getBounds(diagramHandle, rec.ref)
+                    if not bounds:
+                        continue
+                    width, height = bounds["w"], bounds["h"]
+
+                targetY = laneTop + relY
+                # Lanes were sized from the plan; Modelio still expands one if an estimate was short
+                rec.box = (int(x), int(targetY), int(width), int(height))
+                rec.graphic.setBounds(Draw2DRectangle(*rec.box))
                 repositionedCount += 1
-                relativeOffsets[name] = taskTopOffset + yOffset
-                print "  " + name + " -> col=" + str(col) + " (" + str(int(targetX)) + "," + str(int(targetY)) + ") relY=" + str(int(taskTopOffset + yOffset))
-
-            # Position data objects in this lane (below ALL tasks to avoid overlap)
-            for name in laneDataNames:
-                if name not in elementGraphics:
-                    print "  " + name + " (DO): SKIP (no graphics)"
-                    continue
 
-                dg = elementGraphics[name]
-                column = dataObjectLayout.get(name, 0)
-                targetX = startX + spacing * column + dataOffsetX
-
-                # Position ALL data objects below the maximum element bottom in this lane
-                # This avoids overlap with tasks that have Y-offsets
-                targetY = laneTop + maxElementBottomRelY + dataOffsetY
+                if verbose:
+                    if useLaneRelativePositioning:
+                        _log.verbose("  " + name + ": (" + str(int(x)) + ", " + str(int(targetY)) + ") " + str(int(width)) + "x" + str(int(height)))
+                    elif isData:
+                        sourceTaskName = dataObjectSourceTask.get(name)
+                        source = " (DO from " + sourceTaskName + ")" if sourceTaskName else " (DO)"
+                        _log.verbose("  " + name + source + " -> (" + str(int(x)) + "," + str(int(targetY)) + ")")
+                    else:
+                        _log.verbose("  " + name + " -> col=" + str(plan["columns"][name]) + " (" + str(int(x)) + "," + str(int(targetY)) + ") relY=" + str(int(relY)))
 
-                sourceTaskName = dataObjectSourceTask.get(name)
-                if sourceTaskName:
-                    print "  " + name + " (DO from " + sourceTaskName + ") -> (" + str(int(targetX)) + "," + str(int(targetY)) + ") maxBottomRelY=" + str(int(maxElementBottomRelY))
-                else:
-                    print "  " + name + " (DO) -> (" + str(int(targetX)) + "," + str(int(targetY)) + ")"
-
-                # No clamping - lanes auto-expand to fit data objects
-                newBounds = Draw2DRectangle(
-                    int(targetX), int(targetY),
-                    int(dataWidth), int(dataHeight)
-                )
-                dg.setBounds(newBounds)
-                repositionedCount += 1
+            _log.verbose("")
 
-            # Save after each lane to allow Modelio to adjust
-            diagramHandle.save()
-            print ""
+    diagramHandle.save()
+    if not positioned:
+        journal.done("positions", boxes=dict((rec.key, rec.box) for rec in records if rec.box))
 
-    print ""
-    print "[" + str(step()) + "] Repositioned: " + str(repositionedCount) + "/" + str(len(allElements))
+    if unmaskedCount:
+        _log.summary("[" + str(step()) + "] Manually unmasked: " + str(unmaskedCount))
+    _log.summary("[" + str(step()) + "] Repositioned: " + str(repositionedCount) + "/" + str(len(records)))
 
     # =========================================================================
     # PHASE 6: CREATE FLOWS
     # =========================================================================
-    print ""
-    print "== PHASE 6: CREATE FLOWS ========================================"
-    print ""
+    _log.phase("PHASE 6: CREATE FLOWS")
     
     flowDefs = config.get("flows", [])
     flows = []
+    createdFlows = []  # (index in flowDefs, flow) for routing
     
-    for flowDef in flowDefs:
+    for flowIndex, flowDef in enumerate(flowDefs):
         srcName, tgtName, guard = flowDef
-        src = elementRefs.get(srcName)
-        tgt = elementRefs.get(tgtName)
-        if src and tgt:
+        flow = reused("flows", flowIndex)
+        if not flow and srcName in recordIndex and tgtName in recordIndex:
+            src = records[recordIndex[srcName]].ref
+            tgt = records[recordIndex[tgtName]].ref
             flow = _createSequenceFlow(process, src, tgt, guard)
+            journal.created("flow", flowIndex, flow)
+        if flow:
             flows.append(flow)
+            createdFlows.append((flowIndex, flow))
     
-    print "[" + str(step()) + "] Created " + str(len(flows)) + " sequence flows"
+    _log.summary("[" + str(step()) + "] Created " + str(len(flows)) + " sequence flows")
     
     # =========================================================================
     # PHASE 6B: CREATE DATA ASSOCIATIONS
     # =========================================================================
     dataAssocDefs = config.get("data_associations", [])
-    dataAssocs = []
+    assocCount = 0
     
     if dataAssocDefs:
-        print ""
-        print "== PHASE 6B: CREATE DATA ASSOCIATIONS ==========================="
-        print ""
+        _log.phase("PHASE 6B: CREATE DATA ASSOCIATIONS")
         
-        for assocDef in dataAssocDefs:
+        for assocIndex, assocDef in enumerate(dataAssocDefs):
             srcName, tgtName = assocDef[0], assocDef[1]
-            src = elementRefs.get(srcName)
-            tgt = elementRefs.get(tgtName)
-            if not src:
-                print "  ERROR: Source not found: " + srcName
+            if resume and assocIndex in resume["assocs"]:
+                assocCount += 1
+                continue
+            if srcName not in recordIndex:
+                _log.error("  ERROR: Source not found: " + srcName)
                 continue
-            if not tgt:
-                print "  ERROR: Target not found: " + tgtName
+            if tgtName not in recordIndex:
+                _log.error("  ERROR: Target not found: " + tgtName)
                 continue
-            assoc = _createDataAssociation(process, src, tgt)
+            assoc = _createDataAssociation(process, records[recordIndex[srcName]].ref, records[recordIndex[tgtName]].ref)
             if assoc:
-                dataAssocs.append(assoc)
+                assocCount += 1
+                journal.write(assoc=assocIndex)
         
-        print "[" + str(step()) + "] Data associations: " + str(len(dataAssocs))
+        _log.summary("[" + str(step()) + "] Data associations: " + str(assocCount))
+
+    # =========================================================================
+    # PHASE 6C: ROUTE FLOWS
+    # =========================================================================
+    if createdFlows and config.get("ROUTE_FLOWS", BPMN_DEFAULT_CONFIG["ROUTE_FLOWS"]) and _LINK_ROUTING_AVAILABLE:
+        _log.phase("PHASE 6C: ROUTE FLOWS")
+        diagramHandle.save()  # Flow graphics appear on save
+        placedBoxes = dict((rec.key, rec.box) for rec in records if rec.box)
+        routes = _planFlowRoutes(flowDefs, placedBoxes, types, cfg["SPACING"])
+        routedCount = _applyFlowRoutes(diagramHandle, createdFlows, routes)
+        _log.summary("[" + str(step()) + "] Orthogonal routes: " + str(routedCount) + "/" + str(len(createdFlows)))
     
     diagramHandle.save()
     diagramHandle.close()
+    if run:
+        run["journal"].write(subdiagram=run["path"])
+
+    # =========================================================================
+    # PHASE 7: SUB-PROCESSES
+    # =========================================================================
+    # One level at a time: the diagram above is closed before a child opens
+    subProcessDefs = config.get("sub_processes", {})
+    subs = [(rec.key, rec.ref) for rec in records if rec.type == SUB_PROCESS and rec.key in subProcessDefs]
+    if subs and _SUB_PROCESS_AVAILABLE:
+        _log.phase("PHASE 7: SUB-PROCESSES")
+        if not _subProcessPhase(config, subs, diagramService, run or {"journal": journal, "resume": resume, "path": ""},
+                                step):
+            # Neither stamped nor journaled complete: a RESUME builds the rest
+            _log.error("INCOMPLETE: " + processName + ": not every sub-process was built")
+            return None
+
+    if digest and config.get("STAMP", BPMN_DEFAULT_CONFIG["STAMP"]):
+        # Stamped last, so only complete runs count as unchanged
+        _writeStamp(process, digest)
+    journal.done("complete")
     
     # =========================================================================
     # SUMMARY
     # =========================================================================
-    print ""
-    print "=================================================================="
-    print "COMPLETE: " + processName
-    print "=================================================================="
-    summary = "Lanes: " + str(len(lanes)) + " | Elements: " + str(len(elements))
-    if dataObjects:
-        summary += " | Data: " + str(len(dataObjects))
+    _log.flush()
+    _log.summary("")
+    _log.summary("==================================================================")
+    _log.summary("COMPLETE: " + processName)
+    _log.summary("==================================================================")
+    summary = "Lanes: " + str(len(lanes)) + " | Elements: " + str(elementCount)
+    if dataObjectCount:
+        summary += " | Data: " + str(dataObjectCount)
     summary += " | Flows: " + str(len(flows))
-    if dataAssocs:
-        summary += " | DataAssoc: " + str(len(dataAssocs))
-    print summary
-    print "=================================================================="
+    if assocCount:
+        summary += " | DataAssoc: " + str(assocCount)
+    _log.summary(summary)
+    _log.summary("==================================================================")
     
-    return process
\ No newline at end of file
+    return process
+
+
+# ============================================================================
+# SUB-PROCESSES
+# ============================================================================
+#
+# A SUB_PROCESS element is a collapsed node in its parent diagram; its
+# config in "sub_processes" fills it and gets its own BpmnSubProcessDiagram,
+# built after the parent diagram (or later, with "DEFER_SUB_PROCESSES").
+
+# Deferred sub-processes keep their config on one line of their description
+_SUB_PROCESS_LINE = re.compile(r'^bpmn-subprocess: (.*)$', re.M)
+
+# Parent settings a sub-process does not inherit: they apply to the whole run
+_SUB_PROCESS_LOCAL_KEYS = set(["PROFILE", "TRACE", "DRY_RUN", "JOURNAL", "RESUME",
+                               "STAMP", "SKIP_UNCHANGED", "NAMING", "SHARD_SIZE", "SHARD_COLUMNS"])
+
+def _subProcessConfig(config, name):
+    """Nested config of a SUB_PROCESS element, with the parent's settings filled in."""
+    subConfig = dict((key, value) for key, value in config.items()
+                     if key.isupper() and key not in _SUB_PROCESS_LOCAL_KEYS)
+    subConfig.update(config["sub_processes"][name])
+    subConfig["name"] = _displayName(name)
+    return subConfig
+
+_TUPLE_SECTIONS = ("elements", "flows", "data_objects", "data_associations")
+
+def _configFromJSON(text):
+    """Config stored as JSON, with the tuples JSON turned into lists restored."""
+    def restore(config):
+        for key in _TUPLE_SECTIONS:
+            if key in config:
+                config[key] = [tuple(entry) for entry in config[key]]
+        layout = config.get("layout", {})
+        for name, entry in layout.items():
+            if isinstance(entry, list):
+                layout[name] = tuple(entry)
+        for nested in config.get("sub_processes", {}).values():
+            restore(nested)
+        return config
+    return restore(json.loads(text))
+
+def _subProcessPhase(config, subs, diagramService, run, step):
+    """
+    PHASE 7 of a process or sub-process: build (or defer) the sub-processes
+    [(config key, element)] of config, one after the other. run holds the
+    journal and resumed state of the top-level process and the path of
+    config below it; each finished sub-process is journaled under its path.
+    Returns True when every sub-process finished.
+    """
+    defer = config.get("DEFER_SUB_PROCESSES", BPMN_DEFAULT_CONFIG["DEFER_SUB_PROCESSES"])
+    complete = True
+    for key, subProcess in subs:
+        subConfig = _subProcessConfig(config, key)
+        subRun = dict(run, path=(run["path"] + "/" + key) if run["path"] else key)
+        if defer:
+            _writeNoteLine(subProcess, _SUB_PROCESS_LINE, "bpmn-subprocess: " + json.dumps(subConfig, sort_keys=True))
+            _log.summary("[" + str(step()) + "] " + key + ": deferred (expandSubProcess)")
+        else:
+            _log.summary("[" + str(step()) + "] " + key + ": " + str(len(subConfig.get("elements", []))) + " elements")
+            if _expandSubProcess(subProcess, subConfig, diagramService, subRun) is None:
+                complete = False
+                continue
+        run["journal"].write(subprocess=subRun["path"])
+    return complete
+
+def _expandSubProcess(subProcess, subConfig, diagramService=None, run=None):
+    """
+    Build the diagram of a sub-process and the levels below it; returns the
+    sub-process, or None if some level did not finish. An existing diagram
+    is kept when it is known to be finished (journaled, or no journal to
+    tell), and only the sub-processes below it are built or resumed.
+    """
+    resume = run["resume"] if run else None
+    if resume and run["path"] in resume["subProcesses"]:
+        _log.summary(subProcess.getName() + ": built before, nothing done")
+        return subProcess
+    diagrams = list(subProcess.getProduct())
+    if diagrams and (not resume or run["path"] in resume["subDiagrams"]):
+        _log.summary(subProcess.getName() + ": sub-process diagram exists, checking the levels below")
+        return _expandChildren(subProcess, subConfig, diagramService, run)
+    # Leftovers of a run that stopped before the diagram was finished
+    laneSets = subProcess.getLaneSet()
+    try:
+        laneSets = list(laneSets)
+    except TypeError:
+        laneSets = [laneSets] if laneSets else []
+    for elem in diagrams + list(subProcess.getFlowElement()) + laneSets:
+        if elem.isValid():
+            elem.delete()
+    return _createBPMNFromConfig(None, subConfig, diagramService=diagramService, container=subProcess, run=run)
+
+def _expandChildren(subProcess, subConfig, diagramService, run):
+    """PHASE 7 alone, for a sub-process whose own diagram already exists."""
+    nested = subConfig.get("sub_processes", {})
+    children = dict((elem.getName(), elem) for elem in subProcess.getFlowElement()
+                    if isinstance(_unwrap(elem), BpmnSubProcess))
+    subs = [(key, children[_displayName(key)]) for key in sorted(nested) if _displayName(key) in children]
+    if not subs:
+        return subProcess
+    counter = [0]
+    def step():
+        counter[0] += 1
+        return counter[0]
+    run = run or {"journal": _NoJournal(), "resume": None, "path": ""}
+    return subProcess if _subProcessPhase(subConfig, subs, diagramService, run, step) else None
+
+def expandSubProcess(subProcess, options=None):
+    """
+    Build the diagram of a sub-process created with "DEFER_SUB_PROCESSES":
+    True, from the config kept in its description. options override that
+    config ("DEFER_SUB_PROCESSES": False also builds the levels below).
+
+    Returns the sub-process, or None if it holds no deferred config. A
+    sub-process that already has a diagram keeps it; only the levels below
+    it that have no diagram yet are built.
+    """
+    try:
+        match = _SUB_PROCESS_LINE.search(subProcess.getNoteContent(*_STAMP_NOTE) or "")
+    except Exception:
+        match = None
+    if not match:
+        _log.error("ERROR: " + subProcess.getName() + " has no deferred sub-process config")
+        _log.flush()
+        return None
+    subConfig = _configFromJSON(match.group(1))
+    subConfig.update(options or {})
+    _log.setLevel(subConfig.get("LOG_LEVEL", BPMN_DEFAULT_CONFIG["LOG_LEVEL"]))
+    try:
+        return _expandSubProcess(subProcess, subConfig)
+    finally:
+        _log.flush()
+
+
+# ============================================================================
+# SHARDING
+# ============================================================================
+#
+# A config with more flow elements than "SHARD_SIZE" (or with "SHARD_COLUMNS"
+# phase boundaries) is cut between columns into pieces, one process and
+# diagram each, created one after the other. A flow crossing a cut becomes a
+# LINK_THROW in its source piece and a LINK_CATCH of the same name in its
+# target piece.
+
+def _shardColumns(config):
+    """First column of every piece after the first; [] when the config is not cut."""
+    layout = config.get("layout", {})
+    counts = {}
+    for elemDef in config.get("elements", []):
+        column = _parseLayoutEntry(layout.get(elemDef[0], 0))[0]
+        counts[column] = counts.get(column, 0) + 1
+    if not counts or len(config["elements"][0]) >= 7:      # Lane-relative configs keep their positions
+        return []
+    if config.get("SHARD_COLUMNS"):
+        return sorted(set(config["SHARD_COLUMNS"]))
+    size = config.get("SHARD_SIZE")
+    if not size or len(config["elements"]) <= size:
+        return []
+    # Greedy: fill a piece column by column; a column is never split
+    cuts = []
+    count = 0
+    for column in sorted(counts):
+        if count and count + counts[column] > size:
+            cuts.append(column)
+            count = 0
+        count += counts[column]
+    return cuts
+
+def shardConfig(config):
+    """
+    Cut an oversized column-based config into pieces named <name>_Part<n>,
+    each with the settings of the config, its columns shifted to start at 1
+    (0 holds the link catch events) and the sub_processes of its elements.
+    Data associations between pieces are dropped. A JOURNAL or RESUME path
+    becomes <path>_Part<n> per piece. Returns [config] when the config is not
+    cut.
+    """
+    try:
+        return _shardConfig(config)
+    finally:
+        _log.flush()
+
+def _shardConfig(config):
+    """shardConfig without flushing the log, for runs that flush at the end."""
+    cuts = _shardColumns(config)
+    if not cuts:
+        return [config]
+    layout = config.get("layout", {})
+    elementDefs = config.get("elements", [])
+    dataObjectDefs = config.get("data_objects", [])
+
+    # Piece of every element, empty pieces skipped
+    columns = {}
+    for elemDef in elementDefs:
+        columns[elemDef[0]] = _parseLayoutEntry(layout.get(elemDef[0], 0))[0]
+    for dataDef in dataObjectDefs:
+        columns[dataDef[0]] = dataDef[2]
+    used = sorted(set(bisect.bisect_right(cuts, columns[e[0]]) for e in elementDefs))
+    pieceOf = {}
+    for elemName, column in columns.items():
+        slot = bisect.bisect_right(cuts, column)
+        pieceOf[elemName] = used.index(slot) if slot in used else None
+    laneOf = dict((e[0], e[2]) for e in elementDefs)
+
+    name = config.get("name", "Process")
+    settings = dict((key, value) for key, value in config.items()
+                    if key.isupper() and key not in ("SHARD_SIZE", "SHARD_COLUMNS"))
+    pieces = []
+    for index in range(len(used)):
+        piece = dict(settings)
+        piece.update({"name": name + "_Part" + str(index + 1), "elements": [], "flows": [], "layout": {},
+                      "data_objects": [], "data_associations": []})
+        for key in ("JOURNAL", "RESUME"):
+            if isinstance(piece.get(key), basestring):
+                root, ext = os.path.splitext(piece[key])
+                piece[key] = root + "_Part" + str(index + 1) + ext
+        pieces.append(piece)
+    for elemDef in elementDefs:
+        pieces[pieceOf[elemDef[0]]]["elements"].append(elemDef)
+    firstColumns = [min(columns[e[0]] for e in piece["elements"]) for piece in pieces]
+    for elemDef in elementDefs:
+        piece = pieceOf[elemDef[0]]
+        entry = layout.get(elemDef[0], 0)
+        column, offset = _parseLayoutEntry(entry)
+        column = column - firstColumns[piece] + 1
+        pieces[piece]["layout"][elemDef[0]] = (column, offset) if isinstance(entry, tuple) else column
+    for dataDef in dataObjectDefs:
+        piece = pieceOf[dataDef[0]]
+        if piece is None:
+            _log.error("Sharding: data object " + dataDef[0] + " has no elements in its columns, skipped")
+            continue
+        column = max(dataDef[2] - firstColumns[piece] + 1, 0)
+        pieces[piece]["data_objects"].append((dataDef[0], dataDef[1], column))
+
+    # Flows across a cut go through a pair of link events named after the target
+    lastColumns = [max(_parseLayoutEntry(entry)[0] for entry in piece["layout"].values()) for piece in pieces]
+    links = [set() for piece in pieces]
+    for flowDef in config.get("flows", []):
+        srcName, tgtName, guard = flowDef
+        source, target = pieceOf.get(srcName), pieceOf.get(tgtName)
+        if source is None or target is None or source == target:
+            if source is not None and source == target:
+                pieces[source]["flows"].append(flowDef)
+            continue
+        link = "Link to " + tgtName
+        if link not in links[source]:
+            links[source].add(link)
+            pieces[source]["elements"].append((link, LINK_THROW, laneOf.get(srcName)))
+            pieces[source]["layout"][link] = lastColumns[source] + 1
+        if link not in links[target]:
+            links[target].add(link)
+            pieces[target]["elements"].append((link, LINK_CATCH, laneOf.get(tgtName)))
+            pieces[target]["layout"][link] = 0
+            pieces[target]["flows"].append((link, tgtName, ""))
+        pieces[source]["flows"].append((srcName, link, guard))
+
+    for assocDef in config.get("data_associations", []):
+        source, target = pieceOf.get(assocDef[0]), pieceOf.get(assocDef[1])
+        if source is not None and source == target:
+            pieces[source]["data_associations"].append(assocDef)
+        else:
+            _log.error("Sharding: data association " + assocDef[0] + " -> " + assocDef[1] + " crosses pieces, skipped")
+
+    subProcesses = config.get("sub_processes", {})
+    for piece in pieces:
+        laneNames = set(e[2] for e in piece["elements"]) | set(d[1] for d in piece["data_objects"])
+        piece["lanes"] = [laneName for laneName in config.get("lanes", []) if laneName in laneNames]
+        nested = dict((e[0], subProcesses[e[0]]) for e in piece["elements"] if e[0] in subProcesses)
+        if nested:
+            piece["sub_processes"] = nested
+    return pieces
+
+def _createShards(parentPackage, config):
+    """
+    createBPMNFromConfig of a config that shardConfig cuts: a batch run over
+    the pieces at the config's LOG_LEVEL. Returns the list of processes (of
+    dry-run reports with DRY_RUN).
+    """
+    pieces = _shardConfig(config)
+    _log.summary("SHARDED: " + config.get("name", "Process") + " -> " + str(len(pieces)) + " diagrams (" +
+                 ", ".join(str(len(piece["elements"])) for piece in pieces) + " elements)")
+    if config.get("DRY_RUN"):
+        return [_dryRunBPMNFromConfig(piece) for piece in pieces]
+    level = config.get("LOG_LEVEL", BPMN_DEFAULT_CONFIG["LOG_LEVEL"])
+    report = _createBPMNFromConfigs(parentPackage, pieces, {"LOG_LEVEL": level})
+    return report["processes"] if report else None
+
+
+# ============================================================================
+# BATCH CREATION
+# ============================================================================
+
+def _prepareConfig(config):
+    """
+    Settings, validation problems and layout plan of one config. Pure Python
+    (no model access), so configs can be prepared ahead of creation.
+    """
+    cfg = _layoutSettings(config)
+    problems = []
+    if config.get("VALIDATE", BPMN_DEFAULT_CONFIG["VALIDATE"]):
+        problems = _validateConfig(config)
+    plan = _planLayout(config, cfg) if not problems else None
+    return {"cfg": cfg, "plan": plan, "problems": problems}
+
+def _prepareConfigs(configs, threads):
+    """
+    _prepareConfig for every config, on `threads` worker threads. Planning
+    only reads its own config, so workers share nothing but the next index;
+    model changes stay on the calling (Modelio) thread. An exception while
+    planning becomes a problem of that config.
+    """
+    prepared = [None] * len(configs)
+    nextIndex = [0]
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                index = nextIndex[0]
+                nextIndex[0] += 1
+            if index >= len(configs):
+                return
+            config = configs[index]
+            if "DSL_PROBLEMS" in config:
+                prepared[index] = {"cfg": None, "plan": None, "problems": config["DSL_PROBLEMS"]}
+                continue
+            try:
+                prepared[index] = _prepareConfig(config)
+            except Exception as e:
+                prepared[index] = {"cfg": None, "plan": None,
+                                   "problems": ["Planning failed: " + e.__class__.__name__ + ": " + str(e)]}
+
+    threads = max(1, min(threads, len(configs)))
+    if threads == 1:
+        work()
+        return prepared
+    workers = [threading.Thread(target=work, name="bpmn-plan-" + str(i)) for i in range(threads)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return prepared
+
+def _batchConfigs(configs, options):
+    """
+    Configs with the per-config options applied; DSL text is parsed first
+    and oversized configs are replaced by their pieces (see shardConfig).
+    """
+    shared = dict((k, v) for k, v in options.items() if k not in BPMN_BATCH_OPTIONS and k not in ("PROFILE", "TRACE"))
+    merged = []
+    for index, entry in enumerate(configs):
+        if isinstance(entry, basestring):
+            config, problems = _parseProcessDSL(entry)
+            if problems:
+                config = {"name": "DSL #" + str(index + 1), "DSL_PROBLEMS": problems}
+        else:
+            config = dict(entry)
+        config.update(shared)
+        if _shardColumns(config) and not _validateConfig(config):
+            merged.extend(_shardConfig(config))
+        else:
+            merged.append(config)
+    _splitJournals(merged)
+    return merged
+
+def _splitJournals(configs):
+    """
+    Give journaled configs that would share a journal file (one JOURNAL or
+    RESUME path for the whole batch, or the same name) their own:
+    <path>_<n>.jsonl, n being the position in the batch. A rerun of the
+    same batch with RESUME finds them at the same paths.
+    """
+    paths = [_journalPath(c) if c.get("JOURNAL") or c.get("RESUME") else None for c in configs]
+    for index, config in enumerate(configs):
+        if paths[index] and paths.count(paths[index]) > 1:
+            root, ext = os.path.splitext(paths[index])
+            path = root + "_" + str(index + 1) + ext
+            for key in ("JOURNAL", "RESUME"):
+                if config.get(key):
+                    config[key] = path
+
+def createBPMNFromConfigs(parentPackage, configs, options=None):
+    """
+    Create many processes in one macro run.
+
+    configs is a list of CONFIG dicts (or process DSL texts). options holds
+    keys applied to every config (LOG_LEVEL, SPACING, JOURNAL, ...) plus the
+    batch options of BPMN_BATCH_OPTIONS:
+      "TRANSACTION": None (default), "batch" (all processes or none) or
+                     "process" (a failed process is rolled back, the others kept)
+      "STOP_ON_ERROR": stop at the first failed process
+      "THREADS": planning threads (default: one per core; 1: no threads)
+    "PROFILE" and "TRACE" cover the whole batch.
+
+    All configs are validated and planned before the first process is
+    created, in parallel on THREADS worker threads (validation and planning
+    are pure Python); if any has problems, nothing is created and None is
+    returned.
+    The processes are then created back to back with one diagram service.
+    Each one logs at its own LOG_LEVEL (default LOG_QUIET); the batch logs
+    one line per process and the throughput.
+
+    Returns a report dict: "processes" (one per config, None if it failed;
+    the existing process for SKIP_UNCHANGED configs), "failed" ([(name,
+    error)]), "unchanged" (count), "elements" (elements and data objects
+    created), "planSeconds", "createSeconds", "processesPerSecond" and
+    "elementsPerSecond" (over the creation time).
+    """
+    options = dict(options or {})
+    _log.setLevel(options.get("LOG_LEVEL", BPMN_DEFAULT_CONFIG["LOG_LEVEL"]))
+    try:
+        run = _createBPMNFromConfigs
+        if options.get("TRACE"):
+            option = options["TRACE"]
+            tracePath = option if isinstance(option, basestring) else _profilePrefix(True, "batch", "trace") + ".jsonl"
+            run = lambda *args: _runTraced(tracePath, _createBPMNFromConfigs, *args)
+        if options.get("PROFILE"):
+            return _runProfiled(_profilePrefix(options["PROFILE"], "batch"), "createBPMNFromConfigs " + str(len(configs)),
+                                run, parentPackage, configs, options)
+        return run(parentPackage, configs, options)
+    finally:
+        _log.flush()
+
+def _createBPMNFromConfigs(parentPackage, configs, options):
+    batchLevel = _log.level
+    configs = _batchConfigs(configs, options)
+    total = len(configs)
+
+    _log.summary("")
+    _log.summary("==================================================================")
+    _log.summary("BPMN BATCH CREATION: " + str(total) + " processes")
+    _log.summary("==================================================================")
+
+    # Validate and plan everything before the first model object is created
+    _log.phase("BATCH: VALIDATE AND PLAN")
+    threads = options.get("THREADS", BPMN_BATCH_OPTIONS["THREADS"]) or _CPU_COUNT
+    threads = max(1, min(int(threads), total))
+    start = time.time()
+    prepared = _prepareConfigs(configs, threads)
+    invalid = 0
+    for config, prep in zip(configs, prepared):
+        if prep["problems"]:
+            invalid += 1
+            _log.error(config.get("name", "Process") + ": " + str(len(prep["problems"])) + " problem(s)")
+            for problem in prep["problems"]:
+                _log.error("  " + problem)
+    planSeconds = time.time() - start
+    if invalid:
+        _log.error("")
+        _log.error("BATCH VALIDATION FAILED: " + str(invalid) + " of " + str(total) + " config(s), nothing created")
+        return None
+    _log.summary("[1] " + str(total) + " configs valid, planned in " + ("%.2f" % planSeconds) + " s (" +
+                 str(threads) + " thread" + ("s" if threads > 1 else "") + ")")
+
+    if any(config.get("DRY_RUN") for config in configs):
+        # Report only, like createBPMNFromConfig with DRY_RUN
+        return {"processes": [None] * total, "failed": [],
+                "dryRuns": [_dryRunBPMNFromConfig(config) for config in configs], "planSeconds": planSeconds}
+
+    # Create back to back
+    _log.phase("BATCH: CREATE")
+    mode = options.get("TRANSACTION", BPMN_BATCH_OPTIONS["TRANSACTION"])
+    diagramService = Modelio.getInstance().getDiagramService()
+    processes = [None] * total
+    failed = []
+    elementCount = 0
+    createdCount = 0
+    unchangedCount = 0
+    start = time.time()
+    # One package scan for all SKIP_UNCHANGED checks, one for all process names
+    stamps = _indexProcesses(parentPackage) if any(c.get("SKIP_UNCHANGED") for c in configs) else None
+    names = _NameIndex(parentPackage)
+    batchTransaction = None
+    if mode == "batch":
+        batchTransaction = modelingSession.createTransaction("Create " + str(total) + " BPMN processes")
+    try:
+        for index, (config, prep) in enumerate(zip(configs, prepared)):
+            name = config.get("name", "Process")
+            if config.get("SKIP_UNCHANGED"):
+                unchanged = _findUnchanged(config, configHash(config), stamps)
+                if unchanged:
+                    processes[index] = unchanged
+                    unchangedCount += 1
+                    _log.summary("[" + str(index + 1) + "/" + str(total) + "] " + unchanged.getName() + ": unchanged")
+                    continue
+                config = dict(config, SKIP_UNCHANGED=False)     # Checked above
+            transaction = None
+            if mode == "process":
+                transaction = modelingSession.createTransaction("Create BPMN process " + name)
+            processStart = time.time()
+            error = None
+            try:
+                _log.flush()
+                _log.setLevel(config.get("LOG_LEVEL", LOG_QUIET))
+                processes[index] = _createBPMNFromConfig(parentPackage, config, prep, diagramService, names)
+                if transaction:
+                    transaction.commit()
+            except Exception as e:
+                if batchTransaction:
+                    _log.setLevel(batchLevel)
+                    _log.error("[" + str(index + 1) + "/" + str(total) + "] " + name + ": FAILED - " + str(e))
+                    _log.error("Batch transaction rolled back, no process created")
+                    raise
+                if transaction:
+                    transaction.rollback()
+                error = str(e)
+            finally:
+                _log.flush()
+                _log.setLevel(batchLevel)
+                if transaction:
+                    transaction.close()
+            if processes[index] is None:
+                failed.append((name, error or "not created"))
+                _log.error("[" + str(index + 1) + "/" + str(total) + "] " + name + ": FAILED - " + (error or "not created"))
+                if options.get("STOP_ON_ERROR", BPMN_BATCH_OPTIONS["STOP_ON_ERROR"]):
+                    break
+                continue
+            count = len(config.get("elements", [])) + len(config.get("data_objects", []))
+            elementCount += count
+            createdCount += 1
+            _log.summary("[" + str(index + 1) + "/" + str(total) + "] " + processes[index].getName() + ": " +
+                         str(count) + " elements, " + str(len(config.get("flows", []))) + " flows (" +
+                         ("%.2f" % (time.time() - processStart)) + " s)")
+        if batchTransaction:
+            batchTransaction.commit()
+    finally:
+        if batchTransaction:
+            batchTransaction.close()
+    createSeconds = time.time() - start
+
+    # Configs after a STOP_ON_ERROR stop were never attempted
+    skipped = total - createdCount - unchangedCount - len(failed)
+    report = {
+        "processes": processes,
+        "failed": failed,
+        "unchanged": unchangedCount,
+        "skipped": skipped,
+        "elements": elementCount,
+        "planSeconds": planSeconds,
+        "createSeconds": createSeconds,
+        "processesPerSecond": createdCount / createSeconds if createSeconds else 0.0,
+        "elementsPerSecond": elementCount / createSeconds if createSeconds else 0.0,
+    }
+    _log.summary("")
+    _log.summary("==================================================================")
+    _log.summary("BATCH COMPLETE: " + str(createdCount) + "/" + str(total) + " processes, " + str(elementCount) + " elements" +
+                 ((", " + str(unchangedCount) + " unchanged") if unchangedCount else "") +
+                 ((", " + str(skipped) + " skipped") if skipped else ""))
+    _log.summary("Planning: " + ("%.2f" % planSeconds) + " s | Creation: " + ("%.2f" % createSeconds) + " s | " +
+                 ("%.1f" % report["processesPerSecond"]) + " processes/s, " +
+                 ("%.0f" % report["elementsPerSecond"]) + " elements/s")
+    _log.summary("==================================================================")
+    return report
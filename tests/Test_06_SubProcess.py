@@ -0,0 +1,131 @@
+#
+# Test_06_SubProcess.py
+#
+# Description:
+#   Test Case 6: Process with sub-processes, two levels deep
+#   Tests: SUB_PROCESS, sub_processes config, nested sub_processes,
+#          BpmnSubProcessDiagram per sub-process, layout offset in a
+#          sub-process, DEFER_SUB_PROCESSES + expandSubProcess
+#
+# Structure:
+#   Receive Claim -> [Assess Claim] -> Decide? -> Pay Claim / Reject Claim
+#   Assess Claim:  Check Policy -> [Inspect Damage] -> Estimate Cost (below it)
+#   Inspect Damage: Schedule Visit -> Inspect -> Write Report
+#
+# Applicable on: Package
+#
+
+from org.modelio.metamodel.uml.statik import Package
+
+execfile(".modelio/5.4/macros/BPMN_Helpers.py")
+
+CONFIG = {
+    "name": "Test06_SubProcess",
+
+    "lanes": ["Clerk", "Assessor"],
+
+    "elements": [
+        # Clerk lane
+        ("Start",         START,        "Clerk"),
+        ("Receive Claim", USER_TASK,    "Clerk"),
+        ("Pay Claim",     SERVICE_TASK, "Clerk"),
+        ("Reject Claim",  USER_TASK,    "Clerk"),
+        ("Paid",          END,          "Clerk"),
+        ("Rejected",      END,          "Clerk"),
+
+        # Assessor lane
+        ("Assess Claim",  SUB_PROCESS,  "Assessor"),   # Collapsed node, see sub_processes
+        ("Decide?",       EXCLUSIVE_GW, "Assessor"),
+    ],
+
+    "flows": [
+        ("Start",         "Receive Claim", ""),
+        ("Receive Claim", "Assess Claim",  ""),
+        ("Assess Claim",  "Decide?",       ""),
+        ("Decide?",       "Pay Claim",     "Covered"),
+        ("Decide?",       "Reject Claim",  "Not covered"),
+        ("Pay Claim",     "Paid",          ""),
+        ("Reject Claim",  "Rejected",      ""),
+    ],
+
+    "layout": {
+        "Start":         0,
+        "Receive Claim": 1,
+        "Assess Claim":  2,
+        "Decide?":       3,
+        "Pay Claim":     4,
+        "Reject Claim":  4,
+        "Paid":          5,
+        "Rejected":      5,
+    },
+
+    # Sub-process configs: same format as CONFIG, keyed by SUB_PROCESS name
+    "sub_processes": {
+        "Assess Claim": {
+            "lanes": ["Assessor"],
+            "elements": [
+                ("Start",          START,        "Assessor"),
+                ("Check Policy",   USER_TASK,    "Assessor"),
+                ("Inspect Damage", SUB_PROCESS,  "Assessor"),
+                ("Estimate Cost",  USER_TASK,    "Assessor"),
+                ("End",            END,          "Assessor"),
+            ],
+            "flows": [
+                ("Start",          "Check Policy",   ""),
+                ("Check Policy",   "Inspect Damage", ""),
+                ("Inspect Damage", "Estimate Cost",  ""),
+                ("Estimate Cost",  "End",            ""),
+            ],
+            "layout": {
+                "Start":          0,
+                "Check Policy":   1,
+                "Inspect Damage": 2,
+                "Estimate Cost":  (2, 90),    # Same column, 90 px lower
+                "End":            3,
+            },
+
+            # Second level
+            "sub_processes": {
+                "Inspect Damage": {
+                    "lanes": ["Assessor"],
+                    "elements": [
+                        ("Start",          START,     "Assessor"),
+                        ("Schedule Visit", USER_TASK, "Assessor"),
+                        ("Inspect",        MANUAL_TASK, "Assessor"),
+                        ("Write Report",   USER_TASK, "Assessor"),
+                        ("End",            END,       "Assessor"),
+                    ],
+                    "flows": [
+                        ("Start",          "Schedule Visit", ""),
+                        ("Schedule Visit", "Inspect",        ""),
+                        ("Inspect",        "Write Report",   ""),
+                        ("Write Report",   "End",            ""),
+                    ],
+                    "layout": {
+                        "Start":          0,
+                        "Schedule Visit": 1,
+                        "Inspect":        2,
+                        "Write Report":   3,
+                        "End":            4,
+                    },
+                },
+            },
+        },
+    },
+}
+
+if (selectedElements.size > 0):
+    element = selectedElements.get(0)
+    if (isinstance(element, Package)):
+        createBPMNFromConfig(element, CONFIG)
+
+        # Same process with deferred sub-processes: the nested configs are
+        # stored on the sub-process and built from there
+        deferred = createBPMNFromConfig(element, dict(CONFIG, DEFER_SUB_PROCESSES=True))
+        for flowElement in deferred.getFlowElement():
+            if isinstance(flowElement, BpmnSubProcess):
+                expandSubProcess(flowElement, {"DEFER_SUB_PROCESSES": False})
+    else:
+        print "ERROR: Select a Package."
+else:
+    print "ERROR: Select a Package first."
@@ -0,0 +1,66 @@
+#
+# Test_07_ProfileTrace.py
+#
+# Description:
+#   Test Case 7: Simple process built with PROFILE and TRACE both enabled
+#   Tests: PROFILE, TRACE, both recording the same Modelio calls
+#
+# Expected:
+#   bpmn_profile_Test07_ProfileTrace.txt / .prof and
+#   bpmn_trace_Test07_ProfileTrace.jsonl are written, and the trace holds
+#   as many calls as the profile reports (not 0)
+#
+# Applicable on: Package
+#
+
+from org.modelio.metamodel.uml.statik import Package
+
+execfile(".modelio/5.4/macros/BPMN_Helpers.py")
+
+CONFIG = {
+    "name": "Test07_ProfileTrace",
+
+    "lanes": ["Clerk", "Manager"],
+
+    "elements": [
+        ("Start",          START,        "Clerk"),
+        ("Submit Request", USER_TASK,    "Clerk"),
+        ("Review",         USER_TASK,    "Manager"),
+        ("Approved?",      EXCLUSIVE_GW, "Manager"),
+        ("Archive",        SERVICE_TASK, "Clerk"),
+        ("End",            END,          "Clerk"),
+    ],
+
+    "flows": [
+        ("Start",          "Submit Request", ""),
+        ("Submit Request", "Review",         ""),
+        ("Review",         "Approved?",      ""),
+        ("Approved?",      "Archive",        "yes"),
+        ("Approved?",      "Submit Request", "no"),
+        ("Archive",        "End",            ""),
+    ],
+
+    "layout": {
+        "Start":          0,
+        "Submit Request": 1,
+        "Review":         2,
+        "Approved?":      3,
+        "Archive":        4,
+        "End":            5,
+    },
+
+    # Both diagnostics in one run
+    "PROFILE": True,
+    "TRACE": True,
+}
+
+if (selectedElements.size > 0):
+    element = selectedElements.get(0)
+    if (isinstance(element, Package)):
+        createBPMNFromConfig(element, CONFIG)
+        traceLines = len(open("bpmn_trace_Test07_ProfileTrace.jsonl").readlines())
+        print "Trace lines: " + str(traceLines) + (" (FAILED: nothing traced)" if traceLines <= 1 else "")
+    else:
+        print "ERROR: Select a Package."
+else:
+    print "ERROR: Select a Package first."
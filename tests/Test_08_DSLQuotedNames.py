@@ -0,0 +1,46 @@
+#
+# Test_08_DSLQuotedNames.py
+#
+# Description:
+#   Test Case 8: Process DSL with quoted names
+#   Tests: configFromDSL, "quoted" element, lane, guard and data object
+#          names containing ':', '>' and '|'
+#
+# Expected:
+#   Elements "Review: legal", "Fix > Resubmit" and "Sign: both", lane
+#   "Legal: EU", guard "needs work" and data object "Memo | v2" keep their
+#   names (no text before a ':' read as a guard)
+#
+# Applicable on: Package
+#
+
+from org.modelio.metamodel.uml.statik import Package
+
+execfile(".modelio/5.4/macros/BPMN_Helpers.py")
+
+PROCESS = """
+process: Test08_DSLQuotedNames
+lanes: Sales, "Legal: EU"
+Sales: (Start) > "Review: legal" > Ok? "needs work":"Fix > Resubmit" | yes:"Sign: both"
+"Legal: EU": "Fix > Resubmit" > "Review: legal"
+Sales: "Sign: both" > (Done)
+data: "Review: legal" > "Memo | v2" > "Sign: both"
+"""
+
+CONFIG = configFromDSL(PROCESS)
+
+EXPECTED_NAMES = ["Review: legal", "Fix > Resubmit", "Sign: both", "Memo | v2"]
+
+if (selectedElements.size > 0):
+    element = selectedElements.get(0)
+    if (isinstance(element, Package)):
+        names = [e[0] for e in CONFIG["elements"]] + [d[0] for d in CONFIG["data_objects"]]
+        missing = [n for n in EXPECTED_NAMES if n not in names]
+        if missing or "Legal: EU" not in CONFIG["lanes"]:
+            print "ERROR: quoted names not kept: " + ", ".join(missing)
+        else:
+            createBPMNFromConfig(element, CONFIG)
+    else:
+        print "ERROR: Select a Package."
+else:
+    print "ERROR: Select a Package first."
@@ -0,0 +1,331 @@
+#
+# BPMN_Bench.py
+#
+# Description:
+#   Prompt-to-diagram benchmark for local LLMs. Sends the process
+#   descriptions of tests/test_prompts.md to an OpenAI-compatible endpoint
+#   (LM Studio, llama.cpp server, ...) for each system prompt and model,
+#   streams every answer through the StreamValidator (tools/BPMN_Stream.py)
+#   and runs valid configs through a dry run of createBPMNFromConfig
+#   (validation + layout planner, offline).
+#
+#   Per answer it records tokens, latency, time to first chunk, time to a
+#   complete valid config, and whether it validated and planned on the first
+#   try. The summary compares variants (system prompt x model) by first-try
+#   success rate and throughput.
+#
+#   With --stub no model is needed: a local stand-in endpoint answers with
+#   synthetic processes (tools/BPMN_Generate.py), as a CONFIG macro or as
+#   process DSL depending on the system prompt, with a share of answers
+#   corrupted (--stub-faults) so that both outcomes are exercised.
+#
+# Usage:
+#   python2 tools/BPMN_Bench.py --url http://localhost:1234/v1 \
+#       --system lm_studio/system_prompt.txt --system lm_studio/system_prompt_dsl.txt \
+#       --model qwen2.5-coder-14b-instruct --out bench.jsonl
+#   python2 tools/BPMN_Bench.py --stub --levels 1-7 --repeat 2
+#   python2 tools/BPMN_Bench.py --report bench.jsonl                 (summary of saved results)
+#
+# Version: 1.0 - December 2025
+#
+
+import json
+import os
+import random
+import re
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(globals().get("__file__", os.path.join("tools", "BPMN_Bench.py")))))
+import BPMN_Generate
+import BPMN_Stream
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(globals().get("__file__", os.path.join("tools", "BPMN_Bench.py")))))
+_DEFAULT_PROMPTS = os.path.join(_ROOT, "tests", "test_prompts.md")
+_DEFAULT_SYSTEM = os.path.join(_ROOT, "lm_studio", "system_prompt.txt")
+
+
+# ============================================================================
+# PROMPT CORPUS
+# ============================================================================
+
+_TEST_HEADER = re.compile(r'^\*\*Test (\d+)\.(\d+)\s*\S\s*(.+?)\*\*\s*$')
+
+def readPrompts(path=_DEFAULT_PROMPTS):
+    """Return the prompts of a test_prompts.md file: dicts with id, level, title, prompt."""
+    prompts = []
+    current = None
+    for line in open(path).read().decode("utf-8").splitlines():
+        header = _TEST_HEADER.match(line.strip())
+        if header:
+            current = {"id": header.group(1) + "." + header.group(2), "level": int(header.group(1)),
+                       "title": header.group(3).strip(), "lines": []}
+            prompts.append(current)
+        elif current is not None and line.startswith(">"):
+            current["lines"].append(line[1:].strip())
+        elif current is not None and current["lines"] and not line.strip():
+            current = None
+    for entry in prompts:
+        entry["prompt"] = "\n".join(entry.pop("lines"))
+    return [p for p in prompts if p["prompt"]]
+
+
+def selectPrompts(prompts, levels=None, only=None):
+    """Filter by level range "1-5" / "7" and by a comma-separated id list."""
+    if levels:
+        low, _, high = levels.partition("-")
+        low, high = int(low), int(high or low)
+        prompts = [p for p in prompts if low <= p["level"] <= high]
+    if only:
+        ids = set(i.strip() for i in only.split(","))
+        prompts = [p for p in prompts if p["id"] in ids]
+    return prompts
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _dryRun(config):
+    """Validation + layout plan of a streamed config; returns (ok, problems, seconds)."""
+    env = BPMN_Stream._helpers()
+    config = dict(config)
+    config.update({"DRY_RUN": True, "LOG_LEVEL": env["LOG_QUIET"]})
+    start = time.time()
+    try:
+        report = env["createBPMNFromConfig"](None, config)
+    except Exception, e:
+        return False, ["planner: " + e.__class__.__name__ + ": " + str(e)], time.time() - start
+    seconds = time.time() - start
+    if report is None:
+        return False, ["planner: no report"], seconds
+    return not report["problems"], report["problems"], seconds
+
+
+def runPrompt(baseUrl, system, prompt, model=None, abortOnProblem=True, **options):
+    """Run one prompt; returns a result record (see runBenchmark)."""
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt["prompt"]})
+    try:
+        result = BPMN_Stream.validateCompletion(baseUrl, messages, model, abortOnProblem, **options)
+    except Exception, e:
+        return {"id": prompt["id"], "level": prompt["level"], "ok": False, "error": str(e)}
+
+    usage = result["usage"] or {}
+    tokens = usage.get("completion_tokens") if not result["aborted"] else None
+    record = {
+        "id": prompt["id"],
+        "level": prompt["level"],
+        "valid": not result["problems"],
+        "aborted": result["aborted"],
+        "problems": result["problems"][:3],
+        "tokens": tokens or result["chunks"],
+        "promptTokens": usage.get("prompt_tokens"),
+        "seconds": round(result["seconds"], 4),
+        "firstChunk": result["firstChunk"] and round(result["firstChunk"], 4),
+        "validAt": result["validAt"] and round(result["validAt"], 4),
+        "problemAt": result["problemAt"] and round(result["problemAt"], 4),
+        "text": result["text"],
+    }
+    record["ok"] = False
+    if record["valid"]:
+        config = result["config"]
+        record["elements"] = len(config.get("elements", []))
+        record["flows"] = len(config.get("flows", []))
+        record["ok"], problems, record["planSeconds"] = _dryRun(config)
+        record["problems"] = problems[:3]
+    return record
+
+
+def runBenchmark(baseUrl, prompts, systems, models=(None,), repeat=1, abortOnProblem=True,
+                 out=None, progress=True, **options):
+    """
+    Run every prompt for every (system prompt, model) variant, `repeat` times.
+
+    systems is a list of (label, text) pairs. Returns the result records:
+    variant, model, id, level, ok (valid and planned), valid, aborted,
+    problems, tokens, promptTokens, seconds, firstChunk, validAt, problemAt,
+    elements, flows, planSeconds, text. Records are also appended to `out`
+    (JSON lines) as they complete.
+    """
+    records = []
+    outFile = open(out, "a") if out else None
+    try:
+        for label, system in systems:
+            for model in models:
+                for run in range(repeat):
+                    for prompt in prompts:
+                        record = runPrompt(baseUrl, system, prompt, model, abortOnProblem, **options)
+                        record.update({"variant": label, "model": model or "default", "run": run})
+                        records.append(record)
+                        if outFile:
+                            outFile.write(json.dumps(record) + "\n")
+                            outFile.flush()
+                        if progress:
+                            _printRecord(record)
+    finally:
+        if outFile:
+            outFile.close()
+    return records
+
+
+def _median(values):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def summarize(records):
+    """Per (variant, model): runs, first-try success rate, latency and throughput figures."""
+    groups = {}
+    order = []
+    for record in records:
+        key = (record.get("variant"), record.get("model"))
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(record)
+    rows = []
+    for key in order:
+        group = groups[key]
+        done = [r for r in group if "error" not in r]
+        seconds = sum(r["seconds"] for r in done)
+        tokens = sum(r["tokens"] for r in done)
+        rows.append({
+            "variant": key[0], "model": key[1], "runs": len(group),
+            "ok": len([r for r in group if r["ok"]]),
+            "successRate": float(len([r for r in group if r["ok"]])) / len(group),
+            "aborted": len([r for r in done if r["aborted"]]),
+            "errors": len(group) - len(done),
+            "medianSeconds": _median([r["seconds"] for r in done]),
+            "medianFirstChunk": _median([r["firstChunk"] for r in done]),
+            "medianValidAt": _median([r["validAt"] for r in done if r["ok"]]),
+            "medianTokens": _median([r["tokens"] for r in done]),
+            "tokensPerSecond": tokens / seconds if seconds else None,
+        })
+    return rows
+
+
+def _fmt(value, pattern="%.2f"):
+    return "-" if value is None else pattern % value
+
+
+def _printRecord(record):
+    if "error" in record:
+        state = "ERROR " + record["error"]
+    else:
+        state = "OK" if record["ok"] else ("ABORTED" if record["aborted"] else "INVALID")
+        state += "  %5d tok  %6.2f s" % (record["tokens"], record["seconds"])
+        if record["problems"]:
+            state += "  " + record["problems"][0]
+    print "  [%s] %-5s %s" % (record.get("variant"), record["id"], state)
+
+
+def printSummary(records):
+    print ""
+    print "%-28s %-24s %5s %7s %8s %9s %9s %9s %8s" % (
+        "Variant", "Model", "Runs", "First", "Latency", "1st chunk", "Valid at", "Tokens", "Tok/s")
+    for row in summarize(records):
+        print "%-28s %-24s %5d %6.0f%% %7ss %8ss %8ss %9s %8s" % (
+            row["variant"][:28], str(row["model"])[:24], row["runs"], 100 * row["successRate"],
+            _fmt(row["medianSeconds"]), _fmt(row["medianFirstChunk"]), _fmt(row["medianValidAt"]),
+            _fmt(row["medianTokens"], "%d"), _fmt(row["tokensPerSecond"], "%.1f"))
+    failed = [r for r in records if not r["ok"]]
+    if failed:
+        print ""
+        print "Failed answers:"
+        for record in failed:
+            problem = record.get("error") or (record["problems"][0] if record["problems"] else "")
+            print "  [%s] %s: %s" % (record.get("variant"), record["id"], problem)
+
+
+# ============================================================================
+# STAND-IN MODEL
+# ============================================================================
+
+def stubAnswers(faults=0.2, seed=0):
+    """
+    Answer function for BPMN_Stream.StubServer: a synthetic process sized
+    from the prompt, as process DSL when the system prompt asks for it and as
+    a CONFIG macro otherwise. A share `faults` of the answers gets an
+    unknown type or lane halfway through.
+    """
+    calls = [0]
+
+    def answer(messages):
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        prompt = messages[-1].get("content", "")
+        calls[0] += 1
+        promptSeed = zlib.crc32(prompt.encode("utf-8")) & 0xffff
+        rng = random.Random(promptSeed * 1000 + seed * 100 + calls[0])
+        config = BPMN_Generate.generateConfig(
+            elements=6 + promptSeed % 14, lanes=1 + promptSeed % 3, seed=promptSeed,
+            name="Stub_%d" % promptSeed)
+        dsl = "DSL" in system
+        text = BPMN_Generate.formatDSL(config) if dsl else BPMN_Generate.formatMacro(config)
+        if rng.random() < faults:
+            typo = ("[USER_TASK]", "[USER_TSK]") if dsl else (", USER_TASK,", ", USER_TSK,")
+            text = _breakMiddle(text, *typo) or _breakMiddle(text, "Lane 1", "Lane 0") or text
+        return text
+
+    return answer
+
+
+def _breakMiddle(text, old, new):
+    """Replace the middle occurrence of old (None if there is none)."""
+    positions = [m.start() for m in re.finditer(re.escape(old), text)]
+    if not positions:
+        return None
+    at = positions[len(positions) // 2]
+    return text[:at] + new + text[at + len(old):]
+
+
+if __name__ == "__main__":
+    options = {"--url": None, "--prompts": _DEFAULT_PROMPTS, "--levels": None, "--only": None,
+               "--repeat": "1", "--out": None, "--temperature": "0.2", "--max-tokens": "4096",
+               "--stub-faults": "0.2", "--report": None}
+    lists = {"--system": [], "--model": []}
+    flags = {"--stub": False, "--no-abort": False}
+    args = sys.argv[1:]
+    while args:
+        key = args.pop(0)
+        if key in flags:
+            flags[key] = True
+        elif key in lists and args:
+            lists[key].append(args.pop(0))
+        elif key in options and args:
+            options[key] = args.pop(0)
+        else:
+            print "Unknown or incomplete option: " + key
+            print "Options: " + " ".join(sorted(options.keys() + lists.keys() + flags.keys()))
+            sys.exit(1)
+
+    if options["--report"]:
+        printSummary([json.loads(line) for line in open(options["--report"]) if line.strip()])
+        sys.exit(0)
+    if not options["--url"] and not flags["--stub"]:
+        print "Usage: BPMN_Bench.py --url BASE_URL [--system FILE]... [--model NAME]... | --stub | --report FILE"
+        sys.exit(1)
+
+    prompts = selectPrompts(readPrompts(options["--prompts"]), options["--levels"], options["--only"])
+    systems = [(os.path.basename(path), open(path).read()) for path in (lists["--system"] or [_DEFAULT_SYSTEM])]
+    server = None
+    url = options["--url"]
+    if flags["--stub"]:
+        server = BPMN_Stream.StubServer(stubAnswers(float(options["--stub-faults"])), chunkSize=4, delay=0.001).start()
+        url = server.url
+    print "%d prompts x %d system prompt(s) x %d model(s) x %d run(s) -> %s" % (
+        len(prompts), len(systems), len(lists["--model"]) or 1, int(options["--repeat"]), url)
+    try:
+        records = runBenchmark(url, prompts, systems, lists["--model"] or [None], int(options["--repeat"]),
+                               not flags["--no-abort"], options["--out"],
+                               temperature=float(options["--temperature"]), maxTokens=int(options["--max-tokens"]))
+    finally:
+        if server:
+            server.stop()
+    printSummary(records)
@@ -0,0 +1,359 @@
+#
+# BPMN_Generate.py
+#
+# Description:
+#   Generates synthetic, valid CONFIG dicts of any size for scale testing of
+#   BPMN_Helpers.py (auto-stacking, positioning, flow creation).
+#   Generation is seeded: the same parameters always give the same CONFIG.
+#
+#   The process is a single path from a start to an end event made of:
+#   - Tasks (and message catch/throw events), moving between lanes
+#   - Gateway blocks: split, fanOut parallel branches of 1-3 elements, join.
+#     Branches share columns, so branches in the same lane are auto-stacked
+#   - Loops: an exclusive check after a task with a "no" flow back to an
+#     earlier element
+#   - Data objects next to tasks, written by the task and read by its successor
+#
+# Usage:
+#   python2 tools/BPMN_Generate.py --elements 500 --lanes 8 --seed 3 -o Synthetic_500.py
+#   python2 tools/BPMN_Generate.py --elements 500 --run          (run offline, print timings)
+#   python2 tools/BPMN_Generate.py --elements 40 --dsl           (process DSL instead of a macro)
+#
+#   execfile("tools/BPMN_Generate.py")
+#   CONFIG = generateConfig(elements=300, lanes=6, fanOut=3, seed=1)
+#
+# Version: 1.0 - December 2025
+#
+
+import os
+import random
+import re
+import sys
+import time
+
+# Type names as defined in BPMN_Helpers.py (the constants hold their own names)
+START = "START"
+END = "END"
+MESSAGE_START = "MESSAGE_START"
+MESSAGE_END = "MESSAGE_END"
+MESSAGE_CATCH = "MESSAGE_CATCH"
+MESSAGE_THROW = "MESSAGE_THROW"
+TASK = "TASK"
+USER_TASK = "USER_TASK"
+SERVICE_TASK = "SERVICE_TASK"
+MANUAL_TASK = "MANUAL_TASK"
+EXCLUSIVE_GW = "EXCLUSIVE_GW"
+PARALLEL_GW = "PARALLEL_GW"
+
+_TASK_TYPES = [USER_TASK, USER_TASK, SERVICE_TASK, MANUAL_TASK, TASK]
+_LANE_STICKINESS = 0.6  # Chance that the next element stays in the current lane
+_MAX_BRANCH_LENGTH = 3
+_LOOP_LOOKBACK = 6      # Loops jump back at most this many path elements
+
+
+# ============================================================================
+# GENERATOR
+# ============================================================================
+
+class _ConfigBuilder(object):
+    def __init__(self, rng, laneNames):
+        self.rng = rng
+        self.laneNames = laneNames
+        self.elements = []
+        self.flows = []
+        self.layout = {}
+        self.counters = {}
+        self.tasks = []
+        self.successors = {}
+
+    def name(self, kind):
+        count = self.counters.get(kind, 0) + 1
+        self.counters[kind] = count
+        return "%s %d" % (kind, count)
+
+    def add(self, kind, elemType, lane, column):
+        name = self.name(kind)
+        self.elements.append((name, elemType, lane))
+        self.layout[name] = column
+        if elemType in _TASK_TYPES:
+            self.tasks.append(name)
+        return name
+
+    def flow(self, source, target, label=""):
+        self.flows.append((source, target, label))
+        self.successors.setdefault(source, []).append(target)
+
+    def nextLane(self, lane):
+        if self.rng.random() < _LANE_STICKINESS:
+            return lane
+        return self.rng.choice(self.laneNames)
+
+
+def generateConfig(elements=100, lanes=4, fanOut=2, loopDensity=0.1, dataRatio=0.2,
+                   messageEvents=0.05, gatewayRate=0.15, layout=True, seed=0, name=None):
+    """Return a valid CONFIG dict with about `elements` flow elements.
+
+    elements      -- number of flow elements (events, tasks, gateways)
+    lanes         -- number of lanes
+    fanOut        -- branches per gateway block (below 2: no gateway blocks)
+    loopDensity   -- chance of a loop-back check after a task on the main path
+    dataRatio     -- data objects per task
+    messageEvents -- chance that a path element is a message catch/throw event
+    gatewayRate   -- chance that the next path step is a gateway block
+    layout        -- include the "layout" column dict (False: elements are
+                     created but not positioned)
+    seed          -- random seed
+    """
+    rng = random.Random(seed)
+    laneNames = ["Lane %d" % (i + 1) for i in range(max(1, lanes))]
+    b = _ConfigBuilder(rng, laneNames)
+    budget = max(2, elements)
+
+    lane = laneNames[0]
+    startType = MESSAGE_START if rng.random() < messageEvents else START
+    current = b.add("Start", startType, lane, 0)
+    path = []           # Main-path elements that loops may jump back to
+    pendingLabel = ""   # Label of the next flow leaving `current`
+    column = 1
+
+    while len(b.elements) < budget - 1:
+        remaining = budget - 1 - len(b.elements)
+
+        if fanOut >= 2 and remaining >= fanOut + 2 and rng.random() < gatewayRate:
+            # Gateway block: split, branches in shared columns, join
+            gwType = rng.choice([EXCLUSIVE_GW, PARALLEL_GW])
+            kind = "Decision" if gwType == EXCLUSIVE_GW else "Fork"
+            split = b.add(kind, gwType, lane, column)
+            b.flow(current, split, pendingLabel)
+            perBranch = max(1, min(_MAX_BRANCH_LENGTH, (remaining - 2) // fanOut))
+            longest = 0
+            ends = []
+            for branch in range(fanOut):
+                length = rng.randint(1, perBranch)
+                branchLane = b.nextLane(lane)
+                prev = split
+                label = ("Option %d" % (branch + 1)) if gwType == EXCLUSIVE_GW else ""
+                for step in range(length):
+                    node = b.add("Task", rng.choice(_TASK_TYPES), branchLane, column + 1 + step)
+                    b.flow(prev, node, label)
+                    prev, label = node, ""
+                ends.append(prev)
+                longest = max(longest, length)
+            join = b.add("Merge" if gwType == EXCLUSIVE_GW else "Join", gwType, lane, column + longest + 1)
+            for end in ends:
+                b.flow(end, join)
+            current, pendingLabel = join, ""
+            column += longest + 2
+            continue
+
+        lane = b.nextLane(lane)
+        if rng.random() < messageEvents:
+            eventType = rng.choice([MESSAGE_CATCH, MESSAGE_THROW])
+            node = b.add("Message", eventType, lane, column)
+        else:
+            node = b.add("Task", rng.choice(_TASK_TYPES), lane, column)
+        b.flow(current, node, pendingLabel)
+        current, pendingLabel = node, ""
+        column += 1
+
+        if path and remaining >= 3 and rng.random() < loopDensity:
+            # Loop: check the result, go back to an earlier element if not OK
+            check = b.add("Check", EXCLUSIVE_GW, lane, column)
+            b.flow(current, check)
+            b.flow(check, rng.choice(path[-_LOOP_LOOKBACK:]), "no")
+            current, pendingLabel = check, "yes"
+            column += 1
+        path.append(node)
+
+    endType = MESSAGE_END if rng.random() < messageEvents else END
+    end = b.add("End", endType, lane, column)
+    b.flow(current, end, pendingLabel)
+
+    # Data objects: written by a task, read by its successor when that is a task
+    dataObjects = []
+    associations = []
+    taskLanes = dict((e[0], e[2]) for e in b.elements)
+    taskNames = set(b.tasks)
+    for task in b.tasks:
+        if rng.random() >= dataRatio:
+            continue
+        data = b.name("Data")
+        dataObjects.append((data, taskLanes[task], b.layout[task]))
+        associations.append((task, data))
+        readers = [s for s in b.successors.get(task, []) if s in taskNames]
+        if readers:
+            associations.append((data, readers[0]))
+
+    config = {
+        "name": name or ("Synthetic_%d_s%d" % (budget, seed)),
+        "lanes": laneNames,
+        "elements": b.elements,
+        "flows": b.flows,
+    }
+    if dataObjects:
+        config["data_objects"] = dataObjects
+        config["data_associations"] = associations
+    if layout:
+        config["layout"] = b.layout
+    return config
+
+
+# ============================================================================
+# MACRO OUTPUT
+# ============================================================================
+
+def _q(value):
+    if isinstance(value, basestring):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return repr(value)
+
+
+def _tuple(values):
+    return "(" + ", ".join(_q(v) for v in values) + ")"
+
+
+def formatMacro(config, description=None):
+    """Return the source of a Modelio macro running `config`."""
+    name = config["name"]
+    lines = [
+        "#",
+        "# " + name + ".py",
+        "#",
+        "# Description:",
+        "#   " + (description or "Synthetic process generated by tools/BPMN_Generate.py"),
+        "#   %d lanes, %d elements, %d flows, %d data objects" % (
+            len(config["lanes"]), len(config["elements"]), len(config["flows"]),
+            len(config.get("data_objects", []))),
+        "#",
+        "# Applicable on: Package",
+        "#",
+        "",
+        "from org.modelio.metamodel.uml.statik import Package",
+        "",
+        'execfile(".modelio/5.4/macros/BPMN_Helpers.py")',
+        "",
+        "CONFIG = {",
+        '    "name": %s,' % _q(name),
+        '    "lanes": [%s],' % ", ".join(_q(lane) for lane in config["lanes"]),
+        '    "elements": [',
+    ]
+    for elemName, elemType, lane in config["elements"]:
+        lines.append("        (%s, %s, %s)," % (_q(elemName), elemType, _q(lane)))
+    lines.append("    ],")
+    if config.get("data_objects"):
+        lines.append('    "data_objects": [')
+        for dataDef in config["data_objects"]:
+            lines.append("        %s," % _tuple(dataDef))
+        lines.append("    ],")
+        lines.append('    "data_associations": [')
+        for assoc in config["data_associations"]:
+            lines.append("        %s," % _tuple(assoc))
+        lines.append("    ],")
+    lines.append('    "flows": [')
+    for flow in config["flows"]:
+        lines.append("        %s," % _tuple(flow))
+    lines.append("    ],")
+    if "layout" in config:
+        lines.append('    "layout": {')
+        for elemName, _, _ in config["elements"]:
+            lines.append("        %s: %d," % (_q(elemName), config["layout"][elemName]))
+        lines.append("    },")
+    lines.append("}")
+    lines.extend([
+        "",
+        "if (selectedElements.size > 0):",
+        "    element = selectedElements.get(0)",
+        "    if (isinstance(element, Package)):",
+        "        createBPMNFromConfig(element, CONFIG)",
+        "    else:",
+        '        print "ERROR: Select a Package."',
+        "else:",
+        '    print "ERROR: Select a Package first."',
+    ])
+    return "\n".join(lines) + "\n"
+
+
+_DSL_SYNTAX = re.compile(r'[:>|\[\]()]')
+_DSL_GUARD_SYNTAX = re.compile(r'[\s:>|\[\]()]')     # Unquoted guards are one word
+
+
+def _dslQuote(text, syntax=_DSL_SYNTAX):
+    """Text as a DSL name or guard: quoted when it holds characters the DSL reads as syntax."""
+    return '"%s"' % text if syntax.search(text) else text
+
+
+def formatDSL(config):
+    """Return `config` as process DSL text (see "Process DSL" in docs/API_REFERENCE.md).
+
+    One line per flow, in flow order, written in the target's lane so that
+    each element is first listed in its own lane. Types are given as
+    [CONSTANT] tags; columns are left to the DSL's longest-path layout.
+    """
+    lanes = dict((e[0], e[2]) for e in config["elements"])
+    types = dict((e[0], e[1]) for e in config["elements"])
+    lines = ["process: " + _dslQuote(config["name"]), "lanes: " + ", ".join(_dslQuote(l) for l in config["lanes"])]
+    listed = set()
+
+    def step(name):
+        if name in listed:
+            return _dslQuote(name)
+        listed.add(name)
+        return "%s [%s]" % (_dslQuote(name), types[name])
+
+    for source, target, label in config["flows"]:
+        if source not in listed:
+            lines.append("%s: %s" % (_dslQuote(lanes[source]), step(source)))
+        head = step(source)
+        lines.append("%s: %s > %s%s" % (_dslQuote(lanes[target]), head, (_dslQuote(label, _DSL_GUARD_SYNTAX) + ":") if label else "",
+                                        step(target)))
+    for source, target in config.get("data_associations", []):
+        lines.append("data: %s > %s" % (_dslQuote(source), _dslQuote(target)))
+    return "\n".join(lines) + "\n"
+
+
+def _runOffline(config, autoUnmaskRate):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(globals().get("__file__", os.path.join("tools", "x")))))
+    import BPMN_Offline
+    runtime = BPMN_Offline.OfflineRuntime(autoUnmaskRate=autoUnmaskRate)
+    env = BPMN_Offline.loadHelpersOffline(runtime)
+    config = dict(config)
+    config.setdefault("LOG_LEVEL", env["LOG_QUIET"])
+    start = time.time()
+    env["createBPMNFromConfig"](runtime.package, config)
+    seconds = time.time() - start
+    print "Offline run: %.3f s | %s" % (seconds, ", ".join("%s=%d" % kv for kv in sorted(runtime.counters.items())))
+
+
+if __name__ == "__main__":
+    options = {"--elements": "100", "--lanes": "4", "--fan-out": "2", "--loops": "0.1",
+               "--data": "0.2", "--messages": "0.05", "--gateways": "0.15", "--seed": "0",
+               "--name": None, "-o": None, "--unmask": "1.0"}
+    flags = {"--no-layout": False, "--run": False, "--dsl": False}
+    args = sys.argv[1:]
+    while args:
+        key = args.pop(0)
+        if key in flags:
+            flags[key] = True
+        elif key in options and args:
+            options[key] = args.pop(0)
+        else:
+            print "Unknown or incomplete option: " + key
+            print "Options: " + " ".join(sorted(options.keys()) + sorted(flags.keys()))
+            sys.exit(1)
+
+    config = generateConfig(
+        elements=int(options["--elements"]), lanes=int(options["--lanes"]),
+        fanOut=int(options["--fan-out"]), loopDensity=float(options["--loops"]),
+        dataRatio=float(options["--data"]), messageEvents=float(options["--messages"]),
+        gatewayRate=float(options["--gateways"]), layout=not flags["--no-layout"],
+        seed=int(options["--seed"]), name=options["--name"])
+
+    output = formatDSL(config) if flags["--dsl"] else formatMacro(config)
+    if options["-o"]:
+        with open(options["-o"], "w") as out:
+            out.write(output)
+        print "Wrote " + options["-o"]
+    elif not flags["--run"]:
+        sys.stdout.write(output)
+    if flags["--run"]:
+        _runOffline(config, float(options["--unmask"]))
@@ -0,0 +1,647 @@
+#
+# BPMN_Offline.py
+#
+# Description:
+#   Offline stand-in for the Modelio scripting runtime.
+#   Provides fake metamodel modules, a modelingSession, a diagram service and
+#   selectedElements so that BPMN_Helpers.py can run under plain Jython or
+#   Python 2.7 without a Modelio installation.
+#
+#   The stand-in imitates the Modelio behaviors the helper library depends on:
+#   - Auto-unmask on the first diagram save (optionally partial, seeded)
+#   - Lanes stacked top to bottom that auto-expand around their content
+#   - Lanes below an expanded lane are pushed down together with their content
+#
+#   It is meant for benchmarks, trace replay and quick checks, not for
+#   verifying rendering.
+#
+# Usage:
+#   execfile("tools/BPMN_Offline.py")
+#   env = loadHelpersOffline()
+#   env["createBPMNFromConfig"](env["selectedElements"].get(0), CONFIG)
+#
+# Version: 1.0 - December 2025
+#
+
+import itertools
+import os
+import random
+import sys
+import types
+
+
+# ============================================================================
+# JAVA-LIKE VALUES
+# ============================================================================
+
+class _JList(object):
+    """Minimal java.util.List look-alike (deliberately not a Python list)."""
+
+    def __init__(self, items=None, onAdd=None):
+        self._items = list(items or [])
+        self._onAdd = onAdd
+
+    def add(self, item):
+        self._items.append(item)
+        if self._onAdd:
+            self._onAdd(item)
+        return True
+
+    def remove(self, item):
+        self._items.remove(item)
+        return True
+
+    def size(self):
+        return len(self._items)
+
+    def get(self, index):
+        return self._items[index]
+
+    def isEmpty(self):
+        return not self._items
+
+    def contains(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, item):
+        return item in self._items
+
+
+class Rectangle(object):
+    """Stand-in for org.eclipse.draw2d.geometry.Rectangle."""
+
+    def __init__(self, x=0, y=0, width=0, height=0):
+        self.x = int(x)
+        self.y = int(y)
+        self.width = int(width)
+        self.height = int(height)
+
+    def __str__(self):
+        return "Rectangle(%d, %d, %d, %d)" % (self.x, self.y, self.width, self.height)
+
+    __repr__ = __str__
+
+
+class Point(object):
+    """Stand-in for org.eclipse.draw2d.geometry.Point."""
+
+    def __init__(self, x=0, y=0):
+        self.x = int(x)
+        self.y = int(y)
+
+    def __str__(self):
+        return "Point(%d, %d)" % (self.x, self.y)
+
+    __repr__ = __str__
+
+
+class IDiagramLink(object):
+    """Namespace for the link router kinds."""
+
+    class LinkRouterKind(object):
+        DIRECT = "DIRECT"
+        BENDPOINT = "BENDPOINT"
+        ORTHOGONAL = "ORTHOGONAL"
+
+
+class _MClass(object):
+    def __init__(self, name):
+        self._name = name
+
+    def getName(self):
+        return self._name
+
+
+# ============================================================================
+# MODEL ELEMENTS
+# ============================================================================
+
+# setX(value) on the left registers the element in value.getY() on the right
+_OPPOSITES = {
+    "Container": "FlowElement",
+    "SubProcess": "FlowElement",
+    "Owner": "OwnedElement",
+    "LaneSet": "Lane",
+    "Process": "LaneSet",
+    "Origin": "Product",
+    "Defined": "EventDefinitions",
+    "SourceRef": "Outgoing",
+    "TargetRef": "Incoming",
+}
+
+
+class OfflineElement(object):
+    """Generic model element with Modelio-style getX()/setX() accessors."""
+
+    _METACLASS = "ModelElement"
+
+    def __init__(self, runtime):
+        self._rt = runtime
+        self._attrs = {}
+        self._notes = {}
+        self._deleted = False
+        self._uuid = "offline-%06d" % runtime.nextId()
+        runtime.register(self)
+
+    def getName(self):
+        return self._attrs.get("Name", "")
+
+    def setName(self, name):
+        self._attrs["Name"] = name
+
+    def getUuid(self):
+        return self._uuid
+
+    def getMClass(self):
+        return _MClass(self._METACLASS)
+
+    def isValid(self):
+        return not self._deleted
+
+    def delete(self):
+        self._deleted = True
+        self._rt.unregister(self)
+        for value in list(self._attrs.values()):
+            if isinstance(value, _JList):
+                for child in list(value):
+                    if isinstance(child, OfflineElement) and child._attrs.get("Owner") is self:
+                        child.delete()
+        for key, opposite in _OPPOSITES.items():
+            owner = self._attrs.get(key)
+            if isinstance(owner, OfflineElement):
+                coll = owner._attrs.get(opposite)
+                if isinstance(coll, _JList) and self in coll:
+                    coll.remove(self)
+
+    def putNoteContent(self, module, noteType, content):
+        self._notes[(module, noteType)] = content
+
+    def getNoteContent(self, module, noteType):
+        return self._notes.get((module, noteType))
+
+    def _collection(self, key):
+        coll = self._attrs.get(key)
+        if not isinstance(coll, _JList):
+            coll = _JList(onAdd=self._collectionHook(key))
+            self._attrs[key] = coll
+        return coll
+
+    def _collectionHook(self, key):
+        return None
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr.startswith("set"):
+            key = attr[3:]
+
+            def setter(value):
+                self._attrs[key] = value
+                opposite = _OPPOSITES.get(key)
+                if opposite and isinstance(value, OfflineElement):
+                    value._collection(opposite).add(self)
+            return setter
+        if attr.startswith("get"):
+            key = attr[3:]
+
+            def getter():
+                if key in self._attrs:
+                    return self._attrs[key]
+                return self._collection(key)
+            return getter
+        raise AttributeError(attr)
+
+
+class _DataAssociationBase(OfflineElement):
+    def _collectionHook(self, key):
+        if key == "SourceRef":
+            return lambda item: item._collection("SourceOfDataAssociation").add(self)
+        return None
+
+    def setTargetRef(self, value):
+        self._attrs["TargetRef"] = value
+        value._collection("TargetOfDataAssociation").add(self)
+
+
+class _LaneSetBase(OfflineElement):
+    def setSubProcess(self, value):
+        # A sub-process lists its lane sets, not its flow elements, here
+        self._attrs["SubProcess"] = value
+        value._collection("LaneSet").add(self)
+
+    def delete(self):
+        OfflineElement.delete(self)
+        subProcess = self._attrs.get("SubProcess")
+        if subProcess is not None and self in subProcess._collection("LaneSet"):
+            subProcess._collection("LaneSet").remove(self)
+
+
+# Metaclass name -> (module, base metaclass name)
+_METACLASSES = [
+    ("BpmnProcess", "processCollaboration", None),
+    ("BpmnLane", "processCollaboration", None),
+    ("BpmnLaneSet", "processCollaboration", None),
+    ("BpmnParticipant", "processCollaboration", None),
+    ("BpmnTask", "activities", None),
+    ("BpmnUserTask", "activities", "BpmnTask"),
+    ("BpmnServiceTask", "activities", "BpmnTask"),
+    ("BpmnManualTask", "activities", "BpmnTask"),
+    ("BpmnScriptTask", "activities", "BpmnTask"),
+    ("BpmnBusinessRuleTask", "activities", "BpmnTask"),
+    ("BpmnSendTask", "activities", "BpmnTask"),
+    ("BpmnReceiveTask", "activities", "BpmnTask"),
+    ("BpmnSubProcess", "activities", None),
+    ("BpmnCallActivity", "activities", None),
+    ("BpmnStartEvent", "events", None),
+    ("BpmnEndEvent", "events", None),
+    ("BpmnIntermediateCatchEvent", "events", None),
+    ("BpmnIntermediateThrowEvent", "events", None),
+    ("BpmnMessageEventDefinition", "events", None),
+    ("BpmnTimerEventDefinition", "events", None),
+    ("BpmnSignalEventDefinition", "events", None),
+    ("BpmnConditionalEventDefinition", "events", None),
+    ("BpmnTerminateEventDefinition", "events", None),
+    ("BpmnErrorEventDefinition", "events", None),
+    ("BpmnLinkEventDefinition", "events", None),
+    ("BpmnExclusiveGateway", "gateways", None),
+    ("BpmnParallelGateway", "gateways", None),
+    ("BpmnInclusiveGateway", "gateways", None),
+    ("BpmnComplexGateway", "gateways", None),
+    ("BpmnEventBasedGateway", "gateways", None),
+    ("BpmnSequenceFlow", "flows", None),
+    ("BpmnDataObject", "objects", None),
+    ("BpmnDataAssociation", "objects", None),
+    ("BpmnProcessDesignDiagram", "bpmnDiagrams", None),
+    ("BpmnSubProcessDiagram", "bpmnDiagrams", None),
+]
+
+METACLASSES = {}
+for _name, _module, _base in _METACLASSES:
+    if _name == "BpmnDataAssociation":
+        _parent = _DataAssociationBase
+    elif _name == "BpmnLaneSet":
+        _parent = _LaneSetBase
+    elif _base:
+        _parent = METACLASSES[_base]
+    else:
+        _parent = OfflineElement
+    METACLASSES[_name] = type(_name, (_parent,), {"_METACLASS": _name})
+
+Package = type("Package", (OfflineElement,), {"_METACLASS": "Package"})
+METACLASSES["Package"] = Package
+
+
+def _installModules():
+    """Register fake org.modelio / org.eclipse modules in sys.modules."""
+    def module(path):
+        if path in sys.modules:
+            return sys.modules[path]
+        mod = types.ModuleType(path)
+        sys.modules[path] = mod
+        if "." in path:
+            parentPath, leaf = path.rsplit(".", 1)
+            setattr(module(parentPath), leaf, mod)
+        return mod
+
+    for name, moduleName, _ in _METACLASSES:
+        setattr(module("org.modelio.metamodel.bpmn." + moduleName), name, METACLASSES[name])
+    setattr(module("org.modelio.metamodel.uml.statik"), "Package", Package)
+    geometry = module("org.eclipse.draw2d.geometry")
+    geometry.Rectangle = Rectangle
+    geometry.Point = Point
+    module("org.modelio.api.modelio.diagram").IDiagramLink = IDiagramLink
+
+
+# ============================================================================
+# DIAGRAMS
+# ============================================================================
+
+_DEFAULT_SIZES = {
+    "BpmnLane": (1000, 150),
+    "BpmnSubProcess": (150, 90),
+    "BpmnCallActivity": (120, 60),
+    "BpmnDataObject": (40, 50),
+}
+
+
+def _defaultSize(metaclass):
+    if metaclass in _DEFAULT_SIZES:
+        return _DEFAULT_SIZES[metaclass]
+    if metaclass.endswith("Task"):
+        return (110, 60)
+    if metaclass.endswith("Gateway"):
+        return (40, 40)
+    return (30, 30)
+
+
+class OfflineGraphic(object):
+    """Diagram node or link graphic."""
+
+    def __init__(self, element, bounds):
+        self._element = element
+        self._bounds = bounds
+        self._points = []
+        self._router = None
+
+    def getElement(self):
+        return self._element
+
+    def getBounds(self):
+        b = self._bounds
+        return Rectangle(b.x, b.y, b.width, b.height)
+
+    def setBounds(self, rect):
+        self._bounds = Rectangle(rect.x, rect.y, rect.width, rect.height)
+
+    def getPoints(self):
+        return _JList(self._points)
+
+    def setPoints(self, points):
+        self._points = list(points)
+
+    def getPath(self):
+        return OfflineLinkPath(self._points)
+
+    def setPath(self, path):
+        self._points = list(path.getPoints())
+
+    def setRouterKind(self, kind):
+        self._router = kind
+
+    def getRouterKind(self):
+        return self._router
+
+
+class OfflineLinkPath(object):
+    def __init__(self, points):
+        self._points = list(points)
+
+    def getPoints(self):
+        return _JList(self._points)
+
+    def setPoints(self, points):
+        self._points = list(points)
+
+
+class OfflineDiagramHandle(object):
+    """Diagram handle with auto-unmask and lane auto-expansion."""
+
+    LANE_X = 20
+    LANE_Y = 20
+    LANE_PADDING = 10
+
+    def __init__(self, runtime, diagram):
+        self._rt = runtime
+        self._diagram = diagram
+        self._state = runtime.diagramState(diagram)
+
+    def _origin(self):
+        return self._diagram._attrs.get("Origin")
+
+    def _lanes(self):
+        origin = self._origin()
+        lanes = []
+        if origin is None:
+            return lanes
+        for laneSet in origin._collection("LaneSet"):
+            for lane in laneSet._collection("Lane"):
+                if not lane._deleted:
+                    lanes.append(lane)
+        return lanes
+
+    def getDiagramGraphics(self, element):
+        g = self._state["graphics"].get(element.getUuid())
+        return _JList([g] if g else [])
+
+    def unmask(self, element, x, y):
+        self._rt.counters["unmask"] += 1
+        w, h = _defaultSize(element._METACLASS)
+        g = OfflineGraphic(element, Rectangle(x, y, w, h))
+        self._state["graphics"][element.getUuid()] = g
+        return _JList([g])
+
+    def save(self):
+        self._rt.counters["save"] += 1
+        if not self._state["unmasked"]:
+            self._state["unmasked"] = True
+            self._autoUnmask()
+        self._layoutLanes()
+        self._unmaskLinks()
+
+    def close(self):
+        self._rt.counters["close"] += 1
+
+    def _autoUnmask(self):
+        origin = self._origin()
+        if origin is None:
+            return
+        top = self.LANE_Y
+        for lane in self._lanes():
+            w, h = _defaultSize("BpmnLane")
+            self._state["graphics"][lane.getUuid()] = OfflineGraphic(lane, Rectangle(self.LANE_X, top, w, h))
+            top += h
+        rng = self._rt.random
+        for elem in origin._collection("FlowElement"):
+            if elem._METACLASS in ("BpmnSequenceFlow", "BpmnDataAssociation"):
+                continue
+            if rng.random() >= self._rt.autoUnmaskRate:
+                continue
+            w, h = _defaultSize(elem._METACLASS)
+            self._state["graphics"][elem.getUuid()] = OfflineGraphic(elem, Rectangle(self.LANE_X + 40, self.LANE_Y + 20, w, h))
+
+    def _layoutLanes(self):
+        graphics = self._state["graphics"]
+        top = None
+        for lane in self._lanes():
+            lg = graphics.get(lane.getUuid())
+            if lg is None:
+                continue
+            if top is None:
+                top = lg._bounds.y
+            shift = top - lg._bounds.y
+            content = [graphics[e.getUuid()] for e in lane._collection("FlowElementRef")
+                       if e.getUuid() in graphics]
+            for g in content:
+                g._bounds.y += shift
+            lg._bounds.y = top
+            bottom = top + lg._bounds.height
+            for g in content:
+                bottom = max(bottom, g._bounds.y + g._bounds.height + self.LANE_PADDING)
+            lg._bounds.height = bottom - top
+            top = bottom
+
+    def _unmaskLinks(self):
+        origin = self._origin()
+        if origin is None:
+            return
+        graphics = self._state["graphics"]
+        for elem in origin._collection("FlowElement"):
+            if elem._METACLASS != "BpmnSequenceFlow" or elem.getUuid() in graphics:
+                continue
+            src = elem._attrs.get("SourceRef")
+            tgt = elem._attrs.get("TargetRef")
+            if src is not None and tgt is not None and src.getUuid() in graphics and tgt.getUuid() in graphics:
+                graphics[elem.getUuid()] = OfflineGraphic(elem, Rectangle(0, 0, 0, 0))
+
+
+class OfflineDiagramService(object):
+    def __init__(self, runtime):
+        self._rt = runtime
+
+    def getDiagramHandle(self, diagram):
+        self._rt.counters["handle"] += 1
+        return OfflineDiagramHandle(self._rt, diagram)
+
+
+# ============================================================================
+# SESSION
+# ============================================================================
+
+class OfflineModel(object):
+    """Element factory: createBpmnXxx() returns a new BpmnXxx element."""
+
+    def __init__(self, runtime):
+        self._rt = runtime
+
+    def __getattr__(self, attr):
+        if attr.startswith("create") and attr[6:] in METACLASSES:
+            cls = METACLASSES[attr[6:]]
+
+            def factory():
+                self._rt.counters["create"] += 1
+                return cls(self._rt)
+            return factory
+        raise AttributeError(attr)
+
+
+class OfflineTransaction(object):
+    def __init__(self, name):
+        self.name = name
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class OfflineSession(object):
+    def __init__(self, runtime):
+        self._rt = runtime
+        self._model = OfflineModel(runtime)
+
+    def getModel(self):
+        return self._model
+
+    def findElementById(self, metaclass, uuid):
+        elem = self._rt.elements.get(uuid)
+        if elem is not None and isinstance(elem, metaclass):
+            return elem
+        return None
+
+    def createTransaction(self, name):
+        return OfflineTransaction(name)
+
+
+class OfflineModelio(object):
+    def __init__(self, runtime):
+        self._rt = runtime
+        self._service = OfflineDiagramService(runtime)
+
+    def getInstance(self):
+        return self
+
+    def getDiagramService(self):
+        return self._service
+
+
+class OfflineRuntime(object):
+    """Holds every stand-in object of one offline session.
+
+    autoUnmaskRate -- fraction of elements shown by the first save (0.0-1.0)
+    seed           -- seed for the partial auto-unmask
+    """
+
+    def __init__(self, autoUnmaskRate=1.0, seed=0):
+        _installModules()
+        self.autoUnmaskRate = autoUnmaskRate
+        self.random = random.Random(seed)
+        self.elements = {}
+        self.counters = {"create": 0, "save": 0, "unmask": 0, "handle": 0, "close": 0}
+        self._ids = itertools.count(1)
+        self._diagrams = {}
+        self.session = OfflineSession(self)
+        self.modelio = OfflineModelio(self)
+        self.package = Package(self)
+        self.package.setName("OfflinePackage")
+
+    def nextId(self):
+        return next(self._ids)
+
+    def register(self, element):
+        self.elements[element._uuid] = element
+
+    def unregister(self, element):
+        self.elements.pop(element._uuid, None)
+
+    def diagramState(self, diagram):
+        return self._diagrams.setdefault(diagram.getUuid(), {"graphics": {}, "unmasked": False})
+
+    def namespace(self):
+        """Globals a Modelio macro expects to find."""
+        return {
+            "modelingSession": self.session,
+            "Modelio": self.modelio,
+            "selectedElements": _JList([self.package]),
+        }
+
+
+_HELPERS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    globals().get("__file__", os.path.join("tools", "BPMN_Offline.py"))))), "BPMN_Helpers.py")
+
+
+def loadHelpersOffline(runtime=None, helpersPath=None, namespace=None):
+    """Execute BPMN_Helpers.py against an offline runtime.
+
+    Returns the namespace holding the helper functions plus the runtime
+    under the key "offlineRuntime".
+    """
+    if runtime is None:
+        runtime = OfflineRuntime()
+    env = namespace if namespace is not None else {}
+    env.update(runtime.namespace())
+    env["offlineRuntime"] = runtime
+    env.setdefault("__name__", "BPMN_Helpers")
+    execfile(helpersPath or _HELPERS_PATH, env)
+    return env
+
+
+def loadConfigFile(path, env, name="CONFIG"):
+    """Read the CONFIG dict from a generated macro file.
+
+    The macro is executed up to its entry point (the selectedElements check),
+    with the execfile() of BPMN_Helpers.py skipped since env already holds it.
+    """
+    source = open(path).read()
+    for marker in ("if (selectedElements", "if selectedElements"):
+        cut = source.find(marker)
+        if cut >= 0:
+            source = source[:cut]
+            break
+    lines = [line for line in source.splitlines() if not line.strip().startswith("execfile(")]
+    scope = dict(env)
+    exec "\n".join(lines) + "\n" in scope
+    return scope[name]
@@ -0,0 +1,207 @@
+#
+# BPMN_Replay.py
+#
+# Description:
+#   Replays a Modelio call trace recorded with "TRACE": True (see
+#   createBPMNFromConfig) against the offline stand-in runtime, so that save,
+#   unmask and layout changes can be benchmarked without a Modelio session.
+#
+#   Two modes:
+#   - straight: re-issue the recorded calls in their recorded order, each one
+#     delayed by its recorded latency
+#   - config:   run the current BPMN_Helpers.py on a CONFIG, each Modelio call
+#     delayed by a latency taken from the trace for the same method (recorded
+#     samples are used in order and cycled when the new code calls more often)
+#
+# Usage:
+#   python2 tools/BPMN_Replay.py bpmn_trace_MyProcess.jsonl
+#   python2 tools/BPMN_Replay.py bpmn_trace_MyProcess.jsonl --config examples/ExpenseApproval.py
+#   python2 tools/BPMN_Replay.py bpmn_trace_MyProcess.jsonl --speed 0   (count calls only)
+#
+# Version: 1.0 - December 2025
+#
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(globals().get("__file__", os.path.join("tools", "BPMN_Replay.py")))))
+import BPMN_Offline
+
+
+# ============================================================================
+# TRACE READING
+# ============================================================================
+
+def readTrace(path):
+    """Return (header, calls) of a JSON-lines trace file."""
+    header = None
+    calls = []
+    with open(path) as traceFile:
+        for line in traceFile:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if header is None and "trace" in entry:
+                header = entry
+            else:
+                calls.append(entry)
+    if header is None:
+        raise ValueError("Not a BPMN trace file: " + path)
+    return header, calls
+
+
+class LatencyModel(object):
+    """Recorded latencies per Modelio method, handed out in recorded order."""
+
+    def __init__(self, calls):
+        self.samples = {}
+        self.cursor = {}
+        for call in calls:
+            self.samples.setdefault(call["m"], []).append(call["ms"] / 1000.0)
+
+    def next(self, method):
+        samples = self.samples.get(method)
+        if not samples:
+            return 0.0
+        index = self.cursor.get(method, 0)
+        self.cursor[method] = index + 1
+        return samples[index % len(samples)]
+
+    def total(self):
+        return sum(sum(s) for s in self.samples.values())
+
+
+def _sleep(seconds, speed):
+    if seconds > 0 and speed > 0:
+        time.sleep(seconds * speed)
+
+
+# ============================================================================
+# STRAIGHT REPLAY
+# ============================================================================
+
+def _decode(value, objects):
+    if isinstance(value, list):
+        return [_decode(v, objects) for v in value]
+    if isinstance(value, dict):
+        if "ref" in value:
+            return objects[value["ref"]]
+        if "rect" in value:
+            return BPMN_Offline.Rectangle(*value["rect"])
+    return value
+
+
+def replayStraight(path, speed=1.0, runtime=None):
+    """Re-issue every recorded call against the offline runtime.
+
+    Returns a report dict (calls, failed, recorded and replayed seconds).
+    """
+    header, calls = readTrace(path)
+    if runtime is None:
+        runtime = BPMN_Offline.OfflineRuntime()
+    objects = {"session": runtime.session, "modelio": runtime.modelio, "arg0": runtime.package}
+    failed = {}
+    start = time.time()
+    for call in calls:
+        _sleep(call["ms"] / 1000.0, speed)
+        target = objects.get(call["obj"])
+        try:
+            args = [_decode(a, objects) for a in call["args"]]
+            result = getattr(target, call["m"])(*args)
+        except Exception:
+            # Unknown to the stand-in (or depends on such a call): counted, not fatal
+            failed[call["m"]] = failed.get(call["m"], 0) + 1
+            continue
+        ret = call.get("ret")
+        if isinstance(ret, dict) and "ref" in ret:
+            objects[ret["ref"]] = result
+    return {
+        "calls": len(calls),
+        "failed": failed,
+        "recorded": sum(c["ms"] for c in calls) / 1000.0,
+        "replayed": time.time() - start,
+        "counters": runtime.counters,
+    }
+
+
+# ============================================================================
+# CONFIG REPLAY
+# ============================================================================
+
+class _LatencySink(object):
+    """Call sink for _runWithJavaProxies that adds the modeled latency."""
+
+    def __init__(self, model, speed):
+        self.model = model
+        self.speed = speed
+        self.calls = {}
+        self.count = 0
+        self.seconds = 0.0
+
+    def record(self, target, method, args, seconds, result):
+        latency = self.model.next(method)
+        _sleep(latency, self.speed)
+        stat = self.calls.setdefault(method, [0, 0.0])
+        stat[0] += 1
+        stat[1] += latency
+        self.count += 1
+        self.seconds += latency
+
+
+def replayConfig(path, configPath, speed=1.0, autoUnmaskRate=1.0):
+    """Run the current helpers on a CONFIG with recorded Modelio latencies."""
+    header, calls = readTrace(path)
+    runtime = BPMN_Offline.OfflineRuntime(autoUnmaskRate=autoUnmaskRate)
+    env = BPMN_Offline.loadHelpersOffline(runtime)
+    config = dict(BPMN_Offline.loadConfigFile(configPath, env))
+    config["TRACE"] = False
+    config["PROFILE"] = False
+    sink = _LatencySink(LatencyModel(calls), speed)
+    start = time.time()
+    env["_runWithJavaProxies"](sink, env["createBPMNFromConfig"], runtime.package, config)
+    return {
+        "calls": sink.count,
+        "methods": sink.calls,
+        "recorded": sum(c["ms"] for c in calls) / 1000.0,
+        "modeled": sink.seconds,
+        "replayed": time.time() - start,
+        "counters": runtime.counters,
+    }
+
+
+def printReport(report):
+    print "Calls:     " + str(report["calls"])
+    print "Recorded:  %.3f s Modelio time" % report["recorded"]
+    if "modeled" in report:
+        print "Modeled:   %.3f s Modelio time" % report["modeled"]
+    print "Replayed:  %.3f s wall time" % report["replayed"]
+    print "Runtime:   " + ", ".join("%s=%d" % kv for kv in sorted(report["counters"].items()))
+    if report.get("failed"):
+        print "Not replayed: " + ", ".join("%s x%d" % kv for kv in sorted(report["failed"].items()))
+    if report.get("methods"):
+        ranked = sorted(report["methods"].items(), key=lambda kv: -kv[1][1])
+        for method, (count, seconds) in ranked[:10]:
+            print "  %-28s %6d calls %9.3f s" % (method, count, seconds)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        print "Usage: BPMN_Replay.py TRACE.jsonl [--config MACRO.py] [--speed FACTOR] [--unmask RATE]"
+        sys.exit(1)
+    options = {"--config": None, "--speed": "1.0", "--unmask": "1.0"}
+    tracePath = args.pop(0)
+    while args:
+        key = args.pop(0)
+        if key not in options or not args:
+            print "Unknown or incomplete option: " + key
+            sys.exit(1)
+        options[key] = args.pop(0)
+    speed = float(options["--speed"])
+    if options["--config"]:
+        printReport(replayConfig(tracePath, options["--config"], speed, float(options["--unmask"])))
+    else:
+        printReport(replayStraight(tracePath, speed))
@@ -0,0 +1,737 @@
+#
+# BPMN_Stream.py
+#
+# Description:
+#   Validates CONFIG or process DSL text while an LLM is still writing it.
+#   Chunks from an OpenAI-compatible streaming endpoint (LM Studio, llama.cpp
+#   server, ...) are fed to a StreamValidator, which reports the first unknown
+#   element type, undeclared lane or dangling flow endpoint as soon as the
+#   text containing it is complete, so the generation can be aborted instead
+#   of running a broken macro after the full output.
+#
+#   - CONFIG text is tokenized incrementally (no exec); each element, flow,
+#     data object and association tuple is checked when its ")" arrives.
+#     When the CONFIG dict closes, the whole config goes through the same
+#     validation as createBPMNFromConfig (endpoints, reachability, ...)
+#     Nested sub-process configs are collected whole and checked at that point
+#   - DSL text is checked line by line (type tags, lanes, lines continuing
+#     from an element that does not exist), then parsed and validated as a
+#     whole at the end of the stream
+#
+#   StubServer is a stand-in endpoint that streams canned answers, for tests
+#   and for trying prompts offline.
+#
+# Usage:
+#   python2 tools/BPMN_Stream.py --file answer.txt
+#   python2 tools/BPMN_Stream.py --url http://localhost:1234/v1 --system lm_studio/system_prompt_dsl.txt \
+#       --prompt "Leave request: employee submits, manager approves or rejects"
+#   python2 tools/BPMN_Stream.py --serve answer.txt --port 1234       (stand-in server)
+#
+#   validator = StreamValidator()
+#   for chunk in streamChatCompletion(url, messages):
+#       if validator.feed(chunk):
+#           break                                 # validator.problems
+#   validator.close()
+#
+# Version: 1.0 - December 2025
+#
+
+import ast
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import urllib2
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(globals().get("__file__", os.path.join("tools", "BPMN_Stream.py")))))
+import BPMN_Offline
+
+_HELPERS = {}
+
+def _helpers():
+    """BPMN_Helpers.py namespace (loaded once, offline)."""
+    if not _HELPERS:
+        env = BPMN_Offline.loadHelpersOffline()
+        _HELPERS.update(env)
+    return _HELPERS
+
+
+# ============================================================================
+# STREAM VALIDATION
+# ============================================================================
+
+# Whitespace, comment, string, number, name, or any other single character
+_TOKEN = re.compile(r'''\s+|#[^\n]*|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|-?\d+(?:\.\d+)?|[A-Za-z_]\w*|.''')
+
+_TUPLE_SECTIONS = ("elements", "flows", "data_objects", "data_associations")
+_CONFIG_START = re.compile(r'^(CONFIG\b|execfile|from\s|import\s|\{)')
+
+
+class _Name(str):
+    """Bare identifier in CONFIG text (an element type constant)."""
+
+
+class StreamValidator(object):
+    """
+    Incremental checker for CONFIG or DSL text. feed() takes the next chunk
+    and returns the problems found in it (also collected in .problems);
+    close() runs the checks that need the whole text. mode is "config",
+    "dsl" or None (decided from the first non-blank line).
+    """
+
+    def __init__(self, mode=None, env=None):
+        self.env = env or _helpers()
+        self.mode = mode
+        self.problems = []
+        self.done = False           # CONFIG dict closed or DSL block ended
+        self.closed = False
+        self.buffer = ""
+        self.line = 1               # Line of the buffer start
+        # CONFIG state
+        self.started = False
+        self.stack = []
+        self.section = None
+        self.key = None
+        self.configKey = None
+        self.layoutKey = None
+        self.sections = set()       # Sections seen complete
+        self.values = []            # Open tuples (innermost last)
+        self.config = {"lanes": [], "layout": {}}
+        self.deferred = []          # (line, kind, item) checked when their targets are known
+        self.nested = None          # Tokens of the "sub_processes" section while it is open
+        # DSL state
+        self.dslLines = []
+        self.dslNames = set()
+        self.dslLanes = None
+        self.dslQuoted = False
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def feed(self, chunk):
+        """Add a chunk of text; returns the new problems."""
+        count = len(self.problems)
+        if self.done or self.closed:
+            return []
+        self.buffer += chunk
+        if self.mode is None:
+            self._detectMode()
+        if self.mode == "config":
+            self._scanConfig(False)
+        elif self.mode == "dsl":
+            self._scanDSL(False)
+        return self.problems[count:]
+
+    def close(self):
+        """End of stream: flush and run the whole-text checks. Returns all problems."""
+        if self.closed:
+            return self.problems
+        if self.mode is None:
+            self._detectMode(True)
+        if self.mode == "config":
+            self._scanConfig(True)
+            if not self.done:
+                self._problem(self.line, "CONFIG dict is not closed")
+                self._finishConfig()
+        elif self.mode == "dsl":
+            self._scanDSL(True)
+            self._finishDSL()
+        else:
+            self._problem(self.line, "no CONFIG or DSL text")
+        self.closed = True
+        return self.problems
+
+    def _problem(self, line, message):
+        text = "line " + str(line) + ": " + message
+        if text not in self.problems:
+            self.problems.append(text)
+
+    def _detectMode(self, final=False):
+        lines = self.buffer.split("\n")
+        if not final:
+            lines = lines[:-1]
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("```") or line.startswith("#"):
+                continue
+            self.mode = "config" if _CONFIG_START.match(line) else "dsl"
+            return
+
+    # ------------------------------------------------------------------
+    # CONFIG text
+    # ------------------------------------------------------------------
+
+    def _scanConfig(self, final):
+        buf = self.buffer
+        pos = 0
+        while pos < len(buf) and not self.done:
+            match = _TOKEN.match(buf, pos)
+            token = match.group(0)
+            if not final:
+                # Wait for the rest of a token cut by the chunk boundary
+                if token in ("\"", "'") and "\n" not in buf[pos:]:
+                    break
+                if match.end() == len(buf) and (token[0] in "#_-" or token[0].isalnum()):
+                    break
+            pos = match.end()
+            line = self.line
+            self.line += token.count("\n")
+            if token.isspace() or token.startswith("#"):
+                continue
+            self._configToken(token, line)
+        self.buffer = buf[pos:]
+
+    def _configToken(self, token, line):
+        if self.nested is not None:
+            self._nestedToken(token, line)
+            return
+        depth = len(self.stack)
+        if token in "([{":
+            if token == "{" and depth == 0 and not self.started:
+                self.started = True     # The first top-level dict is the CONFIG
+                self.stack.append(("{", line))
+                return
+            if depth == 1:
+                self.configKey = None
+                if self.key in _TUPLE_SECTIONS + ("lanes", "layout"):
+                    self.section = self.key
+                elif self.key == "sub_processes":
+                    self.nested = []
+                    self._nestedToken(token, line)
+                    return
+            self.stack.append((token, line))
+            if token == "(" and depth >= 2 and self.section:
+                self.values.append([])
+            return
+        if token in ")]}":
+            if not self.stack:
+                return
+            opener, openLine = self.stack.pop()
+            depth = len(self.stack)
+            if opener == "(" and self.values and depth >= 2:
+                item = tuple(self.values.pop())
+                if self.values:
+                    self.values[-1].append(item)
+                else:
+                    self._configItem(item, openLine)
+            elif depth == 1 and self.section:
+                self.sections.add(self.section)
+                self._sectionClosed(self.section)
+                self.section = None
+                self.key = None
+            elif depth == 0 and opener == "{" and self.started:
+                self._finishConfig()
+            return
+        if token[0] in "\"'":
+            value = token[1:-1].decode("string_escape")
+        elif token[0].isdigit() or token[0] == "-":
+            value = float(token) if "." in token else int(token)
+        elif token[0].isalpha() or token[0] == "_":
+            value = _Name(token)
+        elif token == ":" and depth in (1, 2):
+            if depth == 1:
+                self.configKey = self.key
+            elif self.section == "layout" and self.key is not None:
+                self.layoutKey = (self.key, line)
+            return
+        else:
+            return
+        if self.values:
+            self.values[-1].append(value)
+        elif depth == 1:
+            if self.configKey is not None:
+                # Scalar entry ("name", "SPACING", "LOG_LEVEL", ...)
+                self.config[self.configKey] = self._constant(value)
+                self.configKey = None
+            else:
+                self.key = value
+        elif depth == 2 and self.section == "lanes":
+            self.config["lanes"].append(value)
+        elif depth == 2 and self.section == "layout":
+            self._layoutValue(value, line)
+
+    def _nestedToken(self, token, line):
+        """
+        Collect the sub_processes section as a literal, constants resolved;
+        it is parsed when it closes and validated with the whole config.
+        """
+        if token in "([{":
+            self.stack.append((token, line))
+        elif token in ")]}":
+            self.stack.pop()
+        if token[0].isalpha() or token[0] == "_":
+            token = repr(self._constant(_Name(token)))
+        self.nested.append(token)
+        if len(self.stack) > 1:
+            return
+        text = " ".join(self.nested)
+        self.nested = None
+        self.key = None
+        try:
+            self.config["sub_processes"] = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            self._problem(line, "sub_processes must be a dict of literal configs")
+
+    def _constant(self, value):
+        if isinstance(value, _Name):
+            return {"True": True, "False": False, "None": None}.get(value, self.env.get(value, value))
+        return value
+
+    def _layoutValue(self, value, line):
+        pending = self.layoutKey
+        if pending is None:
+            self.key = value
+            return
+        self.layoutKey = None
+        self.key = None
+        name, keyLine = pending
+        self.config["layout"][name] = value
+        if "elements" in self.sections:
+            self._checkLayout(name, keyLine)
+        else:
+            self.deferred.append((keyLine, "layout", name))
+
+    def _configItem(self, item, line):
+        if self.section == "layout":
+            self._layoutValue(item, line)
+            return
+        if self.section not in _TUPLE_SECTIONS or len(item) < 2:
+            return
+        self.config.setdefault(self.section, []).append(item)
+        if self.section == "elements":
+            self._checkElement(item, line)
+        elif self.section == "data_objects":
+            self._checkLane(item[0], item[1], line)
+        elif self.section == "flows":
+            if "elements" in self.sections:
+                self._checkFlow(item, line)
+            else:
+                self.deferred.append((line, "flow", item))
+        else:
+            if "elements" in self.sections and "data_objects" in self.sections:
+                self._checkAssociation(item, line)
+            else:
+                self.deferred.append((line, "association", item))
+
+    def _checkElement(self, item, line):
+        name = str(item[0])
+        if len(item) < 3:
+            self._problem(line, "element " + name + " needs (name, type, lane)")
+            return
+        elemType = str(item[1])
+        if elemType not in self.env["_ELEMENT_CREATORS"] or elemType == self.env["DATA_OBJECT"]:
+            self._problem(line, "Unknown element type " + elemType + ": " + name)
+        self._checkLane(name, item[2], line)
+
+    def _checkLane(self, name, laneName, line):
+        if "lanes" in self.sections:
+            if laneName not in self.config["lanes"]:
+                self._problem(line, "Unknown lane '" + str(laneName) + "': " + str(name))
+        else:
+            self.deferred.append((line, "lane", (name, laneName)))
+
+    def _knownNames(self):
+        names = set(e[0] for e in self.config.get("elements", []))
+        names.update(d[0] for d in self.config.get("data_objects", []))
+        return names
+
+    def _checkFlow(self, item, line):
+        known = self._knownNames()
+        for name in item[:2]:
+            if name not in known:
+                self._problem(line, "Flow " + str(item[0]) + " -> " + str(item[1]) + ": unknown element " + str(name))
+                return
+
+    def _checkAssociation(self, item, line):
+        known = self._knownNames()
+        for name in item[:2]:
+            if name not in known:
+                self._problem(line, "Data association " + str(item[0]) + " -> " + str(item[1]) + ": unknown element " + str(name))
+                return
+
+    def _checkLayout(self, name, line):
+        if name not in self._knownNames():
+            self._problem(line, "Layout entry for unknown element " + str(name))
+
+    def _sectionClosed(self, section):
+        """Re-check deferred items whose targets are now complete."""
+        ready = {
+            "lane": "lanes" in self.sections,
+            "flow": "elements" in self.sections,
+            "layout": "elements" in self.sections,
+            "association": "elements" in self.sections and "data_objects" in self.sections,
+        }
+        waiting = []
+        for line, kind, item in self.deferred:
+            if not ready[kind]:
+                waiting.append((line, kind, item))
+            else:
+                self._checkDeferred(line, kind, item)
+        self.deferred = waiting
+
+    def _checkDeferred(self, line, kind, item):
+        if kind == "lane":
+            self._checkLane(item[0], item[1], line)
+        elif kind == "flow":
+            self._checkFlow(item, line)
+        elif kind == "layout":
+            self._checkLayout(item, line)
+        else:
+            self._checkAssociation(item, line)
+
+    def _finishConfig(self):
+        self.done = True
+        self.sections.update(("lanes", "elements", "data_objects"))
+        for line, kind, item in self.deferred:
+            self._checkDeferred(line, kind, item)
+        self.deferred = []
+        if not self.problems:
+            for problem in self.env["_validateConfig"](self.config):
+                self._problem(self.line, problem)
+
+    # ------------------------------------------------------------------
+    # DSL text
+    # ------------------------------------------------------------------
+
+    def _scanDSL(self, final):
+        lines = self.buffer.split("\n")
+        self.buffer = "" if final else lines.pop()
+        for text in lines:
+            lineNo = self.line
+            self.line += 1
+            if not self.done:
+                self._dslLine(text, lineNo)
+
+    def _dslLine(self, text, lineNo):
+        stripped = text.strip()
+        if stripped.startswith("```"):
+            return
+        if '"""' in stripped:
+            # PROCESS = """ ... """ block of the DSL macro template
+            if self.dslQuoted:
+                self.done = True
+            self.dslQuoted = True
+            return
+        self.dslLines.append((lineNo, text))
+        if not stripped or stripped.startswith("#"):
+            return
+        masked, literals = self.env["_dslMaskQuotes"](stripped)
+        head, sep, rest = masked.partition(":")
+        head = self.env["_dslRestore"](head.strip(), literals)
+        if not sep or not head:
+            self._problem(lineNo, "expected 'Lane: step > step', got: " + stripped)
+            return
+        keyword = head.lower()
+        if keyword == "lanes":
+            self.dslLanes = set(self.env["_dslRestore"](l.strip(), literals) for l in rest.split(",") if l.strip())
+            return
+        if keyword in ("process", "name", "data"):
+            return
+        if self.dslLanes is not None and head not in self.dslLanes:
+            self._problem(lineNo, "lane " + head + " is not declared in 'lanes:'")
+        first = True
+        for segment in rest.split(">"):
+            for group in self.env["_dslGroups"](segment):
+                for guard, stepText in group:
+                    self._dslStep(stepText, lineNo, first and not guard, literals)
+            first = False
+
+    def _dslStep(self, stepText, lineNo, lineHead, literals):
+        stepText = stepText.strip()
+        tag = None
+        match = self.env["_DSL_TAG"].search(stepText)
+        if match:
+            tag = match.group(1).strip()
+            stepText = stepText[:match.start()].strip()
+            if not self._knownTag(tag):
+                self._problem(lineNo, stepText + ": unknown type tag [" + tag + "]")
+        isEvent = stepText.startswith("(") and stepText.endswith(")")
+        if isEvent:
+            stepText = stepText[1:-1].strip()
+        stepText = self.env["_dslRestore"](stepText, literals)
+        if lineHead and stepText and stepText not in self.dslNames and not isEvent and not self._startTag(tag):
+            # A line continues from its first step; a new name there is a typo
+            self._problem(lineNo, "line starts from " + stepText + ", which no earlier line created")
+        self.dslNames.add(stepText)
+
+    def _startTag(self, tag):
+        """Tag that can name a start event (which needs no earlier line)."""
+        if tag is None:
+            return False
+        if tag.lower() in self.env["_DSL_POSITIONAL_TAGS"]:
+            return True
+        return self.env["_DSL_TYPE_TAGS"].get(tag.lower(), tag) in self.env["_START_TYPES"]
+
+    def _knownTag(self, tag):
+        return (tag in self.env["_ELEMENT_CREATORS"] and tag != self.env["DATA_OBJECT"]) \
+            or tag.lower() in self.env["_DSL_TYPE_TAGS"] or tag.lower() in self.env["_DSL_POSITIONAL_TAGS"]
+
+    def _finishDSL(self):
+        self.done = True
+        text = "\n".join(text for _, text in self.dslLines)
+        lineNumbers = [lineNo for lineNo, _ in self.dslLines]
+        config, problems = self.env["_parseProcessDSL"](text)
+        for problem in problems:
+            match = re.match(r'line (\d+): (.*)', problem)
+            if match:
+                self._problem(lineNumbers[int(match.group(1)) - 1], match.group(2))
+            else:
+                self._problem(self.line, problem)
+        if config is not None and not self.problems:
+            self.config = config
+            for problem in self.env["_validateConfig"](config):
+                self._problem(self.line, problem)
+
+
+def validateText(text, chunkSize=None, mode=None):
+    """Feed text in chunks of chunkSize characters (None: all at once). Returns the problems."""
+    validator = StreamValidator(mode)
+    step = chunkSize or max(1, len(text))
+    for start in range(0, len(text), step):
+        if validator.feed(text[start:start + step]):
+            break
+    if not validator.problems:
+        validator.close()
+    return validator.problems
+
+
+# ============================================================================
+# OPENAI-COMPATIBLE CLIENT
+# ============================================================================
+
+def streamChatCompletion(baseUrl, messages, model=None, temperature=0.2, maxTokens=4096, timeout=300, stats=None):
+    """
+    Yield the content chunks of a streamed /chat/completions request.
+    `stats` (a dict) receives "usage" when the server reports it and
+    "firstChunk" (seconds until the first content chunk).
+    """
+    body = {"messages": messages, "temperature": temperature, "max_tokens": maxTokens, "stream": True}
+    if model:
+        body["model"] = model
+    request = urllib2.Request(baseUrl.rstrip("/") + "/chat/completions", json.dumps(body),
+                              {"Content-Type": "application/json"})
+    start = time.time()
+    response = urllib2.urlopen(request, timeout=timeout)
+    try:
+        for line in iter(response.readline, ""):
+            line = line.strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            if stats is not None and event.get("usage"):
+                stats["usage"] = event["usage"]
+            for choice in event.get("choices", []):
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    if stats is not None and "firstChunk" not in stats:
+                        stats["firstChunk"] = time.time() - start
+                    yield content
+    finally:
+        response.close()
+
+
+def validateCompletion(baseUrl, messages, model=None, abortOnProblem=True, mode=None, **options):
+    """
+    Stream a completion through a StreamValidator. Stops reading (closing
+    the connection, which ends the generation) at the first problem when
+    abortOnProblem is set. Returns a dict: text, problems, config (None if
+    invalid), aborted, chunks, seconds, firstChunk, problemAt and validAt
+    (seconds until the first problem / the complete valid config), usage.
+    """
+    validator = StreamValidator(mode)
+    stats = {}
+    parts = []
+    start = time.time()
+    result = {"aborted": False, "problemAt": None, "validAt": None}
+    for chunk in streamChatCompletion(baseUrl, messages, model, stats=stats, **options):
+        parts.append(chunk)
+        problems = validator.feed(chunk)
+        if validator.done and not validator.problems and result["validAt"] is None:
+            result["validAt"] = time.time() - start
+        if problems:
+            if result["problemAt"] is None:
+                result["problemAt"] = time.time() - start
+            if abortOnProblem:
+                result["aborted"] = True
+                break
+    if not result["aborted"]:
+        validator.close()
+        if validator.problems and result["problemAt"] is None:
+            result["problemAt"] = time.time() - start
+        elif not validator.problems and result["validAt"] is None:
+            result["validAt"] = time.time() - start
+    result.update({
+        "text": "".join(parts),
+        "problems": validator.problems,
+        "config": validator.config if not validator.problems else None,
+        "chunks": len(parts),
+        "seconds": time.time() - start,
+        "firstChunk": stats.get("firstChunk"),
+        "usage": stats.get("usage"),
+    })
+    return result
+
+
+# ============================================================================
+# STAND-IN SERVER
+# ============================================================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json({"object": "list", "data": [{"id": self.server.stub.model, "object": "model"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.getheader("Content-Length") or 0)) or "{}")
+        stub = self.server.stub
+        text = stub.answer(request.get("messages", []))
+        chunks = [text[i:i + stub.chunkSize] for i in range(0, len(text), stub.chunkSize)]
+        usage = {"prompt_tokens": sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4,
+                 "completion_tokens": len(chunks)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if not request.get("stream"):
+            self._json({"object": "chat.completion", "model": stub.model, "usage": usage,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": text}}]})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        sent = 0
+        try:
+            for chunk in chunks:
+                time.sleep(stub.delay)
+                self._event({"object": "chat.completion.chunk", "model": stub.model,
+                             "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]})
+                sent += 1
+            self._event({"object": "chat.completion.chunk", "model": stub.model, "usage": usage,
+                         "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self.wfile.write("data: [DONE]\n\n")
+        except socket.error:
+            pass    # Client stopped reading: generation aborted
+        stub.sentChunks.append((sent, len(chunks)))
+
+    def _event(self, payload):
+        self.wfile.write("data: " + json.dumps(payload) + "\n\n")
+        self.wfile.flush()
+
+    def _json(self, payload):
+        body = json.dumps(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _StubHTTPServer(HTTPServer):
+    def handle_error(self, request, clientAddress):
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, clientAddress)
+        # else: the client closed the connection mid-stream (aborted generation)
+
+
+class StubServer(object):
+    """
+    OpenAI-compatible stand-in endpoint on localhost. answers is a list of
+    texts (handed out in turn) or a function(messages) -> text; each answer
+    is streamed in chunks of chunkSize characters, delay seconds apart.
+    sentChunks records (chunks sent, chunks in the answer) per request.
+
+        with StubServer([text]) as server:
+            validateCompletion(server.url, messages)
+    """
+
+    def __init__(self, answers, chunkSize=8, delay=0.005, port=0, model="stub"):
+        self.answers = answers
+        self.chunkSize = max(1, chunkSize)
+        self.delay = delay
+        self.model = model
+        self.sentChunks = []
+        self.requests = 0
+        self.httpd = _StubHTTPServer(("127.0.0.1", port), _StubHandler)
+        self.httpd.stub = self
+        self.url = "http://127.0.0.1:%d/v1" % self.httpd.server_address[1]
+        self.thread = None
+
+    def answer(self, messages):
+        self.requests += 1
+        if callable(self.answers):
+            return self.answers(messages)
+        return self.answers[(self.requests - 1) % len(self.answers)]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _printResult(result):
+    state = "ABORTED" if result["aborted"] else ("INVALID" if result["problems"] else "VALID")
+    print "%s after %d chunks, %.2f s" % (state, result["chunks"], result["seconds"])
+    for problem in result["problems"]:
+        print "  " + problem
+
+
+if __name__ == "__main__":
+    options = {"--file": None, "--url": None, "--prompt": None, "--system": None, "--model": None,
+               "--serve": None, "--port": "1234", "--chunk": "8", "--mode": None}
+    args = sys.argv[1:]
+    while args:
+        key = args.pop(0)
+        if key not in options or not args:
+            print "Unknown or incomplete option: " + key
+            print "Options: " + " ".join(sorted(options.keys()))
+            sys.exit(1)
+        options[key] = args.pop(0)
+
+    if options["--serve"]:
+        server = StubServer([open(options["--serve"]).read()], int(options["--chunk"]), port=int(options["--port"]))
+        print "Stand-in endpoint: " + server.url + " (Ctrl+C to stop)"
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.httpd.server_close()
+    elif options["--url"]:
+        messages = []
+        if options["--system"]:
+            messages.append({"role": "system", "content": open(options["--system"]).read()})
+        messages.append({"role": "user", "content": options["--prompt"] or "Create a simple order process"})
+        result = validateCompletion(options["--url"], messages, options["--model"], mode=options["--mode"])
+        print result["text"]
+        _printResult(result)
+    elif options["--file"]:
+        problems = validateText(open(options["--file"]).read(), int(options["--chunk"]), options["--mode"])
+        print "INVALID" if problems else "VALID"
+        for problem in problems:
+            print "  " + problem
+    else:
+        print "Usage: BPMN_Stream.py --file TEXT | --url BASE_URL [--prompt P] [--system FILE] | --serve TEXT"
+        sys.exit(1)